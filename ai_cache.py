@@ -0,0 +1,197 @@
+"""
+AI Result Cache
+===============
+generate_ai_summary() sends the document text to Groq on every analysis,
+even when the same document was analysed a minute earlier with a different
+keyword. Parsed results are cached under
+
+    key = SHA-256( model | prompt )
+
+so a repeat document returns its analysis instantly and does not spend the
+per-key quota.
+
+Two tiers:
+    memory : LRU of the most recent results (per process)
+    sqlite : table in a small SQLite file (e.g. on the /app/data volume),
+             shared by all gunicorn workers, entries expire after the TTL
+
+The SQLite tier uses the standard sqlite3 module rather than Flask-SQLAlchemy,
+so it also works from threads without an app context (/api/batch pool).
+Cache failures are logged and treated as misses; they never fail an analysis.
+
+Configuration (environment):
+    AI_CACHE_MEMORY_ENTRIES  results kept in memory per process (default 256)
+    AI_CACHE_TTL_HOURS       lifetime of cached results (default 168)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+AI_CACHE_MEMORY_ENTRIES = int(os.environ.get('AI_CACHE_MEMORY_ENTRIES', 256))
+AI_CACHE_TTL_HOURS = float(os.environ.get('AI_CACHE_TTL_HOURS', 168))
+
+# Expired rows are deleted at most this often (on writes)
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def make_ai_cache_key(prompt: str, model: str) -> str:
+    """Cache key of one completion request: 64-character hex."""
+    return hashlib.sha256(f'{model}|{prompt}'.encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class AIResultCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of parsed AI results.
+
+    Args:
+        path (str): SQLite file; None keeps only the memory tier
+        memory_entries (int): Size of the memory LRU
+        ttl_seconds (float): Lifetime of an entry in both tiers
+    """
+
+    def __init__(self, path: str = None, memory_entries: int = AI_CACHE_MEMORY_ENTRIES,
+                 ttl_seconds: float = AI_CACHE_TTL_HOURS * 3600):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (created_at, result)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self.stats = {'memory_hits': 0, 'sqlite_hits': 0, 'misses': 0}
+
+    # ---------------------------------------------------------------- memory
+
+    def _remember(self, key: str, created_at: float, result: dict):
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (created_at, result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    # ---------------------------------------------------------------- sqlite
+
+    def _connection(self):
+        """One connection per thread (and per process after a fork)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS ai_results ('
+            ' key TEXT PRIMARY KEY, model TEXT, result TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        connection.commit()
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _read_sqlite(self, key: str):
+        if not self.path:
+            return None
+        try:
+            row = self._connection().execute(
+                'SELECT created_at, result FROM ai_results WHERE key = ? AND created_at >= ?',
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[AI CACHE] Read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _write_sqlite(self, key: str, model: str, created_at: float, result: dict):
+        if not self.path:
+            return
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO ai_results (key, model, result, created_at) VALUES (?, ?, ?, ?)',
+                (key, model, json.dumps(result), created_at)
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"[AI CACHE] Write failed: {e}")
+            return
+        self._purge_expired()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+                return
+            self._last_purge = now
+        try:
+            connection = self._connection()
+            connection.execute('DELETE FROM ai_results WHERE created_at < ?', (time.time() - self.ttl_seconds,))
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"[AI CACHE] Purge failed: {e}")
+
+    # ------------------------------------------------------------------- API
+
+    def get(self, key: str):
+        """
+        Look up a cached result.
+
+        Returns:
+            dict or None: Cached result, None on a miss or when expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return entry[1]
+                del self._memory[key]
+
+        entry = self._read_sqlite(key)
+        if entry is not None:
+            self._remember(key, *entry)
+            self._count('sqlite_hits')
+            return entry[1]
+
+        self._count('misses')
+        return None
+
+    def put(self, key: str, result: dict, model: str = None):
+        """Store a result (must be JSON serializable) in both tiers."""
+        created_at = time.time()
+        self._remember(key, created_at, result)
+        self._write_sqlite(key, model, created_at, result)
+
+    def snapshot(self) -> dict:
+        """Counters plus the hit ratio, for monitoring."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['sqlite_hits'] + stats['misses']
+        stats['hit_ratio'] = round((lookups - stats['misses']) / lookups, 3) if lookups else None
+        return stats
+
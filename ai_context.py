@@ -0,0 +1,258 @@
+"""
+AI Context Builder
+==================
+The AI analysis used to receive only the first 4500 characters of a
+document. For long PDFs that is mostly the cover page and the table of
+contents. This module picks the most informative parts of the text into a
+fixed token budget instead:
+
+    1. the start of the document (title, authors; the table of contents is
+       never included)
+    2. the opening of each detected section, in order of usefulness for a
+       quality review: Abstrak, Metodologi, Kesimpulan, Hasil & Pembahasan,
+       Pendahuluan (headings such as "BAB III METODE PENELITIAN" or
+       "2. Methods"; table-of-contents lines are ignored)
+    3. windows around keyword matches (Rabin-Karp positions), densest first
+    4. the rest of the detected sections while budget remains (or, for text
+       without headings, simply more of the start of the document)
+
+Snippets are emitted in document order and separated by "[...]"; adjacent
+snippets are joined. Labels follow the document structure, not the reason a
+snippet was picked: a label is placed where a run of text starts and where
+a section heading starts inside it, e.g. "[Metodologi | Halaman 9]", or
+"[Metodologi, lanjutan | Halaman 11]" for text further into the section.
+Pages come from the "--- Halaman N ---" markers. A short header lists the
+detected sections, so the model does not report a section as missing just
+because it was cut.
+
+Tokens are estimated at CHARS_PER_TOKEN characters each (no tokenizer needed).
+
+Configuration (environment):
+    AI_CONTEXT_TOKENS   input budget for the document text (default 1000)
+"""
+
+import bisect
+import os
+import re
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+AI_CONTEXT_TOKENS = int(os.environ.get('AI_CONTEXT_TOKENS', 1000))
+CHARS_PER_TOKEN = 4
+
+HEAD_CHARS = 400           # Title/authors at the start of the document
+KEYWORD_WINDOW_CHARS = 250  # Context on each side of a keyword match
+MIN_SNIPPET_CHARS = 120    # Smaller leftovers are not worth a snippet
+MIN_HEAD_CHARS = 20        # ...except the title lines before a table of contents
+
+# (key, label, heading pattern), in order of priority for the analysis
+SECTIONS = [
+    ('abstrak', 'Abstrak', r'abstra[kc]t?|ringkasan'),
+    ('metodologi', 'Metodologi',
+     r'metod(?:e|ologi)(?:\s+penelitian)?|bahan\s+dan\s+metode|method(?:s|ology)?|research\s+method'),
+    ('kesimpulan', 'Kesimpulan', r'(?:ke)?simpulan(?:\s+dan\s+saran)?|penutup|conclusions?'),
+    ('hasil_pembahasan', 'Hasil & Pembahasan',
+     r'hasil(?:\s+dan\s+pembahasan|\s+penelitian)?|pembahasan|results?(?:\s+and\s+discussion)?|discussion'),
+    ('pendahuluan', 'Pendahuluan', r'pendahuluan|latar\s+belakang|introduction'),
+    # Not included in the context, but ends the section before it
+    ('daftar_pustaka', 'Daftar Pustaka', r'daftar\s+pustaka|referensi|references|bibliography'),
+]
+SKIPPED_SECTIONS = {'daftar_pustaka'}
+
+_LABELS = {key: label for key, label, _ in SECTIONS}
+_HEADING = re.compile(
+    r'^[ \t]*(?:bab\s+)?(?:(?:[ivx]+|\d+(?:\.\d+)*)[.)]?\s+)?'
+    r'(?P<title>' + '|'.join(f'(?P<{key}>{pattern})' for key, _, pattern in SECTIONS) + r')\b'
+    r'(?P<rest>[^\n]*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+_PAGE_MARKER = re.compile(r'--- Halaman (\d+) ---\n')
+_TRAILING_MARKER = re.compile(r'\s*--- Halaman \d+ ---$')
+_TOC_LINE = re.compile(
+    r'^[ \t]*(?:daftar\s+isi|table\s+of\s+contents|contents)[ \t]*\n'
+    r'|^[^\n]*?(?:\.{2,}|…)[ \t.…]*\d+[ \t]*(?:\n|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def _find_headings(text: str) -> list:
+    """Section headings in document order: [(start, section_key)]."""
+    headings = []
+    for match in _HEADING.finditer(text):
+        rest = match.group('rest').strip()
+        # A heading is a short line, or a title followed by ':'/'-' (inline abstract);
+        # table-of-contents lines ("PENDAHULUAN ........ 1") are skipped
+        if '..' in rest or '…' in rest:
+            continue
+        if len(rest) > 40 and not re.match(r'^[:\-–—.]', rest):
+            continue
+        key = next(k for k, _, _ in SECTIONS if match.group(k))
+        headings.append((match.start(), key))
+    return headings
+
+
+def _find_sections(text: str, headings: list = None) -> dict:
+    """
+    Locate section headings.
+
+    Returns:
+        dict: {section_key: (start, end)} - the longest body per section kind
+    """
+    if headings is None:
+        headings = _find_headings(text)
+    sections = {}
+    for index, (start, key) in enumerate(headings):
+        end = headings[index + 1][0] if index + 1 < len(headings) else len(text)
+        if key not in sections or end - start > sections[key][1] - sections[key][0]:
+            sections[key] = (start, end)
+    return sections
+
+
+def _toc_spans(text: str) -> list:
+    """Table-of-contents lines ("DAFTAR ISI", "BAB I PENDAHULUAN ..... 1"): [(start, end)]."""
+    return [(m.start(), m.end()) for m in _TOC_LINE.finditer(text)]
+
+
+def _keyword_windows(text: str, positions: list) -> list:
+    """Merged windows around match positions, densest first: [(start, end, matches)]."""
+    windows = []
+    for pos in sorted(set(positions or [])):
+        start = max(0, pos - KEYWORD_WINDOW_CHARS)
+        end = min(len(text), pos + KEYWORD_WINDOW_CHARS)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+            windows[-1][2] += 1
+        else:
+            windows.append([start, end, 1])
+    return sorted((tuple(w) for w in windows), key=lambda w: (-w[2] / (w[1] - w[0]), w[0]))
+
+
+def _free_segment(text: str, start: int, end: int, taken: list, min_chars: int = MIN_SNIPPET_CHARS):
+    """First part of [start, end) with at least `min_chars` of text that is not inside a taken span."""
+    for taken_start, taken_end in sorted(taken) + [(end, end)]:
+        if taken_end <= start or taken_start > end:
+            continue
+        if len(text[start:min(taken_start, end)].strip()) >= min_chars:
+            return start, min(taken_start, end)
+        start = max(start, taken_end)
+        if start >= end:
+            return None
+    return None
+
+
+def _overlaps(start: int, end: int, spans: list) -> bool:
+    return any(span_start < end and start < span_end for span_start, span_end in spans)
+
+
+def _snap(text: str, start: int, end: int):
+    """Move snippet boundaries to whitespace so words are not cut."""
+    if 0 < start < len(text) and not text[start - 1].isspace() and not text[start].isspace():
+        space = text.find(' ', start, min(end, start + 40))
+        start = space + 1 if space != -1 else start
+    if 0 < end < len(text) and not text[end].isspace() and not text[end - 1].isspace():
+        space = text.rfind(' ', max(start, end - 40), end)
+        end = space if space != -1 else end
+    return start, end
+
+
+def build_ai_context(text: str, match_positions: list = None,
+                     budget_tokens: int = AI_CONTEXT_TOKENS) -> str:
+    """
+    Assemble the most informative parts of a document into a token budget.
+
+    Args:
+        text (str): Extracted document text
+        match_positions (list): Keyword match offsets into `text`
+        budget_tokens (int): Approximate token budget
+
+    Returns:
+        str: The text itself if it fits, otherwise labelled snippets
+    """
+    budget = budget_tokens * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+
+    headings = _find_headings(text)
+    sections = _find_sections(text, headings)
+    # Head + five section openings use about 3/4 of the budget, keyword windows the rest
+    section_share = max(MIN_SNIPPET_CHARS * 2, budget // 7)
+
+    # (start, end) candidates in priority order
+    candidates = [(0, HEAD_CHARS)]
+    ordered = [(key, sections[key]) for key, _, _ in SECTIONS
+               if key in sections and key not in SKIPPED_SECTIONS]
+    for key, (start, end) in ordered:
+        candidates.append((start, min(end, start + section_share)))
+    for start, end, _ in _keyword_windows(text, match_positions):
+        candidates.append((start, end))
+    for key, (start, end) in ordered:
+        candidates.append((start, end))  # Continues after the opening
+    # No structure and no matches: plain start of the document, as before
+    candidates.append((0, len(text)))
+
+    # The table of contents is never worth budget: treat it as already taken
+    toc = _toc_spans(text)
+    chosen = []  # (start, end), non-overlapping
+    remaining = budget
+    for index, (start, end) in enumerate(candidates):
+        if remaining < MIN_SNIPPET_CHARS:
+            break
+        segment = _free_segment(text, start, end, chosen + toc,
+                                MIN_HEAD_CHARS if index == 0 else MIN_SNIPPET_CHARS)
+        if segment is None:
+            continue
+        start, end = segment
+        # Close small gaps to earlier snippets: cheaper than a "[...]" and a new label
+        for taken_start, taken_end in chosen:
+            if 0 < start - taken_end < MIN_SNIPPET_CHARS and not _overlaps(taken_end, start, toc):
+                start = taken_end
+            if 0 < taken_start - end < MIN_SNIPPET_CHARS and not _overlaps(end, taken_start, toc):
+                end = taken_start
+        end = min(end, start + remaining)
+        start, end = _snap(text, start, end)
+        chosen.append((start, end))
+        remaining -= end - start
+
+    markers = [(m.start(), int(m.group(1))) for m in _PAGE_MARKER.finditer(text)]
+    offsets = [offset for offset, _ in markers]
+    heading_offsets = [offset for offset, _ in headings]
+
+    def label(offset: int) -> str:
+        index = bisect.bisect_right(heading_offsets, offset) - 1
+        if index < 0:
+            name = 'Awal dokumen'
+        else:
+            # Snippets that do not begin at the heading are marked as such
+            name = _LABELS[headings[index][1]] + ('' if heading_offsets[index] == offset else ', lanjutan')
+        index = bisect.bisect_right(offsets, offset) - 1
+        return f'[{name} | Halaman {markers[index][1]}]' if index >= 0 else f'[{name}]'
+
+    def body(start: int, end: int) -> str:
+        # A page marker right before the next heading belongs to that heading's label
+        return _TRAILING_MARKER.sub('', text[start:end].strip())
+
+    # Adjacent snippets form one run; a run is only labelled where it starts
+    # and where a section heading begins inside it, never mid-sentence
+    runs = []
+    for start, end in sorted(chosen):
+        if runs and not _PAGE_MARKER.sub('', text[runs[-1][1]:start]).strip():
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    pieces = []
+    for start, end in runs:
+        cuts = [start] + [offset for offset in heading_offsets if start < offset < end] + [end]
+        pieces.append('\n'.join(
+            f'{label(cut)}\n{body(cut, next_cut)}'
+            for cut, next_cut in zip(cuts, cuts[1:]) if _PAGE_MARKER.sub('', text[cut:next_cut]).strip()
+        ))
+    context = '\n[...]\n'.join(pieces)  # "[...]" only where text was left out
+    if ordered:
+        detected = sorted(ordered, key=lambda item: item[1][0])
+        context = 'Bagian terdeteksi: ' + ', '.join(_LABELS[key] for key, _ in detected) + '\n\n' + context
+    return context
+
@@ -16,9 +16,22 @@ Author: Thesis Project
 
 import os
 import re
-import base64
+import json
+import math
+import time
+import uuid
+import threading
+import bisect
+import hashlib
+import zipfile
+import tempfile
 from io import BytesIO
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from flask import (
+    Flask, render_template, request, jsonify, session, redirect, url_for,
+    Response, stream_with_context, send_file
+)
 from flask_login import LoginManager, current_user, login_required
 from PIL import Image, ImageFile
 ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -27,18 +40,51 @@ import pytesseract
 # Document processing libraries
 from docx import Document
 import PyPDF2
+try:
+    from pdf2image import convert_from_path  # Rasterisasi PDF hasil scan (butuh poppler)
+except ImportError:
+    convert_from_path = None
 
-# Groq AI with Fallback System (supports up to 5 API keys)
-from groq import Groq
 from dotenv import load_dotenv
 
-# Database and Auth
-from models import db, User, History
-from datetime import datetime
-
-# Load environment variables
+# Load environment variables (sebelum modul lokal membaca konfigurasi dari env)
 load_dotenv()
 
+# Groq AI with Fallback System (supports up to 5 API keys)
+from groq_pool import GroqKeyPool
+
+# Word-boundary & stemmed matching (token index)
+from token_index import MATCH_MODES, search_tokens
+
+# Persistent Tesseract worker pool
+from ocr_service import get_ocr_service, OCRBusyError, OCRTimeoutError, OCR_LANG, OCR_POOL_SIZE
+
+# Cache hasil ekstraksi berdasarkan hash isi file
+from extraction_cache import ExtractionCache, make_cache_key, file_digest
+
+# Thumbnail/preview gambar disimpan di disk dan dikirim lewat URL
+from preview_store import PreviewStore
+
+# Cache hasil analisis AI (memory + SQLite) berdasarkan hash teks dokumen + model
+from ai_cache import AIResultCache, make_ai_cache_key
+# Konteks prompt AI (bagian dokumen + match keyword) dan parsing output streaming
+from ai_context import build_ai_context
+from json_stream import JSONObjectStream
+
+# Job batch di background (antrian tersimpan di SQLite)
+from batch_jobs import BatchJobRunner, get_job_results
+
+# Database and Auth
+from models import db, User, History, BatchJob, AIAnalysis
+from datetime import datetime, timedelta
+
+# Rabin-Karp engine (rabin_karp.py)
+from rabin_karp import (
+    rabin_karp_search_multi, rabin_karp_search_stream, compile_pattern,
+    aho_corasick_search, aho_corasick_search_stream, approximate_search_multi,
+    highlight_multi, new_search_stats, get_hash_modulus, DEFAULT_HASH_BACKEND
+)
+
 # Configure Multiple Groq API Keys for Fallback
 # Add your API keys to .env file: GROQ_API_KEY_1, GROQ_API_KEY_2, etc.
 GROQ_API_KEYS = []
@@ -53,21 +99,8 @@ if not GROQ_API_KEYS:
     if single_key:
         GROQ_API_KEYS.append(single_key)
 
-# Track current API key index
-current_api_index = 0
-
-def get_groq_client():
-    """Get Groq client with current API key"""
-    global current_api_index
-    if not GROQ_API_KEYS:
-        return None
-    return Groq(api_key=GROQ_API_KEYS[current_api_index % len(GROQ_API_KEYS)])
-
-def switch_to_next_api():
-    """Switch to next available API key"""
-    global current_api_index
-    current_api_index = (current_api_index + 1) % len(GROQ_API_KEYS)
-    print(f"[FALLBACK] Switching to API key #{current_api_index + 1}")
+# Satu client per key; rotasi key berdasarkan cooldown rate limit (groq_pool.py)
+groq_pool = GroqKeyPool(GROQ_API_KEYS)
 
 # Configure Tesseract path (auto-detect for Docker/Windows)
 import shutil
@@ -111,6 +144,16 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = local_db_path
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Cache ekstraksi disimpan di samping database SQLite (mis. volume /app/data)
+db_uri = app.config['SQLALCHEMY_DATABASE_URI']
+data_dir = os.path.dirname(db_uri.replace('sqlite:///', '')) if db_uri.startswith('sqlite:///') \
+    else os.path.join(basedir, 'instance')
+extraction_cache = ExtractionCache(
+    os.environ.get('EXTRACTION_CACHE_DIR', os.path.join(data_dir, 'extraction_cache'))
+)
+preview_store = PreviewStore(os.environ.get('PREVIEW_DIR', os.path.join(data_dir, 'previews')))
+ai_cache = AIResultCache(os.environ.get('AI_CACHE_PATH', os.path.join(data_dir, 'ai_cache.sqlite3')))
 app.config['PREFERRED_URL_SCHEME'] = 'https'  # Force HTTPS for OAuth redirect URIs
 
 # Initialize Security
@@ -148,7 +191,7 @@ init_google_oauth(app)
 
 
 # ==============================================================================
-# RABIN-KARP ALGORITHM IMPLEMENTATION
+# RABIN-KARP ALGORITHM (implementasi di rabin_karp.py)
 # ==============================================================================
 """
 ALGORITMA RABIN-KARP dengan ROLLING HASH
@@ -183,30 +226,74 @@ UNTUK SIDANG THESIS:
 1. Kompleksitas waktu rata-rata: O(n + m)
 2. Kompleksitas waktu terburuk: O(nm) - saat banyak collision
 3. Digunakan untuk: plagiarism detection, DNA sequence matching, dll.
+
+Implementasi lengkap ada di rabin_karp.py. Setiap keyword di-compile sekali
+(compile_pattern) sehingga hash pattern dan BASE^(m-1) tidak dihitung ulang
+untuk setiap dokumen maupun saat highlight.
 """
 
-# Konstanta untuk Rabin-Karp
-BASE = 256      # Jumlah karakter dalam alfabet ASCII
-PRIME = 101     # Bilangan prima untuk operasi modulo
+# Backend hash untuk engine di rabin_karp.py: 'mersenne61' (default, hampir tanpa
+# spurious hit), 'double', atau 'textbook' (PRIME = 101, hanya untuk perbandingan).
+# Teks >= NUMPY_THRESHOLD memakai engine numpy dengan modulus ganda apa pun
+# backend-nya; search_stats.hash_backend melaporkan backend yang benar-benar dipakai.
+RABIN_KARP_HASH_BACKEND = os.environ.get('RABIN_KARP_HASH_BACKEND', DEFAULT_HASH_BACKEND)
+get_hash_modulus(RABIN_KARP_HASH_BACKEND)  # Validasi saat startup
 
+# Mulai jumlah keyword ini, pencarian memakai automaton Aho-Corasick
+# (satu lintasan linear untuk seluruh kamus) alih-alih Rabin-Karp per panjang
+AHO_CORASICK_MIN_PATTERNS = int(os.environ.get('AHO_CORASICK_MIN_PATTERNS', 16))
 
-# ==============================================================================
-# AI SUMMARY FUNCTION (GROQ)
-# ==============================================================================
 
-def generate_ai_summary(text: str) -> dict:
+# Batas toleransi salah ketik (edit distance) untuk mode approximate
+MAX_EDITS_LIMIT = 3
+
+
+def select_search_engine(pattern_count: int) -> str:
+    """Pilih engine pencarian berdasarkan jumlah keyword."""
+    if pattern_count >= AHO_CORASICK_MIN_PATTERNS:
+        return 'aho-corasick'
+    return 'rabin-karp'
+
+
+def search_keywords(text: str, patterns: list, stats: dict = None) -> dict:
     """
-    Generate AI analysis of journal/academic document quality using Groq.
-    Returns structured JSON for tabs display.
+    Cari semua keyword dalam teks dengan engine yang sesuai jumlah keyword.
     
     Args:
-        text (str): Extracted text from document
+        text (str): Teks yang akan dicari
+        patterns (list): CompiledPattern dari compile_pattern()
+        stats (dict): Counter instrumentasi (new_search_stats)
         
     Returns:
-        dict: Structured journal quality analysis in JSON format
+        dict: {keyword: [posisi]}
     """
-    try:
-        prompt = f"""Anda adalah analis kualitas jurnal akademik profesional.
+    if select_search_engine(len(patterns)) == 'aho-corasick':
+        return aho_corasick_search(text, patterns, stats=stats)
+    return rabin_karp_search_multi(text, patterns, backend=RABIN_KARP_HASH_BACKEND, stats=stats)
+
+
+# ==============================================================================
+# AI SUMMARY FUNCTION (GROQ)
+# ==============================================================================
+
+GROQ_MODEL = os.environ.get('GROQ_MODEL', 'llama-3.1-8b-instant')
+AI_MAX_TOKENS = int(os.environ.get('AI_MAX_TOKENS', 1000))
+
+# Naikkan jika prompt atau pemilihan konteks berubah (hasil cache lama diabaikan)
+AI_PROMPT_VERSION = 3
+
+
+def build_ai_prompt(text: str, match_positions: list = None) -> str:
+    """
+    Prompt analisis kualitas jurnal untuk teks dokumen.
+    
+    Dokumen panjang tidak dipotong di 4500 karakter pertama (sampul dan
+    daftar isi), tetapi dirangkum build_ai_context(): awal dokumen, bagian
+    Abstrak/Metodologi/Kesimpulan/dst. dan konteks di sekitar match keyword,
+    dalam budget token AI_CONTEXT_TOKENS.
+    """
+    context = build_ai_context(text, match_positions)
+    return f"""Anda adalah analis kualitas jurnal akademik profesional.
 
 Analisis dokumen berikut secara objektif dan teknis.
 JANGAN menulis ulang isi dokumen.
@@ -215,7 +302,11 @@ JANGAN meringkas dokumen.
 Gunakan Bahasa Indonesia formal dan akademik.
 
 TEKS DOKUMEN:
-{text[:4500]}
+(Untuk dokumen panjang hanya kutipan yang diberikan. Label seperti
+[Metodologi | Halaman 9] menandai bagian dokumen tempat kutipan berada,
+"[...]" menandai teks yang dilewati, dan "Bagian terdeteksi" mencantumkan
+semua bagian yang ditemukan di dokumen lengkap.)
+{context}
 
 BERIKAN OUTPUT DALAM FORMAT JSON YANG VALID (tanpa markdown code block):
 
@@ -256,70 +347,125 @@ BERIKAN OUTPUT DALAM FORMAT JSON YANG VALID (tanpa markdown code block):
 }}
 
 PENTING: Output harus berupa JSON valid tanpa markdown code block, tanpa backticks, langsung JSON saja."""
+
+
+def ai_cache_key(text: str) -> str:
+    """
+    Key cache analisis AI untuk satu dokumen.
+    
+    Konteks prompt ikut bergantung pada posisi keyword, tetapi analisis
+    kualitas tidak; key diambil dari teks dokumen (+ versi prompt) agar
+    dokumen yang sama dengan keyword lain tetap memakai hasil cache.
+    """
+    return make_ai_cache_key(f'v{AI_PROMPT_VERSION}|{text}', GROQ_MODEL)
+
+
+def get_cached_ai_summary(text: str):
+    """
+    Hasil analisis AI dari cache tanpa memanggil Groq.
+    
+    Returns:
+        dict or None: Format sama dengan generate_ai_summary(), None jika belum ada
+    """
+    cached = ai_cache.get(ai_cache_key(text))
+    return {'success': True, **cached, 'cached': True} if cached is not None else None
+
+
+def ai_response_fields(ai_result: dict) -> dict:
+    """Field ai_* response dari hasil generate_ai_summary()."""
+    success = ai_result.get('success')
+    return {
+        'ai_summary': ai_result.get('summary') if success else None,
+        'ai_parsed': ai_result.get('parsed') if success else None,
+        'ai_is_json': ai_result.get('is_json', False),
+        'ai_cached': ai_result.get('cached', False),
+        'ai_error': ai_result.get('error') if not success else None
+    }
+
+
+def parse_ai_output(ai_text: str) -> dict:
+    """
+    Parse output model sebagai JSON (code block markdown dibuang).
+    
+    Returns:
+        dict: summary, parsed (None jika bukan JSON valid), is_json
+    """
+    try:
+        # Clean potential markdown code blocks
+        clean_text = ai_text.strip()
+        if clean_text.startswith('```'):
+            clean_text = clean_text.split('```')[1]
+            if clean_text.startswith('json'):
+                clean_text = clean_text[4:]
+        if clean_text.endswith('```'):
+            clean_text = clean_text[:-3]
         
-        # Use Groq API with Fallback System
-        max_retries = len(GROQ_API_KEYS) if GROQ_API_KEYS else 1
-        last_error = None
+        return {'summary': ai_text, 'parsed': json.loads(clean_text.strip()), 'is_json': True}
+    except json.JSONDecodeError:
+        return {'summary': ai_text, 'parsed': None, 'is_json': False}
+
+
+def generate_ai_summary(text: str, match_positions: list = None, on_section=None) -> dict:
+    """
+    Generate AI analysis of journal/academic document quality using Groq.
+    Returns structured JSON for tabs display.
+    
+    Parsed results are cached by hash of document text + prompt version +
+    model (ai_cache.py), so a document analysed before is answered without
+    calling Groq again.
+    
+    With on_section the completion is streamed: on_section(key, value) is
+    called for every top-level section (deteksi_struktur, ...) as soon as
+    it is complete. The full text is still validated at the end.
+    
+    Args:
+        text (str): Extracted text from document
+        match_positions (list): Keyword match offsets, used to pick the prompt context
+        on_section (callable): Optional callback for streamed sections
         
-        for attempt in range(max_retries):
-            try:
-                client = get_groq_client()
-                if not client:
-                    raise Exception("No API keys configured")
-                
-                response = client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.2,
-                    max_tokens=1000,
-                    response_format={"type": "json_object"}
-                )
-                
-                ai_text = response.choices[0].message.content
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                last_error = e
-                error_str = str(e).lower()
-                
-                # Check if rate limit error (429)
-                if "rate_limit" in error_str or "429" in error_str or "quota" in error_str:
-                    print(f"[RATE LIMIT] API key #{current_api_index + 1} hit limit, trying next...")
-                    switch_to_next_api()
-                    continue
-                else:
-                    # Other error, don't retry
-                    raise e
+    Returns:
+        dict: Structured journal quality analysis in JSON format
+              ('cached' is True when served from the cache)
+    """
+    try:
+        # Dokumen yang sama (teks + model sama) tidak dikirim ulang ke Groq
+        cache_key = ai_cache_key(text)
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            return {'success': True, **cached, 'cached': True}
+        
+        prompt = build_ai_prompt(text, match_positions)
+        
+        completion = {
+            'model': GROQ_MODEL,
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': 0.2,
+            'max_tokens': AI_MAX_TOKENS
+        }
+        
+        # Key pool: key yang terkena limit di-cooldown, key berikutnya dipakai
+        if on_section is None:
+            response = groq_pool.create_completion(**completion, response_format={"type": "json_object"})
+            ai_text = response.choices[0].message.content
         else:
-            # All APIs exhausted
-            raise Exception(f"All {max_retries} API keys exhausted. Last error: {last_error}")
+            # JSON mode Groq tidak mendukung streaming; prompt sudah meminta JSON murni
+            sections = JSONObjectStream()
+            chunks = []
+            for chunk in groq_pool.create_completion(**completion, stream=True):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                chunks.append(delta)
+                for key, value in sections.feed(delta):
+                    on_section(key, value)
+            ai_text = ''.join(chunks)
         
         # Try to parse JSON, fallback to raw text if fails
-        import json
-        try:
-            # Clean potential markdown code blocks
-            clean_text = ai_text.strip()
-            if clean_text.startswith('```'):
-                clean_text = clean_text.split('```')[1]
-                if clean_text.startswith('json'):
-                    clean_text = clean_text[4:]
-            if clean_text.endswith('```'):
-                clean_text = clean_text[:-3]
-            
-            parsed_json = json.loads(clean_text.strip())
-            return {
-                'success': True,
-                'summary': ai_text,
-                'parsed': parsed_json,
-                'is_json': True
-            }
-        except json.JSONDecodeError:
-            return {
-                'success': True,
-                'summary': ai_text,
-                'parsed': None,
-                'is_json': False
-            }
+        result = parse_ai_output(ai_text)
+        if result['is_json']:
+            # Hanya hasil JSON valid yang di-cache; output rusak dicoba ulang
+            ai_cache.put(cache_key, result, model=GROQ_MODEL)
+        return {'success': True, **result, 'cached': False}
         
     except Exception as e:
         return {
@@ -331,148 +477,328 @@ PENTING: Output harus berupa JSON valid tanpa markdown code block, tanpa backtic
         }
 
 
-def rabin_karp_search(text: str, pattern: str) -> list:
+# Jumlah warna highlight berbeda untuk multi-keyword (lihat .kw-N di CSS)
+HIGHLIGHT_COLORS = 6
+
+
+def highlight_keywords(text: str, keyword_positions: dict) -> str:
     """
-    Implementasi MANUAL Algoritma Rabin-Karp untuk mencari pattern dalam teks.
-    TIDAK menggunakan str.find() atau str.index().
+    Highlight hasil pencarian beberapa keyword sekaligus dalam satu lintasan.
+    Setiap keyword mendapat class warna sendiri ("highlight kw-N"), teks
+    di-escape HTML, dan match yang tumpang tindih digabung.
     
     Args:
-        text (str): Teks yang akan dicari
-        pattern (str): Pattern/keyword yang ingin ditemukan
+        text (str): Teks asli
+        keyword_positions (dict): {keyword: [posisi]} dari rabin_karp_search_multi
         
     Returns:
-        list: Daftar posisi (index) dimana pattern ditemukan
-    """
-    # Handle edge cases
-    if not pattern or not text:
-        return []
-    
-    if len(pattern) > len(text):
-        return []
-    
-    # Case-insensitive search: konversi ke lowercase
-    text_lower = text.lower()
-    pattern_lower = pattern.lower()
-    
-    n = len(text_lower)      # Panjang teks
-    m = len(pattern_lower)   # Panjang pattern
-    
-    positions = []  # List untuk menyimpan posisi yang ditemukan
-    
-    # =========================================================================
-    # LANGKAH 1: Hitung nilai h = BASE^(m-1) mod PRIME
-    # Nilai ini digunakan untuk menghapus digit terdepan saat rolling
-    # =========================================================================
-    h = 1
-    for i in range(m - 1):
-        h = (h * BASE) % PRIME
-    
-    # =========================================================================
-    # LANGKAH 2: Hitung hash awal untuk pattern dan window pertama teks
-    # Menggunakan rumus: H = (c[0]*BASE^(m-1) + c[1]*BASE^(m-2) + ... + c[m-1])
-    # =========================================================================
-    pattern_hash = 0
-    text_hash = 0
-    
-    for i in range(m):
-        # ord() mengkonversi karakter ke nilai ASCII
-        pattern_hash = (BASE * pattern_hash + ord(pattern_lower[i])) % PRIME
-        text_hash = (BASE * text_hash + ord(text_lower[i])) % PRIME
-    
-    # =========================================================================
-    # LANGKAH 3: Slide pattern over text dan bandingkan hash
-    # =========================================================================
-    for i in range(n - m + 1):
-        # Jika hash sama, verifikasi dengan perbandingan karakter
-        # (untuk menghindari false positive akibat collision)
-        if pattern_hash == text_hash:
-            # Verifikasi character-by-character
-            match = True
-            for j in range(m):
-                if text_lower[i + j] != pattern_lower[j]:
-                    match = False
-                    break
-            
-            if match:
-                positions.append(i)
-        
-        # =====================================================================
-        # LANGKAH 4: Hitung hash untuk window berikutnya (Rolling Hash)
-        # Rumus: H_new = ((H_old - leading_char * h) * BASE + trailing_char) mod PRIME
-        # =====================================================================
-        if i < n - m:
-            # Hapus karakter terdepan, geser, dan tambah karakter baru
-            leading_char = ord(text_lower[i])
-            trailing_char = ord(text_lower[i + m])
-            
-            text_hash = (BASE * (text_hash - leading_char * h) + trailing_char) % PRIME
-            
-            # Handle nilai hash negatif
-            if text_hash < 0:
-                text_hash += PRIME
+        str: Teks dengan semua keyword yang sudah di-highlight
+    """
+    css_classes = {
+        kw: f'highlight kw-{i % HIGHLIGHT_COLORS}'
+        for i, kw in enumerate(keyword_positions)
+    }
+    return highlight_multi(text, keyword_positions, css_classes)
+
+
+def parse_keywords(values) -> list:
+    """
+    Normalisasi input keyword menjadi list unik (urutan dipertahankan).
+    Menerima beberapa field 'keyword' sekaligus dan/atau keyword yang
+    dipisah koma, mis. "metodologi, variabel, sampel".
+    
+    Args:
+        values (list): Nilai mentah dari request.form.getlist('keyword')
+        
+    Returns:
+        list: Daftar keyword bersih tanpa duplikat (case-insensitive)
+    """
+    keywords = []
+    seen = set()
+    for value in values:
+        for part in value.split(','):
+            part = part.strip()
+            if part and part.lower() not in seen:
+                seen.add(part.lower())
+                keywords.append(part)
+    return keywords
+
+
+def parse_search_options(form):
+    """
+    Baca opsi pencarian dari form request (dipakai /api/analyze dan /api/search).
+    
+    Args:
+        form: request.form
+        
+    Returns:
+        tuple: (keywords, max_edits, match_mode, error) - error berisi pesan
+               jika input tidak valid, None jika valid
+    """
+    # Keyword bisa lebih dari satu (field berulang atau dipisah koma)
+    keywords = parse_keywords(form.getlist('keyword'))
+    
+    # Mode approximate untuk teks OCR yang noisy: 0 = exact (default)
+    try:
+        max_edits = int(form.get('max_edits', 0) or 0)
+    except ValueError:
+        max_edits = 0
+    max_edits = max(0, min(max_edits, MAX_EDITS_LIMIT))
+    
+    # Mode pencocokan: 'exact' (substring, default), 'word' (kata utuh), 'stem' (kata dasar)
+    match_mode = form.get('match_mode', 'exact').strip().lower() or 'exact'
+    if match_mode not in MATCH_MODES:
+        return keywords, max_edits, match_mode, \
+            f"Mode pencocokan tidak valid. Gunakan: {', '.join(MATCH_MODES)}"
+    
+    return keywords, max_edits, match_mode, None
+
+
+# Mode analisis: 'full' (ekstraksi penuh + ringkasan AI) atau 'relevance'
+# (triase: berhenti begitu keyword mencapai ambang, tanpa ringkasan AI)
+ANALYSIS_MODES = ('full', 'relevance')
+RELEVANCE_REQUIRE = ('any', 'all')
+RELEVANCE_MAX_THRESHOLD = 100
+
+
+def parse_relevance_options(form):
+    """
+    Baca opsi mode relevansi dari form request (/api/analyze dan /api/batch).
+    
+    Form fields:
+        mode      : 'full' (default) atau 'relevance'
+        threshold : jumlah match minimal per keyword (default 1)
+        require   : 'any' (cukup satu keyword, default) atau 'all' (semua keyword)
+    
+    Returns:
+        tuple: (relevance, error) - relevance None untuk mode 'full', dict
+               {'threshold', 'require'} untuk mode 'relevance'
+    """
+    mode = form.get('mode', 'full').strip().lower() or 'full'
+    if mode not in ANALYSIS_MODES:
+        return None, f"Mode analisis tidak valid. Gunakan: {', '.join(ANALYSIS_MODES)}"
+    if mode == 'full':
+        return None, None
+    
+    try:
+        threshold = int(form.get('threshold', 1) or 1)
+    except ValueError:
+        return None, 'Threshold harus berupa angka'
+    threshold = max(1, min(threshold, RELEVANCE_MAX_THRESHOLD))
+    
+    require = form.get('require', 'any').strip().lower() or 'any'
+    if require not in RELEVANCE_REQUIRE:
+        return None, f"Opsi require tidak valid. Gunakan: {', '.join(RELEVANCE_REQUIRE)}"
     
-    return positions
+    return {'threshold': threshold, 'require': require}, None
+
+
+def relevance_reached(counts: dict, relevance: dict) -> bool:
+    """True jika jumlah match {keyword: count} sudah memenuhi ambang mode relevansi."""
+    reached = [count >= relevance['threshold'] for count in counts.values()]
+    if relevance['require'] == 'all':
+        return bool(reached) and all(reached)
+    return any(reached)
 
 
-def highlight_text(text: str, pattern: str) -> str:
+def search_engine_name(max_edits: int, match_mode: str, pattern_count: int) -> str:
+    """Nama engine pencarian untuk search_stats."""
+    if max_edits:
+        return 'myers-approximate'
+    if match_mode != 'exact':
+        return f'token-{match_mode}'
+    return select_search_engine(pattern_count)
+
+
+def run_search(text: str, keywords: list, patterns: list, max_edits: int = 0,
+               match_mode: str = 'exact', stats: dict = None, keyword_positions: dict = None,
+               keyword_pages: dict = None, file_type: str = None) -> dict:
     """
-    Highlight semua kemunculan pattern dalam teks dengan tag HTML <mark>.
-    Menggunakan Rabin-Karp untuk menemukan posisi, bukan str.find().
+    Jalankan pencarian + highlight atas teks yang sudah diekstrak.
     
     Args:
-        text (str): Teks asli
-        pattern (str): Pattern yang akan di-highlight
+        text (str): Teks hasil ekstraksi
+        keywords (list): Keyword dari parse_keywords()
+        patterns (list): CompiledPattern untuk keyword
+        max_edits (int): > 0 untuk approximate matching
+        match_mode (str): 'exact', 'word' atau 'stem'
+        stats (dict): Counter instrumentasi (new_search_stats)
+        keyword_positions (dict): Hasil pencarian streaming PDF (jika sudah ada)
+        keyword_pages (dict): Halaman per keyword dari pencarian streaming
+        file_type (str): 'pdf' agar halaman match dihitung dari marker
         
     Returns:
-        str: Teks dengan pattern yang sudah di-highlight
+        dict: Field response (is_relevant, highlighted_text, match_count,
+              positions, keyword_results, search_stats)
     """
-    positions = rabin_karp_search(text, pattern)
+    if stats is None:
+        stats = new_search_stats()
     
-    if not positions:
-        return text
+    # Cari semua keyword menggunakan Rabin-Karp (satu kali lintasan teks)
+    approximate_matches = {}
+    if max_edits:
+        # Bit-parallel approximate matching (Myers), toleran typo OCR
+        approximate_matches = approximate_search_multi(text, patterns, max_edits)
+        keyword_positions = {
+            kw: [m['position'] for m in matches] for kw, matches in approximate_matches.items()
+        }
+        highlight_spans = {
+            kw: [(m['position'], m['position'] + m['length']) for m in matches]
+            for kw, matches in approximate_matches.items()
+        }
+    elif match_mode != 'exact':
+        # Kata utuh / kata dasar lewat token index (tokenisasi + stemming sekali)
+        highlight_spans = search_tokens(text, keywords, match_mode)
+        keyword_positions = {
+            kw: [start for start, _ in spans] for kw, spans in highlight_spans.items()
+        }
+    else:
+        if keyword_positions is None:
+            keyword_positions = search_keywords(text, patterns, stats=stats)
+        highlight_spans = keyword_positions
     
-    # Build hasil dengan mengganti dari belakang untuk menjaga index
-    result = text
-    pattern_len = len(pattern)
+    if keyword_pages is None:
+        # Teks PDF dari cache/riwayat: halaman diambil dari marker
+        keyword_pages = pages_from_markers(text, keyword_positions) if file_type == 'pdf' else {}
     
-    for pos in sorted(positions, reverse=True):
-        original = result[pos:pos + pattern_len]
-        highlighted = f'<mark class="highlight">{original}</mark>'
-        result = result[:pos] + highlighted + result[pos + pattern_len:]
+    keyword_results = {
+        kw: {'count': len(pos), 'positions': pos, 'found': len(pos) > 0}
+        for kw, pos in keyword_positions.items()
+    }
+    for kw, pages in keyword_pages.items():
+        keyword_results[kw]['pages'] = pages
+    for kw, matches in approximate_matches.items():
+        keyword_results[kw]['matches'] = matches
+    match_count = sum(len(pos) for pos in keyword_positions.values())
     
-    return result
+    return {
+        'is_relevant': match_count > 0,
+        # Highlight teks jika ditemukan
+        'highlighted_text': highlight_keywords(text, highlight_spans),
+        'match_count': match_count,
+        'positions': sorted(set(p for pos in keyword_positions.values() for p in pos)),
+        'keyword_results': keyword_results,
+        'search_stats': dict(
+            stats,
+            engine=search_engine_name(max_edits, match_mode, len(patterns))
+        ),
+    }
 
 
 # ==============================================================================
 # OCR FUNCTION
 # ==============================================================================
 
-def extract_text_from_image(image_data) -> str:
+def extract_text_from_image(image_data, wait: bool = False) -> str:
     """
     Ekstrak teks dari gambar menggunakan Tesseract OCR.
     
+    OCR dijalankan oleh pool worker Tesseract yang hidup lama (ocr_service.py),
+    bukan satu proses tesseract baru per gambar.
+    
     Args:
-        image_data: Data gambar (file atau bytes)
+        image_data: Data gambar (file atau bytes), atau PIL Image yang sudah
+            di-decode (decode_image) agar tidak di-decode ulang
+        wait (bool): Tunggu slot OCR jika antrian penuh (dipakai batch)
         
     Returns:
         str: Teks yang diekstrak dari gambar
+        
+    Raises:
+        OCRBusyError: Antrian OCR penuh (diteruskan agar route membalas 503)
     """
     try:
-        image = Image.open(image_data)
+        image = image_data if isinstance(image_data, Image.Image) else Image.open(image_data)
         
         # Konversi ke RGB jika diperlukan
         if image.mode in ('RGBA', 'P'):
             image = image.convert('RGB')
         
-        # Ekstrak teks dengan Tesseract
-        text = pytesseract.image_to_string(image, lang='eng+ind')
-        
-        return text.strip()
+        # Ekstrak teks dengan Tesseract (via worker pool)
+        ocr = get_ocr_service(tesseract_cmd=pytesseract.pytesseract.tesseract_cmd)
+        return ocr.image_to_string(image, block=wait)
     
+    except (OCRBusyError, OCRTimeoutError):
+        raise
     except Exception as e:
         raise Exception(f"OCR Error: {str(e)}")
 
 
+# Sisi terpanjang gambar untuk OCR dan preview; gambar lebih besar diperkecil
+IMAGE_MAX_SIDE = int(os.environ.get('IMAGE_MAX_SIDE', 2000))
+# Format yang bisa ditampilkan browser apa adanya (preview tanpa encode ulang)
+PREVIEW_PASSTHROUGH_FORMATS = ('JPEG', 'PNG', 'GIF', 'BMP', 'WEBP')
+
+
+def elapsed_ms(started: float) -> float:
+    """Milidetik sejak time.perf_counter() `started`."""
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def decode_image(data: bytes, max_side: int = IMAGE_MAX_SIDE, load: bool = True):
+    """
+    Decode gambar upload satu kali; objek yang sama dipakai untuk OCR dan preview.
+    
+    JPEG yang perlu diperkecil di-decode langsung mendekati skala target
+    lewat draft mode (DCT scaling libjpeg), jadi piksel resolusi penuh tidak
+    pernah dibuat. Sisanya diperkecil dengan LANCZOS.
+    
+    Args:
+        data (bytes): Isi file gambar
+        max_side (int): Sisi terpanjang maksimal
+        load (bool): Decode (dan perkecil) piksel; False jika hanya butuh
+            format, mis. teks dan preview sudah tersimpan
+        
+    Returns:
+        tuple: (image, format asli, resized, timings {'decode_ms', 'resize_ms'})
+    """
+    timings = {}
+    started = time.perf_counter()
+    image = Image.open(BytesIO(data))
+    image_format = image.format
+    width, height = image.size
+    resized = max(width, height) > max_side
+    
+    if load:
+        if resized and image_format == 'JPEG':
+            scale = max_side / max(width, height)
+            image.draft(image.mode, (math.ceil(width * scale), math.ceil(height * scale)))
+        image.load()
+        if image.mode in ('RGBA', 'P'):
+            image = image.convert('RGB')
+    timings['decode_ms'] = elapsed_ms(started)
+    
+    if load and resized:
+        started = time.perf_counter()
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        timings['resize_ms'] = elapsed_ms(started)
+    
+    return image, image_format, resized, timings
+
+
+def encode_full_preview(data: bytes, image, image_format: str, resized: bool):
+    """
+    Bytes preview penuh: bytes asli jika tidak diperkecil dan formatnya
+    didukung browser, selain itu JPEG dari gambar yang sudah di-decode.
+    
+    Returns:
+        tuple: (bytes, format PIL)
+    """
+    if not resized and image_format in PREVIEW_PASSTHROUGH_FORMATS:
+        return data, image_format
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buf = BytesIO()
+    image.save(buf, format='JPEG', quality=85)
+    return buf.getvalue(), 'JPEG'
+
+
+def store_image_preview(key: str, data: bytes, image, image_format: str, resized: bool):
+    """Simpan thumbnail + preview penuh di preview_store (key = hash isi file)."""
+    full_data, full_format = encode_full_preview(data, image, image_format, resized)
+    preview_store.save(key, image, full_data, full_format)
+
+
 def extract_text_from_docx(file_data) -> str:
     """
     Ekstrak teks dari file DOCX.
@@ -505,61 +831,624 @@ def extract_text_from_docx(file_data) -> str:
         raise Exception(f"DOCX Error: {str(e)}")
 
 
-def extract_text_from_pdf(file_data) -> str:
+# Halaman PDF hasil scan (tanpa text layer) dirasterisasi lalu di-OCR
+PDF_OCR_DPI = int(os.environ.get('PDF_OCR_DPI', 300))
+PDF_OCR_WORKERS = int(os.environ.get('PDF_OCR_WORKERS', OCR_POOL_SIZE))
+# Halaman dengan teks lebih pendek dari ini dianggap tidak punya text layer
+PDF_OCR_MIN_CHARS = int(os.environ.get('PDF_OCR_MIN_CHARS', 1))
+# Fallback OCR hanya aktif jika pdf2image dan poppler (pdftoppm) tersedia
+PDF_OCR_ENABLED = convert_from_path is not None and shutil.which('pdftoppm') is not None
+
+
+def ocr_pdf_page(pdf_path: str, page_number: int):
     """
-    Ekstrak teks dari file PDF.
+    Rasterisasi satu halaman PDF (pdf2image/poppler) lalu OCR lewat pool Tesseract.
+    
+    Returns:
+        str: Teks halaman ('' jika halaman memang kosong), None jika
+             rasterisasi/OCR gagal
+    """
+    try:
+        images = convert_from_path(
+            pdf_path, dpi=PDF_OCR_DPI, first_page=page_number, last_page=page_number,
+            grayscale=True
+        )
+        if not images:
+            return None
+        ocr = get_ocr_service(tesseract_cmd=pytesseract.pytesseract.tesseract_cmd)
+        return ocr.image_to_string(images[0], block=True)
+    except Exception as e:
+        print(f"[PDF OCR] Halaman {page_number} gagal di-OCR: {e}")
+        return None
+
+
+def iter_pdf_pages(file_data, pdf_reader=None, ocr_failed_pages: list = None):
+    """
+    Ekstrak teks PDF halaman per halaman (generator).
+    
+    Setiap chunk sudah berisi separator dan marker "--- Halaman N ---",
+    sehingga ''.join() dari semua chunk sama persis dengan hasil
+    extract_text_from_pdf() dan offset hasil pencarian streaming tetap cocok.
+    
+    Halaman tanpa text layer (hasil scan) dirasterisasi dan di-OCR paralel
+    (maksimal PDF_OCR_WORKERS halaman sekaligus), lalu tetap dikeluarkan
+    sesuai urutan halaman.
     
     Args:
         file_data: Data file PDF (BytesIO)
+        pdf_reader: PyPDF2.PdfReader yang sudah dibuka untuk file_data (opsional)
+        ocr_failed_pages (list): Diisi nomor halaman yang gagal di-OCR; teksnya
+            hilang, jadi hasil ekstraksi tidak boleh di-cache
         
-    Returns:
-        str: Teks yang diekstrak
+    Yields:
+        tuple: (nomor_halaman, chunk_teks)
     """
+    pool = None
+    pdf_path = None
+    pending = deque()  # (nomor_halaman, teks atau Future OCR), urut halaman
+    
     try:
-        pdf_reader = PyPDF2.PdfReader(file_data)
-        full_text = []
+        if pdf_reader is None:
+            pdf_reader = PyPDF2.PdfReader(file_data)
+        first = True
+        
+        def ready_pages(wait_all: bool = False):
+            nonlocal first
+            # Keluarkan halaman terdepan yang sudah siap; tunggu OCR terdepan
+            # jika terlalu banyak halaman yang mengantri
+            while pending and (
+                wait_all or not isinstance(pending[0][1], Future) or pending[0][1].done()
+                or len(pending) > PDF_OCR_WORKERS * 2
+            ):
+                page_number, page_text = pending.popleft()
+                if isinstance(page_text, Future):
+                    page_text = page_text.result()
+                    if page_text is None and ocr_failed_pages is not None:
+                        ocr_failed_pages.append(page_number)
+                if page_text:
+                    separator = '' if first else '\n\n'
+                    first = False
+                    yield page_number, f"{separator}--- Halaman {page_number} ---\n{page_text}"
         
         for page_num, page in enumerate(pdf_reader.pages):
             page_text = page.extract_text()
-            if page_text:
-                full_text.append(f"--- Halaman {page_num + 1} ---\n{page_text}")
+            if PDF_OCR_ENABLED and len((page_text or '').strip()) < PDF_OCR_MIN_CHARS:
+                if pool is None:
+                    # Simpan PDF sekali ke file sementara untuk pdftoppm
+                    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+                        tmp.write(file_data.getvalue())
+                        pdf_path = tmp.name
+                    pool = ThreadPoolExecutor(max_workers=max(1, PDF_OCR_WORKERS))
+                pending.append((page_num + 1, pool.submit(ocr_pdf_page, pdf_path, page_num + 1)))
+            else:
+                pending.append((page_num + 1, page_text))
+            yield from ready_pages()
         
-        return '\n\n'.join(full_text)
+        yield from ready_pages(wait_all=True)
     
     except Exception as e:
         raise Exception(f"PDF Error: {str(e)}")
+    
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if pdf_path:
+            try:
+                os.remove(pdf_path)
+            except OSError:
+                pass
 
 
-def get_file_type(filename: str) -> str:
-    """Menentukan tipe file berdasarkan ekstensi."""
-    if not filename:
-        return 'unknown'
-    ext = filename.lower().rsplit('.', 1)[-1] if '.' in filename else ''
-    if ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
-        return 'image'
-    elif ext in ['doc', 'docx']:
-        return 'docx'
-    elif ext == 'pdf':
-        return 'pdf'
-    return 'unknown'
+def extract_text_from_pdf(file_data, ocr_failed_pages: list = None) -> str:
+    """
+    Ekstrak teks dari file PDF.
+    
+    Args:
+        file_data: Data file PDF (BytesIO)
+        ocr_failed_pages (list): Diisi nomor halaman yang gagal di-OCR
+        
+    Returns:
+        str: Teks yang diekstrak
+    """
+    return ''.join(chunk for _, chunk in iter_pdf_pages(file_data, ocr_failed_pages=ocr_failed_pages))
 
 
-# ==============================================================================
-# FLASK ROUTES
-# ==============================================================================
+def search_pdf_stream(file_data, patterns: list, stats: dict = None, ocr_failed_pages: list = None):
+    """
+    Ekstrak PDF sambil mencari keyword per halaman (streaming Rabin-Karp).
+    
+    Pencarian berjalan saat halaman diekstrak, sehingga tidak perlu menyimpan
+    salinan lowercase seluruh dokumen. Match yang terpotong pergantian
+    halaman tetap ditemukan.
+    
+    Args:
+        file_data: Data file PDF (BytesIO)
+        patterns (list): CompiledPattern dari compile_pattern()
+        stats (dict): Counter instrumentasi (new_search_stats)
+        ocr_failed_pages (list): Diisi nomor halaman yang gagal di-OCR
+        
+    Returns:
+        tuple: (extracted_text, {keyword: [posisi]}, {keyword: [halaman]})
+    """
+    chunks = []
+    keyword_positions = {p.pattern: [] for p in patterns}
+    keyword_pages = {p.pattern: [] for p in patterns}
+    
+    def pages():
+        for page_number, chunk in iter_pdf_pages(file_data, ocr_failed_pages=ocr_failed_pages):
+            chunks.append(chunk)
+            yield page_number, chunk
+    
+    if select_search_engine(len(patterns)) == 'aho-corasick':
+        matches = aho_corasick_search_stream(pages(), patterns, stats=stats)
+    else:
+        matches = rabin_karp_search_stream(pages(), patterns, backend=RABIN_KARP_HASH_BACKEND, stats=stats)
+    for match in matches:
+        keyword_positions[match['pattern']].append(match['position'])
+        if match['page'] not in keyword_pages[match['pattern']]:
+            keyword_pages[match['pattern']].append(match['page'])
+    
+    return ''.join(chunks), keyword_positions, keyword_pages
 
-@app.route('/robots.txt')
-def robots():
-    return app.send_static_file('robots.txt')
 
-@app.route('/sitemap.xml')
-def sitemap():
-    return app.send_static_file('sitemap.xml')
+PAGE_MARKER = re.compile(r'--- Halaman (\d+) ---\n')
 
-@app.route('/')
-def index():
-    """Render halaman utama."""
-    return render_template('index.html')
+
+def pages_from_markers(text: str, keyword_positions: dict) -> dict:
+    """
+    Hitung halaman tiap match dari marker "--- Halaman N ---" pada teks PDF.
+    
+    Dipakai saat teks PDF diambil dari cache, sehingga `pages` di response
+    tetap sama dengan hasil search_pdf_stream().
+    
+    Returns:
+        dict: {keyword: [halaman]}
+    """
+    markers = [(m.start(), int(m.group(1))) for m in PAGE_MARKER.finditer(text)]
+    offsets = [start for start, _ in markers]
+    keyword_pages = {}
+    for kw, positions in keyword_positions.items():
+        pages = []
+        for pos in positions:
+            index = bisect.bisect_right(offsets, pos) - 1
+            if index >= 0 and markers[index][1] not in pages:
+                pages.append(markers[index][1])
+        keyword_pages[kw] = pages
+    return keyword_pages
+
+
+def iter_cached_pdf_pages(text: str):
+    """
+    Pecah teks PDF (dari cache) kembali menjadi chunk per halaman pada marker
+    "--- Halaman N ---", dengan offset yang sama seperti iter_pdf_pages().
+    
+    Yields:
+        tuple: (nomor_halaman, chunk_teks)
+    """
+    markers = [(m.start(), int(m.group(1))) for m in PAGE_MARKER.finditer(text)]
+    if not markers:
+        if text:
+            yield 1, text
+        return
+    for index, (start, page_number) in enumerate(markers):
+        start = 0 if index == 0 else start
+        end = markers[index + 1][0] if index + 1 < len(markers) else len(text)
+        yield page_number, text[start:end]
+
+
+def iter_page_matches(pages, keywords: list, patterns: list, max_edits: int = 0,
+                      match_mode: str = 'exact', stats: dict = None):
+    """
+    Cari keyword halaman demi halaman; match dikeluarkan segera setelah
+    halamannya diproses, sehingga pemanggil bisa berhenti lebih awal.
+    
+    Mode exact memakai pencarian streaming (match yang terpotong pergantian
+    halaman tetap ditemukan). Mode approximate/word/stem mencari tiap
+    halaman secara terpisah.
+    
+    Args:
+        pages: Iterable (nomor_halaman, chunk_teks), mis. iter_pdf_pages()
+        
+    Yields:
+        tuple: (keyword, posisi absolut, nomor_halaman)
+    """
+    if not max_edits and match_mode == 'exact':
+        if select_search_engine(len(patterns)) == 'aho-corasick':
+            matches = aho_corasick_search_stream(pages, patterns, stats=stats)
+        else:
+            matches = rabin_karp_search_stream(pages, patterns, backend=RABIN_KARP_HASH_BACKEND, stats=stats)
+        for match in matches:
+            yield match['pattern'], match['position'], match['page']
+        return
+    
+    offset = 0
+    for page_number, chunk in pages:
+        if max_edits:
+            found = {
+                kw: [m['position'] for m in matches]
+                for kw, matches in approximate_search_multi(chunk, patterns, max_edits).items()
+            }
+        else:
+            found = {
+                kw: [start for start, _ in spans]
+                for kw, spans in search_tokens(chunk, keywords, match_mode).items()
+            }
+        for kw, positions in found.items():
+            for pos in positions:
+                yield kw, offset + pos, page_number
+        offset += len(chunk)
+
+
+def screen_pdf(file_bytes: BytesIO, filename: str, keywords: list, patterns: list, relevance: dict,
+               max_edits: int = 0, match_mode: str = 'exact', cached_text: str = None,
+               cache_key: str = None, stats: dict = None):
+    """
+    Mode relevansi untuk PDF: halaman diekstrak secara lazy dan langsung
+    dicari; begitu ambang keyword tercapai, ekstraksi (dan OCR halaman scan
+    yang masih mengantri) dihentikan. Ringkasan AI tidak dijalankan.
+    
+    Args:
+        relevance (dict): {'threshold', 'require'} dari parse_relevance_options()
+        cached_text (str): Teks lengkap dari cache ekstraksi, jika ada
+        
+    Returns:
+        tuple: (payload response, extracted_text) - extracted_text berisi teks
+               lengkap jika semua halaman terbaca, '' jika berhenti lebih awal
+               (teks parsial tidak disimpan ke cache maupun History)
+    """
+    if stats is None:
+        stats = new_search_stats()
+    ocr_failed_pages = []
+    try:
+        pdf_reader = PyPDF2.PdfReader(file_bytes)
+        total_pages = len(pdf_reader.pages)
+    except Exception as e:
+        raise Exception(f"PDF Error: {str(e)}")
+    
+    if cached_text is not None:
+        source = iter_cached_pdf_pages(cached_text)
+    else:
+        source = iter_pdf_pages(file_bytes, pdf_reader, ocr_failed_pages)
+    chunks = []
+    last_page = 0
+    
+    def pages():
+        nonlocal last_page
+        for page_number, chunk in source:
+            chunks.append(chunk)
+            last_page = page_number
+            yield page_number, chunk
+    
+    keyword_positions = {kw: [] for kw in keywords}
+    keyword_pages = {kw: [] for kw in keywords}
+    early_exit = False
+    try:
+        for kw, pos, page in iter_page_matches(pages(), keywords, patterns, max_edits, match_mode, stats):
+            keyword_positions.setdefault(kw, []).append(pos)
+            pages_found = keyword_pages.setdefault(kw, [])
+            if page not in pages_found:
+                pages_found.append(page)
+            if relevance_reached({k: len(v) for k, v in keyword_positions.items()}, relevance):
+                early_exit = True
+                break
+    finally:
+        # Hentikan ekstraksi: OCR halaman yang belum berjalan dibatalkan
+        source.close()
+    
+    # Halaman tanpa teks tidak menghasilkan chunk; jika tidak berhenti
+    # lebih awal, semua halaman dianggap sudah terbaca
+    pages_scanned = last_page if early_exit else total_pages
+    complete = not early_exit
+    # Halaman yang gagal di-OCR hilang dari teks: jangan di-cache
+    cacheable = complete and not ocr_failed_pages
+    extracted_text = ''.join(chunks)
+    if cacheable and cached_text is None:
+        extraction_cache.put(cache_key, extracted_text)
+    
+    counts = {kw: len(pos) for kw, pos in keyword_positions.items()}
+    return {
+        'success': True,
+        'mode': 'relevance',
+        'is_relevant': relevance_reached(counts, relevance),
+        'match_count': sum(counts.values()),
+        'positions': sorted(set(p for pos in keyword_positions.values() for p in pos)),
+        'keyword_results': {
+            kw: {'count': len(pos), 'positions': pos, 'found': len(pos) > 0, 'pages': keyword_pages[kw]}
+            for kw, pos in keyword_positions.items()
+        },
+        'relevance': {
+            **relevance,
+            'early_exit': early_exit,
+            'stopped_at_page': last_page if early_exit else None,
+            'pages_scanned': pages_scanned,
+            'pages_skipped': total_pages - pages_scanned,
+            'total_pages': total_pages
+        },
+        'search_stats': dict(
+            stats,
+            engine=search_engine_name(max_edits, match_mode, len(patterns))
+        ),
+        'keyword': ', '.join(keywords),
+        'keywords': keywords,
+        'max_edits': max_edits,
+        'match_mode': match_mode,
+        'extraction_cached': cached_text is not None,
+        # Teks parsial tidak masuk cache, jadi hanya bisa dicari ulang jika
+        # teks lengkap sudah ada di cache
+        'document_token': cache_key if cacheable or cached_text is not None else None,
+        'ocr_failed_pages': ocr_failed_pages,
+        'image_preview': None,
+        'image_preview_full': None,
+        'file_type': 'pdf',
+        'filename': filename,
+        'ai_status': 'skipped',
+        'ai_summary': None,
+        'ai_parsed': None,
+        'ai_is_json': False,
+        'ai_error': None
+    }, extracted_text if complete else ''
+
+
+def get_file_type(filename: str) -> str:
+    """Menentukan tipe file berdasarkan ekstensi."""
+    if not filename:
+        return 'unknown'
+    ext = filename.lower().rsplit('.', 1)[-1] if '.' in filename else ''
+    if ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
+        return 'image'
+    elif ext in ['doc', 'docx']:
+        return 'docx'
+    elif ext == 'pdf':
+        return 'pdf'
+    return 'unknown'
+
+
+# ==============================================================================
+# DOCUMENT PIPELINE (dipakai /api/analyze dan /api/batch)
+# ==============================================================================
+
+def process_document(file_bytes: BytesIO, filename: str, keywords: list, max_edits: int = 0,
+                     match_mode: str = 'exact', ocr_wait: bool = False, relevance: dict = None,
+                     run_ai: bool = True):
+    """
+    Proses satu dokumen: ekstraksi teks (dengan cache), pencarian keyword,
+    highlight, dan ringkasan AI.
+    
+    Dengan `relevance` (mode triase), PDF diproses oleh screen_pdf() yang
+    berhenti begitu ambang keyword tercapai, dan ringkasan AI dilewati untuk
+    semua tipe file.
+    
+    Tidak memakai request/current_user, sehingga aman dijalankan di thread
+    worker batch. Penyimpanan History dilakukan oleh pemanggil.
+    
+    Args:
+        file_bytes (BytesIO): Isi file yang diunggah
+        filename (str): Nama file (menentukan tipe file)
+        keywords (list): Keyword dari parse_keywords()
+        max_edits (int): > 0 untuk approximate matching
+        match_mode (str): 'exact', 'word' atau 'stem'
+        ocr_wait (bool): Tunggu slot OCR alih-alih langsung OCRBusyError
+        relevance (dict): Opsi mode relevansi dari parse_relevance_options(),
+            None untuk analisis penuh
+        run_ai (bool): False untuk melewati panggilan Groq; hasil dari cache AI
+            tetap dipakai, selain itu ai_status 'pending' dan pemanggil
+            menjadwalkan schedule_ai_analysis()
+        
+    Returns:
+        tuple: (payload response, extracted_text) - extracted_text None jika
+               tipe file tidak didukung (payload berisi 'success': False)
+    """
+    file_type = get_file_type(filename)
+    
+    # Compile keyword sekali untuk pencarian dan highlight
+    search_stats = new_search_stats()
+    patterns = [compile_pattern(kw, RABIN_KARP_HASH_BACKEND) for kw in keywords]
+    keyword_positions = None  # Diisi langsung oleh pencarian streaming (PDF)
+    keyword_pages = None
+    ocr_failed_pages = []  # Halaman PDF hasil scan yang gagal di-OCR
+    
+    # Cache ekstraksi: file yang sama (hash isi) tidak di-OCR/parse ulang
+    cache_key = None
+    cached_text = None
+    if file_type in ('image', 'docx', 'pdf'):
+        # Halaman PDF hasil scan ikut di-OCR, jadi bahasa & DPI OCR ikut menentukan hasil
+        ocr_setting = OCR_LANG if file_type == 'image' else \
+            f'{OCR_LANG}@{PDF_OCR_DPI}dpi' if file_type == 'pdf' and PDF_OCR_ENABLED else None
+        cache_key = make_cache_key(file_bytes.getvalue(), file_type, ocr_setting)
+        cached_text = extraction_cache.get(cache_key)
+    
+    if relevance and file_type == 'pdf':
+        return screen_pdf(
+            file_bytes, filename, keywords, patterns, relevance, max_edits, match_mode,
+            cached_text=cached_text, cache_key=cache_key, stats=search_stats
+        )
+    
+    # Ekstrak teks berdasarkan tipe file
+    timings = None
+    file_preview_full = None
+    if file_type == 'image':
+        # Decode sekali; gambar yang sama dipakai untuk OCR dan preview
+        data = file_bytes.getvalue()
+        # Upload ulang file yang sama: teks & preview sudah ada, piksel tidak perlu di-decode
+        preview_key = file_digest(data)
+        preview_stored = preview_store.touch(preview_key)
+        image, image_format, resized, timings = decode_image(
+            data, load=cached_text is None or not preview_stored
+        )
+        
+        if cached_text is not None:
+            extracted_text = cached_text
+        else:
+            started = time.perf_counter()
+            extracted_text = extract_text_from_image(image, wait=ocr_wait)
+            timings['ocr_ms'] = elapsed_ms(started)
+        
+        # Preview dikirim sebagai URL (thumbnail kecil), bukan base64 di JSON
+        started = time.perf_counter()
+        if not preview_stored:
+            store_image_preview(preview_key, data, image, image_format, resized)
+        file_preview = f'/preview/{preview_key}/thumb'
+        file_preview_full = f'/preview/{preview_key}/full'
+        timings['preview_ms'] = elapsed_ms(started)
+        
+    elif file_type == 'docx':
+        if cached_text is not None:
+            extracted_text = cached_text
+        else:
+            extracted_text = extract_text_from_docx(file_bytes)
+        file_preview = None  # Tidak ada preview untuk dokumen
+        
+    elif file_type == 'pdf':
+        if cached_text is not None:
+            extracted_text = cached_text
+        elif max_edits or match_mode != 'exact':
+            extracted_text = extract_text_from_pdf(file_bytes, ocr_failed_pages)
+        else:
+            # Ekstraksi + pencarian per halaman dalam satu lintasan
+            extracted_text, keyword_positions, keyword_pages = search_pdf_stream(
+                file_bytes, patterns, stats=search_stats, ocr_failed_pages=ocr_failed_pages
+            )
+        file_preview = None  # Tidak ada preview untuk PDF
+        
+    else:
+        return {
+            'success': False, 
+            'error': 'Tipe file tidak didukung. Gunakan: JPG, PNG, DOCX, atau PDF'
+        }, None
+    
+    # Teks dengan halaman yang gagal di-OCR tidak di-cache, agar upload ulang mencoba lagi
+    if cached_text is None and not ocr_failed_pages:
+        extraction_cache.put(cache_key, extracted_text)
+    
+    if not extracted_text:
+        return {
+            'success': True,
+            'mode': 'relevance' if relevance else 'full',
+            'is_relevant': False,
+            'extracted_text': '(Tidak ada teks yang terdeteksi)',
+            'highlighted_text': '(Tidak ada teks yang terdeteksi)',
+            'match_count': 0,
+            'positions': [],
+            'keyword': ', '.join(keywords),
+            'keywords': keywords,
+            'keyword_results': {
+                kw: {'count': 0, 'positions': [], 'found': False} for kw in keywords
+            },
+            'image_preview': None,
+            'image_preview_full': None,
+            'timings': timings,
+            'ocr_failed_pages': ocr_failed_pages,
+            'file_type': file_type,
+            'filename': filename,
+            'ai_status': 'skipped'
+        }, extracted_text
+    
+    result = run_search(
+        extracted_text, keywords, patterns, max_edits, match_mode, stats=search_stats,
+        keyword_positions=keyword_positions, keyword_pages=keyword_pages,
+        file_type=file_type
+    )
+    
+    if relevance:
+        # Gambar/DOCX tidak punya halaman: teks lengkap dicari, AI dilewati
+        result['is_relevant'] = relevance_reached(
+            {kw: info['count'] for kw, info in result['keyword_results'].items()}, relevance
+        )
+        result['relevance'] = {
+            **relevance,
+            'early_exit': False,
+            'stopped_at_page': None,
+            'pages_scanned': None,
+            'pages_skipped': 0,
+            'total_pages': None
+        }
+        ai_result = {'success': False, 'error': None}
+        ai_status = 'skipped'
+    elif run_ai:
+        # Generate AI Summary
+        ai_result = generate_ai_summary(extracted_text, result['positions'])
+        ai_status = 'done' if ai_result.get('success') else 'failed'
+    else:
+        # Analisis AI dijalankan di background oleh pemanggil, kecuali sudah di cache
+        ai_result = get_cached_ai_summary(extracted_text)
+        ai_status = 'done' if ai_result else 'pending'
+        ai_result = ai_result or {'success': False, 'error': None}
+    
+    return {
+        'success': True,
+        'mode': 'relevance' if relevance else 'full',
+        'extracted_text': extracted_text,
+        **result,
+        'keyword': ', '.join(keywords),
+        'keywords': keywords,
+        'max_edits': max_edits,
+        'match_mode': match_mode,
+        'extraction_cached': cached_text is not None,
+        # Durasi tiap tahap pipeline gambar (decode, resize, OCR, preview)
+        'timings': timings,
+        # Untuk pencarian ulang lewat /api/search tanpa upload ulang
+        'document_token': cache_key if cached_text is not None or not ocr_failed_pages else None,
+        # Halaman PDF yang teksnya hilang karena OCR gagal
+        'ocr_failed_pages': ocr_failed_pages,
+        'image_preview': file_preview,
+        'image_preview_full': file_preview_full,
+        'file_type': file_type,
+        'filename': filename,
+        'ai_status': ai_status,
+        **ai_response_fields(ai_result)
+    }, extracted_text
+
+
+def save_history(filename: str, file_type: str, extracted_text: str, ai_summary: str = None,
+                 user_id: int = None):
+    """
+    Simpan hasil analisis ke History jika user login.
+    
+    Args:
+        user_id (int): Pemilik history; default user yang sedang login
+                       (wajib diisi dari worker background tanpa request)
+    
+    Returns:
+        int: id History baru, None untuk guest atau jika gagal disimpan
+    """
+    if user_id is None:
+        if not current_user.is_authenticated:
+            return None
+        user_id = current_user.id
+    try:
+        new_history = History(
+            user_id=user_id,
+            filename=filename,
+            file_type=file_type.upper(),
+            extracted_text=extracted_text,
+            ai_summary=ai_summary,
+            created_at=datetime.utcnow()
+        )
+        db.session.add(new_history)
+        db.session.commit()
+        return new_history.id
+    except Exception as e:
+        db.session.rollback()
+        print(f"Failed to save history: {e}")
+        return None
+
+
+# ==============================================================================
+# FLASK ROUTES
+# ==============================================================================
+
+@app.route('/robots.txt')
+def robots():
+    return app.send_static_file('robots.txt')
+
+@app.route('/sitemap.xml')
+def sitemap():
+    return app.send_static_file('sitemap.xml')
+
+@app.route('/')
+def index():
+    """Render halaman utama."""
+    return render_template('index.html')
 
 
 @app.route('/pricing')
@@ -743,6 +1632,47 @@ def use_batch_limit():
 
 
 
+def verify_turnstile():
+    """
+    Verifikasi Cloudflare Turnstile untuk guest.
+    Dilewati jika user login, sesi sudah terverifikasi, atau berjalan di localhost.
+    
+    Returns:
+        tuple (response, status) jika verifikasi gagal, None jika lolos
+    """
+    is_localhost = request.host.startswith('127.0.0.1') or request.host.startswith('localhost')
+    
+    if not current_user.is_authenticated and not session.get('is_human_verified') and not is_localhost:
+        turnstile_token = request.form.get('cf-turnstile-response')
+        if not turnstile_token:
+            return jsonify({'success': False, 'error': 'Verifikasi keamanan gagal (Token missing). Silakan refresh halaman.'}), 400
+
+        # Verify token with Cloudflare
+        try:
+            import requests
+            secret_key = os.environ.get('TURNSTILE_SECRET_KEY', '0x4AAAAAACH9KxS6HutyBiLRk8STEbKs-j8')
+            verify_response = requests.post(
+                'https://challenges.cloudflare.com/turnstile/v0/siteverify',
+                data={
+                    'secret': secret_key,
+                    'response': turnstile_token,
+                    'remoteip': request.remote_addr
+                }
+            ).json()
+
+            if not verify_response.get('success'):
+                return jsonify({'success': False, 'error': 'Verifikasi keamanan gagal. Silakan coba lagi.'}), 400
+            
+            # Mark session as verified
+            session['is_human_verified'] = True
+            
+        except Exception as e:
+            # Fallback if verification api fails
+            pass
+    
+    return None
+
+
 @app.route('/api/analyze', methods=['POST'])
 @csrf.exempt
 @limiter.limit("20 per minute")
@@ -775,156 +1705,744 @@ def analyze():
                 }), 429
         
         # Authenticated users:
-        # For batch processing, the limit is checked separately via /api/batch-limit/use (10/day)
+        # For batch processing, the limit is charged once per request by /api/batch (10/day)
         # For single document processing (OCR/Parse), it is explicitly UNLIMITED for logged-in users.
         # So we do NOT perform any limit check here for authenticated users.
 
         
         # Cloudflare Turnstile Verification
-        # Skip if user is logged in, already verified in session, OR running in development mode
-        is_localhost = request.host.startswith('127.0.0.1') or request.host.startswith('localhost')
+        turnstile_error = verify_turnstile()
+        if turnstile_error:
+            return turnstile_error
         
-        if not current_user.is_authenticated and not session.get('is_human_verified') and not is_localhost:
-            turnstile_token = request.form.get('cf-turnstile-response')
-            if not turnstile_token:
-                return jsonify({'success': False, 'error': 'Verifikasi keamanan gagal (Token missing). Silakan refresh halaman.'}), 400
-
-            # Verify token with Cloudflare
-            try:
-                import requests
-                secret_key = os.environ.get('TURNSTILE_SECRET_KEY', '0x4AAAAAACH9KxS6HutyBiLRk8STEbKs-j8')
-                verify_response = requests.post(
-                    'https://challenges.cloudflare.com/turnstile/v0/siteverify',
-                    data={
-                        'secret': secret_key,
-                        'response': turnstile_token,
-                        'remoteip': request.remote_addr
-                    }
-                ).json()
-
-                if not verify_response.get('success'):
-                    return jsonify({'success': False, 'error': 'Verifikasi keamanan gagal. Silakan coba lagi.'}), 400
-                
-                # Mark session as verified
-                session['is_human_verified'] = True
-                
-            except Exception as e:
-                # Fallback if verification api fails
-                pass
-
-        keyword = request.form.get('keyword', '').strip()
+        keywords, max_edits, match_mode, error = parse_search_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        relevance, error = parse_relevance_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        # Analisis AI default di background; ai=sync menunggu hasil Groq
+        sync_ai = request.form.get('ai', 'async').strip().lower() == 'sync'
         
         if uploaded_file.filename == '':
             return jsonify({'success': False, 'error': 'Tidak ada file yang dipilih'}), 400
         
-        if not keyword:
+        if not keywords:
             return jsonify({'success': False, 'error': 'Variabel riset tidak boleh kosong'}), 400
         
         # Tentukan tipe file
         filename = uploaded_file.filename
-        file_type = get_file_type(filename)
         file_bytes = BytesIO(uploaded_file.read())
         
-        # Ekstrak teks berdasarkan tipe file
-        if file_type == 'image':
-            # Optimize image
-            file_bytes.seek(0)
-            img = Image.open(file_bytes)
-            if img.mode == 'RGBA':
-                img = img.convert('RGB')
-            
-            # Resize if too large
-            if img.width > 2000 or img.height > 2000:
-                img.thumbnail((2000, 2000), Image.Resampling.LANCZOS)
-                # Save optimized to buffer
-                buf = BytesIO()
-                img.save(buf, format='JPEG', quality=85)
-                file_bytes = BytesIO(buf.getvalue())
-            
-            file_bytes.seek(0)
-            extracted_text = extract_text_from_image(file_bytes)
-            # Generate preview untuk gambar
-            file_bytes.seek(0)
-            image_base64 = base64.b64encode(file_bytes.read()).decode('utf-8')
-            file_bytes.seek(0)
-            img = Image.open(file_bytes)
-            mime = f"image/{img.format.lower()}" if img.format else "image/png"
-            file_preview = f"data:{mime};base64,{image_base64}"
-            
-        elif file_type == 'docx':
-            extracted_text = extract_text_from_docx(file_bytes)
-            file_preview = None  # Tidak ada preview untuk dokumen
-            
-        elif file_type == 'pdf':
-            extracted_text = extract_text_from_pdf(file_bytes)
-            file_preview = None  # Tidak ada preview untuk PDF
-            
+        payload, extracted_text = process_document(
+            file_bytes, filename, keywords, max_edits, match_mode, relevance=relevance,
+            run_ai=sync_ai
+        )
+        if not payload['success']:
+            return jsonify(payload), 400
+        
+        # Save to History if User is Authenticated
+        if extracted_text:
+            payload['history_id'] = save_history(
+                filename, payload['file_type'], extracted_text, payload.get('ai_summary')
+            )
+        
+        # Hasil pencarian dikirim sekarang; analisis AI menyusul (polling/SSE)
+        if payload.get('ai_status') == 'pending':
+            payload.update(schedule_ai_analysis(
+                extracted_text, payload['positions'], history_id=payload.get('history_id'),
+                user_id=current_user.id if current_user.is_authenticated else None
+            ))
+        
+        return jsonify(payload)
+        
+    except OCRBusyError as e:
+        # Backpressure: antrian OCR penuh, klien diminta mencoba lagi
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except OCRTimeoutError as e:
+        return jsonify({'success': False, 'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+# Batas batch server-side: jumlah file per request dan thread pemroses
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 50))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))
+
+# Batas upload batch & arsip ZIP (menjaga memori container 1 GB).
+# /api/batch memproses semua file di memori, job background menulis ke disk
+BATCH_MAX_UPLOAD_MB = int(os.environ.get('BATCH_MAX_UPLOAD_MB', 200))
+BATCH_MAX_TOTAL_MB = int(os.environ.get('BATCH_MAX_TOTAL_MB', 100))
+BATCH_JOB_MAX_FILES = int(os.environ.get('BATCH_JOB_MAX_FILES', 300))
+BATCH_JOB_MAX_TOTAL_MB = int(os.environ.get('BATCH_JOB_MAX_TOTAL_MB', 1024))
+ZIP_MAX_MEMBERS = int(os.environ.get('ZIP_MAX_MEMBERS', 500))
+ZIP_MAX_MEMBER_MB = int(os.environ.get('ZIP_MAX_MEMBER_MB', 16))
+
+
+class BatchUploadError(ValueError):
+    """Upload batch melanggar batas jumlah/ukuran file atau arsip tidak valid."""
+
+
+def iter_zip_members(uploaded_file, skipped: list):
+    """
+    Baca isi arsip ZIP satu per satu langsung dari stream upload (tanpa
+    menyalin arsip lagi ke disk).
+    
+    Member yang bukan dokumen/gambar, terlalu besar, atau terenkripsi
+    dilewati dan dicatat di `skipped`.
+    
+    Yields:
+        tuple: (nama_member, bytes)
+    """
+    member_limit = ZIP_MAX_MEMBER_MB * 1024 * 1024
+    try:
+        archive = zipfile.ZipFile(uploaded_file.stream)
+    except zipfile.BadZipFile:
+        raise BatchUploadError(f'{uploaded_file.filename}: arsip ZIP tidak valid')
+    
+    with archive:
+        members = archive.infolist()
+        if len(members) > ZIP_MAX_MEMBERS:
+            raise BatchUploadError(
+                f'{uploaded_file.filename}: maksimal {ZIP_MAX_MEMBERS} file dalam satu ZIP'
+            )
+        for info in members:
+            name = info.filename
+            basename = name.rsplit('/', 1)[-1]
+            if info.is_dir() or name.startswith('__MACOSX/') or basename.startswith('.'):
+                continue
+            if get_file_type(basename) == 'unknown':
+                skipped.append({'filename': name, 'reason': 'Tipe file tidak didukung'})
+                continue
+            if info.file_size > member_limit:
+                skipped.append({'filename': name, 'reason': f'Lebih dari {ZIP_MAX_MEMBER_MB} MB'})
+                continue
+            try:
+                with archive.open(info) as member:
+                    # Batas baca juga melindungi dari ukuran yang dipalsukan (zip bomb)
+                    data = member.read(member_limit + 1)
+            except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                skipped.append({'filename': name, 'reason': f'Gagal dibaca: {e}'})
+                continue
+            if len(data) > member_limit:
+                skipped.append({'filename': name, 'reason': f'Lebih dari {ZIP_MAX_MEMBER_MB} MB'})
+                continue
+            yield name, data
+
+
+def iter_batch_uploads(uploaded_files: list, max_files: int, max_total_bytes: int, skipped: list):
+    """
+    Gabungkan file upload biasa dan isi arsip ZIP menjadi satu aliran file.
+    File dengan isi yang sama (hash SHA-256) hanya diproses sekali.
+    
+    Args:
+        uploaded_files (list): FileStorage dari request.files
+        max_files (int): Batas jumlah file setelah ZIP dibuka
+        max_total_bytes (int): Batas total ukuran file
+        skipped (list): Diisi {'filename', 'reason'} untuk file yang dilewati
+        
+    Yields:
+        tuple: (filename, bytes)
+        
+    Raises:
+        BatchUploadError: Batas jumlah/ukuran terlampaui atau ZIP tidak valid
+    """
+    seen = set()
+    count = 0
+    total_bytes = 0
+    
+    for uploaded in uploaded_files:
+        if uploaded.filename.lower().endswith('.zip'):
+            entries = iter_zip_members(uploaded, skipped)
         else:
+            entries = [(uploaded.filename, uploaded.read())]
+        
+        for filename, data in entries:
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen:
+                skipped.append({'filename': filename, 'reason': 'Duplikat'})
+                continue
+            seen.add(digest)
+            count += 1
+            total_bytes += len(data)
+            if count > max_files:
+                raise BatchUploadError(f'Maksimal {max_files} file per batch')
+            if total_bytes > max_total_bytes:
+                raise BatchUploadError(
+                    f'Total ukuran file melebihi {max_total_bytes // (1024 * 1024)} MB per batch'
+                )
+            yield filename, data
+
+
+def get_batch_uploads():
+    """FileStorage batch dari field 'files'/'file' (batas upload lebih besar dari /api/analyze)."""
+    request.max_content_length = BATCH_MAX_UPLOAD_MB * 1024 * 1024
+    return [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+
+
+def charge_batch_quota():
+    """
+    Potong kuota 'batch' satu kali (UsageLimit untuk user, GuestUsageLimit per IP).
+    
+    Returns:
+        tuple: (allowed, remaining, limit, message)
+    """
+    from models import UsageLimit, GuestUsageLimit
+    
+    if not current_user.is_authenticated:
+        ip_address = request.remote_addr or '0.0.0.0'
+        usage = GuestUsageLimit.get_or_create(ip_address, 'batch')
+        allowed, remaining, message = usage.check_and_increment()
+        return allowed, remaining, GuestUsageLimit.DAILY_LIMIT, message
+    
+    usage = UsageLimit.get_or_create(current_user.id, 'batch')
+    allowed, remaining, message = usage.check_and_increment()
+    return allowed, remaining, UsageLimit.BATCH_DAILY_LIMIT, message
+
+
+def process_batch_file(filename: str, data: bytes, keywords: list, max_edits: int, match_mode: str,
+                       relevance: dict = None):
+    """Proses satu file batch; error per file tidak menggagalkan seluruh batch."""
+    try:
+        payload, extracted_text = process_document(
+            BytesIO(data), filename, keywords, max_edits, match_mode, ocr_wait=True,
+            relevance=relevance
+        )
+    except Exception as e:
+        payload, extracted_text = {'success': False, 'error': str(e)}, None
+    payload['filename'] = filename
+    return payload, extracted_text
+
+
+@app.route('/api/batch', methods=['POST'])
+@csrf.exempt
+@limiter.limit("10 per minute")
+def batch_analyze():
+    """
+    Analisis banyak file dengan satu set keyword dalam satu request.
+    
+    Ekstraksi + pencarian + ringkasan AI tiap file berjalan paralel di thread
+    pool (OCR diteruskan ke pool proses Tesseract). Kuota 'batch' dipotong
+    satu kali per request, bukan per file.
+    
+    Form fields:
+        files   : beberapa file (field berulang)
+        keyword : keyword (berulang atau dipisah koma), max_edits, match_mode
+        mode    : 'full' atau 'relevance' (+ threshold, require)
+    """
+    try:
+        uploaded_files = get_batch_uploads()
+        if not uploaded_files:
+            return jsonify({'success': False, 'error': 'Tidak ada file yang diunggah'}), 400
+        
+        keywords, max_edits, match_mode, error = parse_search_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        relevance, error = parse_relevance_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        if not keywords:
+            return jsonify({'success': False, 'error': 'Variabel riset tidak boleh kosong'}), 400
+        
+        turnstile_error = verify_turnstile()
+        if turnstile_error:
+            return turnstile_error
+        
+        # Buka ZIP, dedupe, dan cek batas sebelum kuota dipotong
+        skipped = []
+        files = list(iter_batch_uploads(
+            uploaded_files, BATCH_MAX_FILES, BATCH_MAX_TOTAL_MB * 1024 * 1024, skipped
+        ))
+        if not files:
             return jsonify({
-                'success': False, 
-                'error': 'Tipe file tidak didukung. Gunakan: JPG, PNG, DOCX, atau PDF'
+                'success': False, 'error': 'Tidak ada file yang bisa diproses', 'skipped': skipped
             }), 400
         
-        if not extracted_text:
+        allowed, remaining, limit, message = charge_batch_quota()
+        if not allowed:
             return jsonify({
-                'success': True,
-                'is_relevant': False,
-                'extracted_text': '(Tidak ada teks yang terdeteksi)',
-                'highlighted_text': '(Tidak ada teks yang terdeteksi)',
-                'match_count': 0,
-                'positions': [],
-                'image_preview': None,
-                'file_type': file_type,
-                'filename': filename
-            })
+                'success': False,
+                'error': message,
+                'limit_reached': True,
+                'remaining': 0,
+                'limit': limit
+            }), 429
         
-        # Cari keyword menggunakan Rabin-Karp
-        positions = rabin_karp_search(extracted_text, keyword)
-        is_relevant = len(positions) > 0
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_WORKERS, len(files)))) as pool:
+            outcomes = list(pool.map(
+                lambda item: process_batch_file(
+                    item[0], item[1], keywords, max_edits, match_mode, relevance
+                ),
+                files
+            ))
         
-        # Highlight teks jika ditemukan
-        highlighted_text = highlight_text(extracted_text, keyword) if is_relevant else extracted_text
+        results = []
+        for payload, extracted_text in outcomes:
+            if extracted_text:
+                payload['history_id'] = save_history(
+                    payload['filename'], payload['file_type'], extracted_text, payload.get('ai_summary')
+                )
+            results.append(payload)
         
-        # Generate AI Summary
-        ai_result = generate_ai_summary(extracted_text)
+        relevant_count = sum(1 for r in results if r.get('success') and r.get('is_relevant'))
+        failed_count = sum(1 for r in results if not r.get('success'))
         
-        # Save to History if User is Authenticated
-        if current_user.is_authenticated:
-            try:
-                new_history = History(
-                    user_id=current_user.id,
-                    filename=filename,
-                    file_type=file_type.upper(),
-                    extracted_text=extracted_text,
-                    ai_summary=ai_result.get('summary') if ai_result.get('success') else None,
-                    created_at=datetime.utcnow()
-                )
-                db.session.add(new_history)
-                db.session.commit()
-            except Exception as e:
-                print(f"Failed to save history: {e}")
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'relevant_count': relevant_count,
+            'not_relevant_count': len(results) - relevant_count - failed_count,
+            'failed_count': failed_count,
+            'skipped': skipped,
+            'mode': 'relevance' if relevance else 'full',
+            'keyword': ', '.join(keywords),
+            'keywords': keywords,
+            'remaining': remaining,
+            'limit': limit
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+DOCUMENT_TOKEN_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+@app.route('/api/search', methods=['POST'])
+@csrf.exempt
+@limiter.limit("120 per minute")
+def search_document():
+    """
+    Cari ulang keyword pada teks yang sudah pernah diekstrak, tanpa upload
+    dan OCR ulang. Hanya menjalankan pencarian + highlight.
+    
+    Sumber teks (salah satu):
+        history_id     : id riwayat milik user yang sedang login
+        document_token : 'document_token' dari response /api/analyze
+    
+    Opsi pencarian sama dengan /api/analyze: keyword, max_edits, match_mode.
+    """
+    try:
+        keywords, max_edits, match_mode, error = parse_search_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        if not keywords:
+            return jsonify({'success': False, 'error': 'Variabel riset tidak boleh kosong'}), 400
+        
+        history_id = request.form.get('history_id', '').strip()
+        document_token = request.form.get('document_token', '').strip().lower()
+        filename = None
+        file_type = None
+        
+        if history_id:
+            if not current_user.is_authenticated:
+                return jsonify({'success': False, 'error': 'Login diperlukan untuk mencari di riwayat'}), 401
+            history = History.query.filter_by(
+                id=int(history_id) if history_id.isdigit() else -1, user_id=current_user.id
+            ).first()
+            if history is None:
+                return jsonify({'success': False, 'error': 'Riwayat tidak ditemukan'}), 404
+            extracted_text = history.extracted_text or ''
+            filename = history.filename
+            file_type = (history.file_type or '').lower()
+        elif document_token:
+            extracted_text = None
+            if DOCUMENT_TOKEN_PATTERN.match(document_token):
+                extracted_text = extraction_cache.get(document_token)
+            if extracted_text is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Dokumen tidak ditemukan atau sudah kedaluwarsa. Silakan unggah ulang.'
+                }), 404
+            file_type = 'pdf' if PAGE_MARKER.search(extracted_text) else None
+        else:
+            return jsonify({'success': False, 'error': 'history_id atau document_token wajib diisi'}), 400
+        
+        search_stats = new_search_stats()
+        patterns = [compile_pattern(kw, RABIN_KARP_HASH_BACKEND) for kw in keywords]
+        result = run_search(
+            extracted_text, keywords, patterns, max_edits, match_mode,
+            stats=search_stats, file_type=file_type
+        )
         
         return jsonify({
             'success': True,
-            'is_relevant': is_relevant,
-            'extracted_text': extracted_text,
-            'highlighted_text': highlighted_text,
-            'match_count': len(positions),
-            'positions': positions,
-            'keyword': keyword,
-            'image_preview': file_preview,
-            'file_type': file_type,
+            **result,
+            'keyword': ', '.join(keywords),
+            'keywords': keywords,
+            'max_edits': max_edits,
+            'match_mode': match_mode,
             'filename': filename,
-            'ai_summary': ai_result.get('summary') if ai_result.get('success') else None,
-            'ai_parsed': ai_result.get('parsed') if ai_result.get('success') else None,
-            'ai_is_json': ai_result.get('is_json', False),
-            'ai_error': ai_result.get('error') if not ai_result.get('success') else None
+            'history_id': int(history_id) if history_id else None,
+            'document_token': document_token or None
         })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+PREVIEW_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# Isi URL preview tidak pernah berubah (key = hash isi file)
+PREVIEW_CACHE_SECONDS = 365 * 24 * 3600
+
+
+@app.route('/preview/<key>/<variant>', methods=['GET'])
+@limiter.limit("300 per minute")
+def image_preview(key, variant):
+    """
+    Thumbnail ('thumb') atau preview penuh ('full') gambar yang dianalisis.
+    
+    Key adalah hash SHA-256 isi file, sehingga hanya bisa diketahui oleh
+    pengunggah dan response aman di-cache lama oleh browser.
+    """
+    stored = preview_store.get(key, variant) if PREVIEW_KEY_PATTERN.match(key) else None
+    if stored is None:
+        return jsonify({'success': False, 'error': 'Preview tidak ditemukan atau sudah kedaluwarsa'}), 404
+    path, mimetype = stored
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    response.headers['Cache-Control'] = f'private, max-age={PREVIEW_CACHE_SECONDS}, immutable'
+    return response
+
+
+# ==============================================================================
+# BATCH JOB (BACKGROUND) API
+# ==============================================================================
+
+# Lama satu koneksi SSE; di bawah --timeout gunicorn, browser otomatis
+# menyambung ulang dan melanjutkan dari Last-Event-ID
+SSE_MAX_SECONDS = int(os.environ.get('SSE_MAX_SECONDS', 60))
+SSE_POLL_SECONDS = 1.0
+# Satu koneksi SSE menahan satu thread worker selama SSE_MAX_SECONDS, jadi
+# butuh worker gunicorn ber-thread (gthread, seperti di Dockerfile/Procfile).
+# Dengan worker sync set SSE_ENABLED=false: halaman memakai polling.
+SSE_ENABLED = os.environ.get('SSE_ENABLED', 'true').lower() == 'true'
+
+
+def run_batch_job_file(job, filename: str, data: bytes, owns_claim) -> dict:
+    """
+    Proses satu file job batch di worker background (tanpa request context).
+    
+    History hanya disimpan selama worker ini masih memegang klaim file;
+    jika klaim sudah diambil alih, hasilnya dibuang oleh BatchJobRunner.
+    """
+    payload, extracted_text = process_batch_file(
+        filename, data, json.loads(job.keywords), job.max_edits, job.match_mode,
+        json.loads(job.relevance) if job.relevance else None
+    )
+    if extracted_text and job.user_id and owns_claim():
+        payload['history_id'] = save_history(
+            filename, payload['file_type'], extracted_text, payload.get('ai_summary'),
+            user_id=job.user_id
+        )
+    # Teks mentah tidak disimpan di database job (cukup di History/cache).
+    # URL preview juga tidak: PreviewStore menghapusnya setelah PREVIEW_TTL_HOURS,
+    # sedangkan hasil job bisa dibaca lebih lama (halaman batch memakai file lokal)
+    for field in ('extracted_text', 'image_preview', 'image_preview_full'):
+        payload.pop(field, None)
+    return payload
+
+
+batch_job_runner = BatchJobRunner(app, os.path.join(data_dir, 'batch_jobs'), run_batch_job_file)
+batch_job_runner.start()
+
+
+def get_accessible_job(job_id: str):
+    """BatchJob jika boleh diakses: job id berfungsi sebagai token, job milik user hanya untuk user tsb."""
+    job = db.session.get(BatchJob, job_id) if re.fullmatch(r'[0-9a-f]{32}', job_id or '') else None
+    if job is None:
+        return None
+    if job.user_id and (not current_user.is_authenticated or current_user.id != job.user_id):
+        return None
+    return job
+
+
+@app.route('/api/batch/jobs', methods=['POST'])
+@csrf.exempt
+@limiter.limit("10 per minute")
+def create_batch_job():
+    """
+    Buat job batch di background dan langsung kembalikan job_id.
+    
+    Input sama dengan /api/batch (termasuk mode=relevance). Progress dan
+    hasil per file dikirim lewat SSE di /api/batch/jobs/<job_id>/events,
+    atau bisa di-poll lewat GET /api/batch/jobs/<job_id>.
+    """
+    try:
+        uploaded_files = get_batch_uploads()
+        if not uploaded_files:
+            return jsonify({'success': False, 'error': 'Tidak ada file yang diunggah'}), 400
+        
+        keywords, max_edits, match_mode, error = parse_search_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        relevance, error = parse_relevance_options(request.form)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        if not keywords:
+            return jsonify({'success': False, 'error': 'Variabel riset tidak boleh kosong'}), 400
+        
+        turnstile_error = verify_turnstile()
+        if turnstile_error:
+            return turnstile_error
         
+        # File (termasuk isi ZIP) ditulis ke disk satu per satu; job ditahan
+        # sampai kuota berhasil dipotong
+        skipped = []
+        job = batch_job_runner.submit(
+            iter_batch_uploads(
+                uploaded_files, BATCH_JOB_MAX_FILES, BATCH_JOB_MAX_TOTAL_MB * 1024 * 1024, skipped
+            ),
+            keywords, max_edits, match_mode,
+            user_id=current_user.id if current_user.is_authenticated else None,
+            hold=True, relevance=relevance
+        )
+        
+        allowed, remaining, limit, message = charge_batch_quota()
+        if not allowed:
+            batch_job_runner.discard(job)
+            return jsonify({
+                'success': False,
+                'error': message,
+                'limit_reached': True,
+                'remaining': 0,
+                'limit': limit
+            }), 429
+        batch_job_runner.activate(job)
+        
+        return jsonify({
+            'success': True,
+            **job.to_dict(),
+            'events_url': url_for('batch_job_events', job_id=job.id) if SSE_ENABLED else None,
+            'skipped': skipped,
+            'keywords': keywords,
+            'remaining': remaining,
+            'limit': limit
+        }), 202
+    
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+@app.route('/api/batch/jobs/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    """Status job batch beserta semua hasil file yang sudah selesai (polling)."""
+    job = get_accessible_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    results = sorted((result for _, result in get_job_results(job.id)), key=lambda r: r.get('position', 0))
+    return jsonify({'success': True, **job.to_dict(), 'results': results})
+
+
+@app.route('/api/batch/jobs/<job_id>/events', methods=['GET'])
+def batch_job_events(job_id):
+    """
+    Server-Sent Events progress job batch.
+    
+    Events:
+        file     : hasil satu file (id event = urutan selesai)
+        progress : status job (processed/total)
+        done     : job selesai, koneksi ditutup
+    """
+    if not SSE_ENABLED:
+        return jsonify({'success': False, 'error': 'SSE tidak aktif, gunakan polling'}), 404
+    job = get_accessible_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or '0'
+    last_sequence = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    def sse(event: str, data: dict, event_id: int = None) -> str:
+        message = f"event: {event}\n"
+        if event_id is not None:
+            message += f"id: {event_id}\n"
+        return message + f"data: {json.dumps(data)}\n\n"
+    
+    def stream():
+        sequence = last_sequence
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        yield "retry: 2000\n\n"
+        while True:
+            db.session.expire_all()
+            current = db.session.get(BatchJob, job_id)
+            for sequence, result in get_job_results(job_id, after_sequence=sequence):
+                yield sse('file', result, event_id=sequence)
+            yield sse('progress', current.to_dict())
+            if current.status == 'done':
+                yield sse('done', current.to_dict())
+                return
+            if time.monotonic() >= deadline:
+                return  # Browser menyambung ulang dengan Last-Event-ID
+            db.session.commit()  # Lepas transaksi baca selama menunggu
+            time.sleep(SSE_POLL_SECONDS)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ==============================================================================
+# ANALISIS AI (BACKGROUND)
+# ==============================================================================
+
+# Thread pemanggil Groq per proses web; worker gunicorn tidak ikut tertahan
+AI_ANALYSIS_WORKERS = int(os.environ.get('AI_ANALYSIS_WORKERS', 2))
+# Analisis 'pending' lebih lama dari ini dianggap hilang (mis. worker restart)
+AI_ANALYSIS_TIMEOUT = int(os.environ.get('AI_ANALYSIS_TIMEOUT', 300))
+
+ai_executor = ThreadPoolExecutor(max_workers=max(1, AI_ANALYSIS_WORKERS), thread_name_prefix='ai-analysis')
+
+# Membangunkan stream SSE di proses yang sama begitu ada bagian baru. Notifikasi
+# tidak menyeberang proses: stream di worker lain membaca ulang database paling
+# lambat tiap SSE_POLL_SECONDS, dan tanpa SSE halaman mem-polling ai_sections
+ai_progress = threading.Condition()
+
+
+def save_ai_sections(analysis_id: str, sections: dict):
+    """Simpan bagian hasil AI yang sudah lengkap selama analisis masih 'pending'."""
+    with app.app_context():
+        try:
+            AIAnalysis.query.filter_by(id=analysis_id, status='pending').update(
+                {'result': json.dumps({'ai_sections': sections})}, synchronize_session=False
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[AI] Gagal menyimpan progres analisis {analysis_id}: {e}")
+            return
+    with ai_progress:
+        ai_progress.notify_all()
+
+
+def run_ai_analysis(analysis_id: str, text: str, match_positions: list = None):
+    """
+    Jalankan generate_ai_summary() di background dan simpan hasilnya (juga ke History).
+    
+    Output Groq di-stream; setiap bagian JSON yang selesai langsung disimpan
+    sebagai ai_sections agar bisa ditampilkan sebelum analisis lengkap.
+    """
+    sections = {}
+    
+    def on_section(key, value):
+        sections[key] = value
+        save_ai_sections(analysis_id, sections)
+    
+    ai_result = generate_ai_summary(text, match_positions, on_section=on_section)
+    with app.app_context():
+        try:
+            analysis = db.session.get(AIAnalysis, analysis_id)
+            if analysis is None or analysis.status != 'pending':
+                return
+            analysis.status = 'done' if ai_result.get('success') else 'failed'
+            analysis.result = json.dumps(ai_response_fields(ai_result))
+            analysis.finished_at = datetime.utcnow()
+            if analysis.history_id and ai_result.get('success'):
+                History.query.filter_by(id=analysis.history_id).update(
+                    {'ai_summary': ai_result.get('summary')}, synchronize_session=False
+                )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[AI] Gagal menyimpan analisis {analysis_id}: {e}")
+    with ai_progress:
+        ai_progress.notify_all()
+
+
+def schedule_ai_analysis(text: str, match_positions: list = None, history_id: int = None,
+                         user_id: int = None) -> dict:
+    """
+    Simpan AIAnalysis 'pending' dan jadwalkan panggilan Groq di background.
+    
+    Returns:
+        dict: analysis_id beserta URL polling dan SSE untuk response
+    """
+    analysis = AIAnalysis(id=uuid.uuid4().hex, user_id=user_id, history_id=history_id, status='pending')
+    db.session.add(analysis)
+    db.session.commit()
+    ai_executor.submit(run_ai_analysis, analysis.id, text, match_positions)
+    return {
+        'analysis_id': analysis.id,
+        'analysis_url': url_for('get_ai_analysis', analysis_id=analysis.id),
+        'analysis_events_url': url_for('ai_analysis_events', analysis_id=analysis.id) if SSE_ENABLED else None
+    }
+
+
+def get_accessible_analysis(analysis_id: str):
+    """AIAnalysis jika boleh diakses (aturan sama dengan get_accessible_job)."""
+    analysis = db.session.get(AIAnalysis, analysis_id) \
+        if re.fullmatch(r'[0-9a-f]{32}', analysis_id or '') else None
+    if analysis is None:
+        return None
+    if analysis.user_id and (not current_user.is_authenticated or current_user.id != analysis.user_id):
+        return None
+    if analysis.status == 'pending' and \
+            analysis.created_at < datetime.utcnow() - timedelta(seconds=AI_ANALYSIS_TIMEOUT):
+        analysis.status = 'failed'
+        analysis.result = json.dumps(ai_response_fields(
+            {'success': False, 'error': 'Analisis AI tidak selesai. Silakan coba lagi.'}
+        ))
+        analysis.finished_at = datetime.utcnow()
+        db.session.commit()
+    return analysis
+
+
+@app.route('/api/analysis/<analysis_id>', methods=['GET'])
+@limiter.limit("120 per minute")
+def get_ai_analysis(analysis_id):
+    """Status dan hasil analisis AI (polling)."""
+    analysis = get_accessible_analysis(analysis_id)
+    if analysis is None:
+        return jsonify({'success': False, 'error': 'Analisis tidak ditemukan'}), 404
+    return jsonify({'success': True, **analysis.to_dict()})
+
+
+@app.route('/api/analysis/<analysis_id>/events', methods=['GET'])
+@limiter.limit("60 per minute")
+def ai_analysis_events(analysis_id):
+    """
+    Server-Sent Events hasil analisis AI.
+    
+    Events:
+        section : satu bagian hasil yang sudah lengkap ({key, value}), dikirim
+                  selama output Groq masih di-stream
+        done    : analisis selesai (ai_status 'done' atau 'failed'), koneksi ditutup
+    """
+    if not SSE_ENABLED:
+        return jsonify({'success': False, 'error': 'SSE tidak aktif, gunakan polling'}), 404
+    if get_accessible_analysis(analysis_id) is None:
+        return jsonify({'success': False, 'error': 'Analisis tidak ditemukan'}), 404
+    
+    def stream():
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        sent = set()
+        yield "retry: 2000\n\n"
+        while True:
+            db.session.expire_all()
+            current = get_accessible_analysis(analysis_id)
+            if current.status != 'pending':
+                yield f"event: done\ndata: {json.dumps(current.to_dict())}\n\n"
+                return
+            for key, value in (current.to_dict().get('ai_sections') or {}).items():
+                if key not in sent:
+                    sent.add(key)
+                    yield f"event: section\ndata: {json.dumps({'key': key, 'value': value})}\n\n"
+            if time.monotonic() >= deadline:
+                return  # Browser menyambung ulang otomatis
+            db.session.commit()  # Lepas transaksi baca selama menunggu
+            yield ": menunggu\n\n"
+            with ai_progress:
+                ai_progress.wait(SSE_POLL_SECONDS)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # ==============================================================================
 # ADMIN PANEL ROUTES
 # ==============================================================================
@@ -952,6 +2470,24 @@ def admin_dashboard():
     return render_template('admin.html', users=users)
 
 
+@app.route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    """Counter hit/miss cache ekstraksi dan cache AI (per proses worker)."""
+    return jsonify({
+        'success': True,
+        'extraction_cache': dict(extraction_cache.stats),
+        'ai_cache': ai_cache.snapshot()
+    })
+
+
+@app.route('/admin/groq-status')
+@admin_required
+def admin_groq_status():
+    """Status key pool Groq: cooldown, sisa kuota, dan circuit breaker (per proses worker)."""
+    return jsonify({'success': True, **groq_pool.snapshot()})
+
+
 @app.route('/admin/user/<int:user_id>/toggle-active', methods=['POST'])
 @admin_required
 @csrf.exempt
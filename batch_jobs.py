@@ -0,0 +1,425 @@
+"""
+Batch Jobs (Persisted Background Queue)
+=======================================
+Large batches do not fit inside one HTTP request (gunicorn --timeout 120).
+A batch is stored as a BatchJob with one BatchJobFile row per uploaded file,
+and background worker threads in every web process pick files up:
+
+    - the SQLite database is the queue: a file is claimed with an atomic
+      UPDATE ... WHERE status='pending', so several processes never take
+      the same file
+    - a local queue.Queue wakes idle workers as soon as a job is submitted;
+      otherwise they poll the database every BATCH_JOB_POLL_SECONDS
+    - every claim carries a token ("host:pid:token"); a heartbeat thread
+      refreshes claimed_at while the file is processed, and the result is
+      only stored while the claim is still held
+    - files left 'running' by a worker that died (restart, crash, OOM) are
+      put back to 'pending' once their heartbeat stopped for longer than
+      the lease, or right away when the claiming process no longer exists
+      (or is this process, which no longer holds the claim). A slow file
+      keeps its heartbeat and is never handed to a second worker.
+
+Configuration (environment):
+    BATCH_JOB_WORKERS        worker threads per web process (default 2)
+    BATCH_JOB_POLL_SECONDS   database poll interval (default 2)
+    BATCH_JOB_LEASE_SECONDS  claim lifetime without heartbeat before a file is
+                             retried (default 300)
+    BATCH_JOB_MAX_ATTEMPTS   tries per file before it is marked failed (default 3)
+"""
+
+import json
+import os
+import queue
+import shutil
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, BatchJob, BatchJobFile
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BATCH_JOB_WORKERS = int(os.environ.get('BATCH_JOB_WORKERS', 2))
+BATCH_JOB_POLL_SECONDS = float(os.environ.get('BATCH_JOB_POLL_SECONDS', 2))
+BATCH_JOB_LEASE_SECONDS = float(os.environ.get('BATCH_JOB_LEASE_SECONDS', 300))
+BATCH_JOB_MAX_ATTEMPTS = int(os.environ.get('BATCH_JOB_MAX_ATTEMPTS', 3))
+
+
+def _claim_owner(claimed_by: str) -> tuple:
+    """(host, pid) of a claim "host:pid:token"; pid is '' when malformed."""
+    host, pid = ((claimed_by or '').split(':') + ['', ''])[:2]
+    return host, pid if pid.isdigit() else ''
+
+
+def _is_own_process(claimed_by: str) -> bool:
+    return _claim_owner(claimed_by) == (socket.gethostname(), str(os.getpid()))
+
+
+def _process_alive(claimed_by: str):
+    """
+    Whether a process with the claim's pid exists on this host.
+
+    The pid may have been reused (e.g. by a restarted container), so True
+    is not proof that the claim is still being worked on.
+
+    Returns:
+        bool: for a claim made on this host, None when that cannot be
+            checked (another host)
+    """
+    host, pid = _claim_owner(claimed_by)
+    if host != socket.gethostname() or not pid:
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+class BatchJobRunner:
+    """
+    Background worker threads processing BatchJobFile rows.
+
+    Args:
+        app: Flask app (workers run inside its app context)
+        storage_dir (str): Directory for uploaded files of pending jobs
+        process_file (callable): process_file(job, filename, data, owns_claim)
+            -> dict result payload; must not rely on the request context.
+            owns_claim() tells whether this worker still holds the file and
+            is checked before side effects such as saving History
+        workers (int): Worker threads per process
+    """
+
+    def __init__(self, app, storage_dir: str, process_file, workers: int = BATCH_JOB_WORKERS,
+                 poll_seconds: float = BATCH_JOB_POLL_SECONDS,
+                 lease_seconds: float = BATCH_JOB_LEASE_SECONDS,
+                 max_attempts: int = BATCH_JOB_MAX_ATTEMPTS):
+        self.app = app
+        self.storage_dir = storage_dir
+        self.process_file = process_file
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self._wakeup = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._last_recovery = 0.0
+        self._active = {}  # claim -> BatchJobFile.id of files being processed here
+
+    @property
+    def worker_id(self) -> str:
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Start the worker threads once per process (safe to call repeatedly)."""
+        with self._lock:
+            if self._pid == os.getpid() or self.workers <= 0:
+                return
+            self._pid = os.getpid()
+            self._threads = []
+            self._active = {}
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'batch-job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat_loop, name='batch-job-heartbeat', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self, count: int = 1):
+        """Wake idle workers in this process (new files were queued)."""
+        for _ in range(max(1, min(count, self.workers))):
+            self._wakeup.put(None)
+
+    # ------------------------------------------------------------ submission
+
+    def submit(self, files, keywords: list, max_edits: int = 0, match_mode: str = 'exact',
+               user_id: int = None, hold: bool = False, relevance: dict = None) -> BatchJob:
+        """
+        Persist a new job and its files, then wake the workers.
+
+        Files are written to disk one at a time, so `files` may be a generator
+        (e.g. members streamed out of a ZIP upload).
+
+        Args:
+            files (iterable): (filename, bytes) pairs
+            keywords (list): Keyword list
+            user_id (int): Owner, None for guests
+            hold (bool): Store the files but keep them out of the queue until
+                activate() is called (e.g. after the quota is charged)
+            relevance (dict): Relevance-mode options, None for full analysis
+
+        Returns:
+            BatchJob
+
+        Raises:
+            ValueError: when `files` yields nothing
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.storage_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+
+        job = BatchJob(
+            id=job_id, user_id=user_id, status='held' if hold else 'queued',
+            keywords=json.dumps(keywords), max_edits=max_edits, match_mode=match_mode,
+            relevance=json.dumps(relevance) if relevance else None
+        )
+        db.session.add(job)
+        try:
+            total = 0
+            for position, (filename, data) in enumerate(files):
+                path = os.path.join(job_dir, str(position))
+                with open(path, 'wb') as f:
+                    f.write(data)
+                db.session.add(BatchJobFile(
+                    job_id=job_id, position=position, filename=filename, file_path=path,
+                    status='held' if hold else 'pending'
+                ))
+                total += 1
+            if total == 0:
+                raise ValueError('Tidak ada file yang bisa diproses')
+            job.total_files = total
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        if not hold:
+            self.start()
+            self.notify(total)
+        return job
+
+    def activate(self, job: BatchJob):
+        """Release a held job to the workers."""
+        BatchJobFile.query.filter_by(job_id=job.id, status='held').update(
+            {'status': 'pending'}, synchronize_session=False
+        )
+        job.status = 'queued'
+        db.session.commit()
+        self.start()
+        self.notify(job.total_files)
+
+    def discard(self, job: BatchJob):
+        """Delete a held job and its stored files."""
+        BatchJobFile.query.filter_by(job_id=job.id).delete(synchronize_session=False)
+        db.session.delete(job)
+        db.session.commit()
+        shutil.rmtree(os.path.join(self.storage_dir, job.id), ignore_errors=True)
+
+    # --------------------------------------------------------------- workers
+
+    def _worker_loop(self):
+        while True:
+            try:
+                self._wakeup.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                pass
+            try:
+                with self.app.app_context():
+                    self._recover_stale()
+                    while True:
+                        job_file = self._claim_next()
+                        if job_file is None:
+                            break
+                        self._run(job_file)
+            except Exception as e:
+                print(f"[BATCH JOB] Worker error: {e}")
+                time.sleep(self.poll_seconds)
+
+    def _claim_next(self):
+        """Atomically claim the oldest pending file, or return None."""
+        while True:
+            candidate = BatchJobFile.query.filter_by(status='pending') \
+                .order_by(BatchJobFile.id).first()
+            if candidate is None:
+                db.session.commit()
+                return None
+            claim = f'{self.worker_id}:{uuid.uuid4().hex[:12]}'
+            # Registered before the commit: recovery in this process never
+            # sees our own claim without it
+            with self._lock:
+                self._active[claim] = candidate.id
+            claimed = BatchJobFile.query.filter_by(id=candidate.id, status='pending').update({
+                'status': 'running',
+                'claimed_by': claim,
+                'claimed_at': datetime.utcnow(),
+                'attempts': BatchJobFile.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed == 1:
+                db.session.refresh(candidate)
+                return candidate
+            with self._lock:
+                self._active.pop(claim, None)
+
+    def _run(self, job_file: BatchJobFile):
+        claim = job_file.claimed_by
+        try:
+            job = db.session.get(BatchJob, job_file.job_id)
+            if job.status == 'queued':
+                BatchJob.query.filter_by(id=job.id, status='queued').update(
+                    {'status': 'running'}, synchronize_session=False
+                )
+                db.session.commit()
+
+            try:
+                with open(job_file.file_path, 'rb') as f:
+                    data = f.read()
+                result = self.process_file(job, job_file.filename, data,
+                                           lambda: self._owns_claim(job_file.id, claim))
+            except Exception as e:
+                result = {'success': False, 'error': str(e), 'filename': job_file.filename}
+            self._finish(job_file, result, claim)
+        finally:
+            with self._lock:
+                self._active.pop(claim, None)
+
+    def _owns_claim(self, file_id: int, claim: str) -> bool:
+        owned = BatchJobFile.query.filter_by(id=file_id, status='running', claimed_by=claim).count() == 1
+        db.session.commit()
+        return owned
+
+    def _heartbeat_loop(self):
+        """Refresh claimed_at of the files this process is working on."""
+        while True:
+            time.sleep(max(1.0, self.lease_seconds / 3))
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            try:
+                with self.app.app_context():
+                    for claim, file_id in active.items():
+                        BatchJobFile.query.filter_by(id=file_id, status='running', claimed_by=claim).update(
+                            {'claimed_at': datetime.utcnow()}, synchronize_session=False
+                        )
+                    db.session.commit()
+            except Exception as e:
+                print(f"[BATCH JOB] Heartbeat error: {e}")
+
+    def _finish(self, job_file: BatchJobFile, result: dict, claim: str):
+        """Store a file result, update the job counters and close finished jobs."""
+        file_path = job_file.file_path
+        success = bool(result.get('success'))
+        relevant = success and bool(result.get('is_relevant'))
+        result['position'] = job_file.position
+
+        updated = BatchJobFile.query.filter_by(id=job_file.id, status='running', claimed_by=claim).update({
+            'status': 'done' if success else 'failed',
+            'result': json.dumps(result),
+            'finished_at': datetime.utcnow()
+        }, synchronize_session=False)
+        if updated != 1:
+            # The claim was taken away (its heartbeat stopped) and the file is
+            # queued again; the next owner stores the result
+            db.session.rollback()
+            return
+
+        BatchJob.query.filter_by(id=job_file.job_id).update({
+            'processed_files': BatchJob.processed_files + 1,
+            'relevant_count': BatchJob.relevant_count + (1 if relevant else 0),
+            'failed_count': BatchJob.failed_count + (0 if success else 1)
+        }, synchronize_session=False)
+        db.session.flush()
+
+        job = db.session.get(BatchJob, job_file.job_id)
+        db.session.refresh(job)
+        BatchJobFile.query.filter_by(id=job_file.id).update(
+            {'sequence': job.processed_files, 'file_path': None}, synchronize_session=False
+        )
+        finished = job.processed_files >= job.total_files
+        if finished:
+            job.status = 'done'
+            job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        if file_path:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        if finished:
+            shutil.rmtree(os.path.join(self.storage_dir, job_file.job_id), ignore_errors=True)
+
+    def _recover_stale(self):
+        """Requeue files whose worker died (at most once per poll)."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_recovery < self.poll_seconds:
+                return
+            self._last_recovery = now
+
+        lease_cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        running = BatchJobFile.query.filter_by(status='running').all()
+        # Read after the query: claims are registered before they are committed,
+        # so every claim of this process seen above is in the set
+        with self._lock:
+            own_claims = set(self._active)
+        for job_file in running:
+            if job_file.claimed_by in own_claims:
+                continue
+            if _is_own_process(job_file.claimed_by):
+                alive = False  # Our pid, but none of our workers holds this claim
+            elif _process_alive(job_file.claimed_by) is False:
+                alive = False
+            else:
+                # The owner's heartbeat keeps claimed_at inside the lease. A live
+                # pid alone proves nothing: after a container restart the new
+                # workers get the same low pids as the old ones
+                alive = job_file.claimed_at is not None and job_file.claimed_at >= lease_cutoff
+            if alive:
+                continue
+            if job_file.attempts >= self.max_attempts:
+                self._finish(job_file, {
+                    'success': False,
+                    'error': 'File gagal diproses setelah beberapa percobaan',
+                    'filename': job_file.filename
+                }, job_file.claimed_by)
+            else:
+                BatchJobFile.query.filter_by(id=job_file.id, status='running',
+                                             claimed_by=job_file.claimed_by).update(
+                    {'status': 'pending', 'claimed_by': None, 'claimed_at': None},
+                    synchronize_session=False
+                )
+                db.session.commit()
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def get_job_results(job_id: str, after_sequence: int = 0) -> list:
+    """
+    Finished file results of a job, in completion order.
+
+    Args:
+        job_id (str): BatchJob id
+        after_sequence (int): Only results finished after this sequence
+            (the last SSE event id the client received)
+
+    Returns:
+        list: [(sequence, result dict)]
+    """
+    rows = BatchJobFile.query.filter(
+        BatchJobFile.job_id == job_id,
+        BatchJobFile.sequence.isnot(None),
+        BatchJobFile.sequence > after_sequence
+    ).order_by(BatchJobFile.sequence).all()
+    return [(row.sequence, json.loads(row.result or '{}')) for row in rows]
@@ -0,0 +1,550 @@
+"""
+Search Benchmark Suite
+======================
+Benchmarks every search engine and highlighter in rabin_karp.py and
+token_index.py on synthetic Indonesian/English corpora, plus PDF/DOCX text
+extraction on documents generated from the same corpora, records throughput
+(MB/s) and peak memory to JSON, and fails when a run regresses past a stored
+baseline.
+
+Every case is also timed against a reference engine on the same corpus,
+sampled alternately with it (naive-find: one str.find loop per keyword on
+the lowercased text), and the gate compares that ratio, not the absolute
+MB/s, so a baseline recorded on one machine still means something on another.
+
+Usage:
+    python benchmark.py                              # default sizes, write results
+    python benchmark.py --sizes 10KB,1MB --repeat 5
+    python benchmark.py --save-baseline              # store current run as baseline
+    python benchmark.py --baseline benchmark_baseline.json --tolerance 0.25
+
+Pure-Python engines are only run up to --max-python-size (default 100KB) so a
+full run stays practical; raise it to benchmark them on the large corpora too.
+Exit code is 1 when an engine is slower relative to naive-find than in the
+baseline by more than --tolerance (geometric mean over its cases; single
+cases are too noisy to gate on), or when a case uses that much more memory,
+and 2 when there is nothing to compare against (baseline file missing, or
+no case in common with it).
+
+benchmark_baseline.json in the repository was recorded with
+--sizes 10KB,100KB --repeat 5. Ratios still shift a little between CPUs
+and Python versions; record a local baseline with --save-baseline
+--baseline <file> when the committed one is too noisy for your machine.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+import PyPDF2
+from docx import Document
+
+import rabin_karp
+from rabin_karp import (
+    rabin_karp_search_multi, rabin_karp_search_stream, aho_corasick_search,
+    approximate_search_multi, highlight_multi, compile_pattern
+)
+from token_index import TokenIndex
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_SIZES = '10KB,100KB,1MB,10MB,50MB'
+DEFAULT_OUTPUT = 'benchmark_results.json'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+# Characters per simulated PDF page for the streaming engine
+PAGE_SIZE = 3000
+
+# Engine every other case is divided by (same corpus, same run)
+REFERENCE_ENGINE = 'naive-find'
+
+# Each timed sample loops the case until it has run at least this long, so
+# microsecond cases (naive-find on 10KB) are not dominated by timer jitter
+MIN_SAMPLE_SECONDS = 0.05
+
+# Extraction cases: corpus text, keyword set and density they are built from
+EXTRACT_KEYWORD_SET = 'medium-5'
+EXTRACT_DENSITY = 'sparse'
+
+# Synthetic vocabulary: academic Indonesian and English words
+VOCABULARY_ID = (
+    "penelitian ini bertujuan untuk menganalisis pengaruh variabel terhadap hasil "
+    "belajar siswa dengan metode kuantitatif data dikumpulkan melalui kuesioner "
+    "dan wawancara sampel diambil secara acak dari populasi mahasiswa analisis "
+    "menggunakan regresi linier berganda hasil menunjukkan bahwa terdapat "
+    "hubungan signifikan antara motivasi dan prestasi kesimpulan saran pengujian "
+    "hipotesis validitas reliabilitas instrumen pendidikan teknologi informasi"
+).split()
+VOCABULARY_EN = (
+    "this study aims to analyze the effect of variables on student learning "
+    "outcomes using a quantitative method data were collected through surveys "
+    "and interviews the sample was randomly selected from the population results "
+    "show a significant relationship between motivation and achievement we "
+    "discuss limitations and future work on machine learning and deep learning"
+).split()
+
+# Keyword sets: (name, keywords)
+KEYWORD_SETS = [
+    ('short-1', ['uji']),
+    ('medium-5', ['metodologi', 'regresi linier', 'motivasi', 'validitas', 'sampling']),
+    ('long-3', ['analisis regresi linier berganda', 'machine learning model evaluation',
+                'tinjauan pustaka sistematis']),
+    ('dictionary-50', None),  # generated: 50 terms, picks the Aho-Corasick path
+]
+
+# Planted keyword occurrences per 10,000 words
+DENSITIES = [('sparse', 1), ('dense', 200)]
+
+
+# =============================================================================
+# CORPUS GENERATION
+# =============================================================================
+
+def parse_size(value: str) -> int:
+    """'10KB' / '1MB' / '2048' -> number of bytes."""
+    value = value.strip().upper()
+    for suffix, factor in (('GB', 1 << 30), ('MB', 1 << 20), ('KB', 1 << 10), ('B', 1)):
+        if value.endswith(suffix):
+            return int(float(value[:-len(suffix)]) * factor)
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    """Inverse of parse_size for labels."""
+    for suffix, factor in (('MB', 1 << 20), ('KB', 1 << 10)):
+        if size >= factor and size % factor == 0:
+            return f'{size // factor}{suffix}'
+    return f'{size}B'
+
+
+def dictionary_keywords(count: int = 50) -> list:
+    """Deterministic term list for the dictionary keyword set."""
+    rng = random.Random(7)
+    words = VOCABULARY_ID + VOCABULARY_EN
+    terms = set()
+    while len(terms) < count:
+        terms.add(' '.join(rng.sample(words, rng.randint(1, 2))))
+    return sorted(terms)
+
+
+def generate_corpus(size: int, keywords: list, density: int, seed: int = 42) -> str:
+    """
+    Mixed Indonesian/English text of about `size` characters with keywords
+    planted `density` times per 10,000 words.
+    """
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        if keywords and rng.randrange(10_000) < density:
+            word = rng.choice(keywords)
+        else:
+            word = rng.choice(VOCABULARY_ID if rng.random() < 0.7 else VOCABULARY_EN)
+            if rng.random() < 0.05:
+                word = word.capitalize() + '.'
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def paginate(text: str) -> list:
+    """Split a corpus into PDF-like page chunks for the streaming engine."""
+    return [(i // PAGE_SIZE + 1, text[i:i + PAGE_SIZE]) for i in range(0, len(text), PAGE_SIZE)]
+
+
+def _wrap(text: str, width: int) -> list:
+    return [text[i:i + width] for i in range(0, len(text), width)]
+
+
+def generate_pdf(text: str) -> bytes:
+    """
+    Minimal uncompressed PDF with one PAGE_SIZE chunk of `text` per page,
+    80-character lines in Helvetica, for the PyPDF2 extraction case.
+    """
+    pages = [chunk for _, chunk in paginate(text)]
+    font_id = 3 + 2 * len(pages)
+    kids = ' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>',
+    ]
+    for i, chunk in enumerate(pages):
+        lines = []
+        for line in _wrap(chunk, 80):
+            line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            lines.append(f'({line}) Tj 0 -14 Td')
+        stream = 'BT /F1 10 Tf 14 TL 40 760 Td ' + ' '.join(lines) + ' ET'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    out = '%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF'
+    return out.encode('latin-1')
+
+
+def generate_docx(text: str) -> bytes:
+    """DOCX with `text` split into 500-character paragraphs."""
+    document = Document()
+    for paragraph in _wrap(text, 500):
+        document.add_paragraph(paragraph)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# =============================================================================
+# BENCHMARK CASES
+# =============================================================================
+
+def legacy_highlight(text: str, keyword_positions: dict) -> str:
+    """The original highlighter: rebuild the string once per match (reference)."""
+    result = text
+    spans = sorted(
+        ((pos, pos + len(kw)) for kw, positions in keyword_positions.items() for pos in positions),
+        reverse=True,
+    )
+    for start, end in spans:
+        result = result[:start] + f'<mark>{result[start:end]}</mark>' + result[end:]
+    return result
+
+
+def naive_find(text: str, keywords: list) -> dict:
+    """Reference engine: str.find over the lowercased text, one keyword at a time."""
+    lowered = text.lower()
+    results = {}
+    for kw in keywords:
+        kw = kw.lower()
+        positions = []
+        pos = lowered.find(kw)
+        while pos != -1:
+            positions.append(pos)
+            pos = lowered.find(kw, pos + 1)
+        results[kw] = positions
+    return results
+
+
+def stream_search(text: str, keywords: list) -> dict:
+    """Collect rabin_karp_search_stream matches into {keyword: [positions]}."""
+    results = {kw: [] for kw in keywords}
+    for match in rabin_karp_search_stream(paginate(text), keywords):
+        results[match['pattern']].append(match['position'])
+    return results
+
+
+def build_engines(numpy_available: bool) -> list:
+    """
+    (name, pure_python, function(text, keywords, positions) -> result count)
+
+    `positions` is the exact-match result, precomputed once per corpus, so
+    highlighters are timed without the search.
+    """
+    engines = [
+        (REFERENCE_ENGINE, False,
+         lambda text, kws, _: _count(naive_find(text, kws))),
+        ('rk-scalar', True,
+         lambda text, kws, _: _count(rabin_karp_search_multi(text, kws, engine='scalar'))),
+        ('rk-textbook', True,
+         lambda text, kws, _: _count(rabin_karp_search_multi(text, kws, backend='textbook', engine='scalar'))),
+        ('rk-stream', True,
+         lambda text, kws, _: _count(stream_search(text, kws))),
+        ('aho-corasick', True,
+         lambda text, kws, _: _count(aho_corasick_search(text, kws))),
+        ('approximate-k1', True,
+         lambda text, kws, _: _count(approximate_search_multi(text, kws, max_edits=1))),
+        ('token-word', True,
+         lambda text, kws, _: _count(_token_search(text, kws, 'word'))),
+        ('token-stem', True,
+         lambda text, kws, _: _count(_token_search(text, kws, 'stem'))),
+        ('highlight-linear', False,
+         lambda text, kws, positions: len(highlight_multi(text, positions))),
+        ('highlight-legacy', True,
+         lambda text, kws, positions: len(legacy_highlight(text, positions))),
+    ]
+    if numpy_available:
+        engines.insert(2, ('rk-numpy', False,
+                           lambda text, kws, _: _count(rabin_karp_search_multi(text, kws, engine='numpy'))))
+    return engines
+
+
+def extract_pdf(data: bytes) -> int:
+    """Text layer of every page, the way iter_pdf_pages reads it in app.py."""
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    return sum(len(page.extract_text() or '') for page in reader.pages)
+
+
+def extract_docx(data: bytes) -> int:
+    """Non-empty paragraphs, the way extract_text_from_docx reads them in app.py."""
+    document = Document(BytesIO(data))
+    return sum(len(p.text) for p in document.paragraphs if p.text.strip())
+
+
+# (name, document builder, extractor)
+EXTRACTORS = [
+    ('extract-pdf', generate_pdf, extract_pdf),
+    ('extract-docx', generate_docx, extract_docx),
+]
+
+
+def _count(results: dict) -> int:
+    return sum(len(found) for found in results.values())
+
+
+def _token_search(text: str, keywords: list, mode: str) -> dict:
+    # Fresh index on purpose: tokenizing (and stemming) is part of the cost
+    index = TokenIndex(text)
+    return {kw: index.lookup(kw, mode) for kw in keywords}
+
+
+def _sample(function) -> tuple:
+    """Per-call wall time of `function`, looped for at least MIN_SAMPLE_SECONDS."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        result = function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            return elapsed / calls, result
+
+
+def measure(function, repeat: int, reference=None) -> tuple:
+    """
+    Best per-call wall time over `repeat` samples, then one tracemalloc run
+    for peak memory.
+
+    When `reference` is given it is sampled right before every sample of
+    `function`, so both see the same machine load, and the median of the
+    per-sample ratios is much steadier than either time alone.
+
+    Returns:
+        tuple: (seconds, peak bytes, result, speed relative to reference or None)
+    """
+    best = float('inf')
+    ratios = []
+    result = None
+    for _ in range(repeat):
+        reference_seconds = _sample(reference)[0] if reference is not None else None
+        seconds, result = _sample(function)
+        best = min(best, seconds)
+        if reference is not None:
+            ratios.append(reference_seconds / seconds)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result, statistics.median(ratios) if ratios else None
+
+
+def make_record(case: str, engine: str, size: int, keyword_set, density, seconds: float,
+                peak: int, result: int, relative: float) -> dict:
+    """One result row; `relative` is throughput divided by naive-find's on the same corpus."""
+    record = {
+        'case': case,
+        'engine': engine,
+        'size_bytes': size,
+        'keyword_set': keyword_set,
+        'density': density,
+        'seconds': round(seconds, 6),
+        'mb_per_s': round(size / (1 << 20) / seconds, 3) if seconds else None,
+        'relative': round(relative, 4),
+        'peak_mb': round(peak / (1 << 20), 3),
+        'result': result,
+    }
+    print(f"{case:<55} {record['mb_per_s']:>10} MB/s {record['relative']:>10}x ref "
+          f"{record['peak_mb']:>10} MB peak")
+    return record
+
+
+def run_benchmarks(sizes: list, engine_filter: set, repeat: int, max_python_size: int) -> list:
+    """Run every (engine, size, keyword set, density) and extraction case and return result records."""
+    engines = build_engines(rabin_karp.np is not None)
+    records = []
+
+    for size in sizes:
+        for set_name, keywords in KEYWORD_SETS:
+            keywords = keywords or dictionary_keywords()
+            patterns = [compile_pattern(kw) for kw in keywords]
+            for density_name, density in DENSITIES:
+                text = generate_corpus(size, keywords, density)
+                positions = rabin_karp_search_multi(text, patterns)
+
+                for name, pure_python, function in engines:
+                    # The reference always runs: every ratio is taken against it
+                    is_reference = name == REFERENCE_ENGINE
+                    if not is_reference:
+                        if engine_filter and name not in engine_filter:
+                            continue
+                        if pure_python and size > max_python_size:
+                            continue
+
+                    case = f'{name}/{format_size(size)}/{set_name}/{density_name}'
+                    seconds, peak, matches, relative = measure(
+                        lambda: function(text, keywords, positions), repeat,
+                        None if is_reference else lambda: naive_find(text, keywords))
+                    records.append(make_record(case, name, size, set_name, density_name, seconds,
+                                               peak, matches, 1.0 if is_reference else relative))
+
+        # Extraction is pure Python (PyPDF2, python-docx) whatever the engine
+        if size > max_python_size:
+            continue
+        keywords = dict(KEYWORD_SETS)[EXTRACT_KEYWORD_SET]
+        text = generate_corpus(size, keywords, dict(DENSITIES)[EXTRACT_DENSITY])
+        for name, build, extract in EXTRACTORS:
+            if engine_filter and name not in engine_filter:
+                continue
+            data = build(text)
+            case = f'{name}/{format_size(size)}'
+            seconds, peak, extracted, relative = measure(
+                lambda: extract(data), repeat, lambda: naive_find(text, keywords))
+            records.append(make_record(case, name, size, EXTRACT_KEYWORD_SET, EXTRACT_DENSITY,
+                                       seconds, peak, extracted, relative))
+    return records
+
+
+# =============================================================================
+# BASELINE COMPARISON
+# =============================================================================
+
+def compare_with_baseline(records: list, baseline: dict, tolerance: float) -> tuple:
+    """
+    Compare a run with the baseline.
+
+    Speed is judged per engine: the geometric mean, over the cases both runs
+    have, of (relative now / relative in the baseline). A single case moves
+    with machine noise; an engine that really got slower moves in most of
+    its cases. Peak memory is judged per case.
+
+    Returns:
+        tuple: (regression messages, notes on single cases that moved by more
+            than the tolerance without failing the gate)
+    """
+    previous = {record['case']: record for record in baseline.get('results', [])}
+    changes = {}  # engine -> [log(relative now / relative before)]
+    regressions = []
+    notes = []
+    for record in records:
+        old = previous.get(record['case'])
+        if not old or record['engine'] == REFERENCE_ENGINE:
+            continue
+        if old.get('relative') and record['relative']:
+            changes.setdefault(record['engine'], []).append(math.log(record['relative'] / old['relative']))
+            if record['relative'] < old['relative'] * (1 - tolerance):
+                notes.append(f"{record['case']}: {record['relative']}x naive-find < baseline {old['relative']}x")
+        # Ignore sub-megabyte noise in memory comparisons
+        if old.get('peak_mb') is not None and record['peak_mb'] > max(old['peak_mb'] * (1 + tolerance), old['peak_mb'] + 1):
+            regressions.append(
+                f"{record['case']}: peak memory {record['peak_mb']} MB > baseline {old['peak_mb']} MB"
+            )
+
+    for engine, logs in changes.items():
+        change = math.exp(sum(logs) / len(logs))
+        if change < 1 - tolerance:
+            regressions.append(
+                f"{engine}: {change:.0%} of its baseline speed relative to naive-find "
+                f"(geometric mean over {len(logs)} case(s))"
+            )
+    return regressions, notes
+
+
+def compared_cases(records: list, baseline: dict) -> set:
+    """Cases present in both runs that the gate can judge (the reference itself excluded)."""
+    previous = {record['case'] for record in baseline.get('results', [])
+                if record.get('relative') is not None and record['engine'] != REFERENCE_ENGINE}
+    return previous & {record['case'] for record in records}
+
+
+# =============================================================================
+# MAIN ENTRY POINT
+# =============================================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark Rabin-Karp search engines, highlighters and text extraction.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Corpus sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--engines', default='', help='Comma-separated engine names (default: all; '
+                        f'{REFERENCE_ENGINE} always runs as the reference)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case, best is kept')
+    parser.add_argument('--max-python-size', default='100KB',
+                        help='Largest corpus for pure-Python engines (default: 100KB)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Results JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative regression before failing (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    engine_filter = {name.strip() for name in args.engines.split(',') if name.strip()}
+
+    records = run_benchmarks(sizes, engine_filter, args.repeat, parse_size(args.max_python_size))
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': rabin_karp.np.__version__ if rabin_karp.np is not None else None,
+            'repeat': args.repeat,
+        },
+        'results': records,
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 2
+
+    compared = compared_cases(records, baseline)
+    if not compared:
+        print(f"No case in common with {args.baseline} (check --sizes/--engines; a baseline "
+              f"without 'relative' figures must be re-recorded); nothing was compared.")
+        return 2
+
+    regressions, notes = compare_with_baseline(records, baseline, args.tolerance)
+    if notes:
+        print(f"\n{len(notes)} single case(s) beyond {args.tolerance:.0%} (not failing, judged per engine):")
+        for message in notes:
+            print(f"  - {message}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+
+    print(f"No regressions beyond {args.tolerance:.0%} in {len(compared)} case(s) against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Extraction Cache (Content-Addressed)
+====================================
+OCR and PDF/DOCX parsing are the slow part of /api/analyze. Users often
+upload the same file again with a different keyword, so extracted text is
+cached under a key derived from the file content:
+
+    key = SHA-256( SHA-256(file bytes) | file type | EXTRACTOR_VERSION | OCR language )
+
+Two tiers:
+    memory : LRU bounded by total text size (per process)
+    disk   : gzip files in a directory (e.g. the /app/data volume), shared by
+             all gunicorn workers, evicted oldest-first by total size
+
+Bump EXTRACTOR_VERSION whenever extraction output changes, so old entries
+are no longer used.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Changes whenever the text produced by the extractors changes
+EXTRACTOR_VERSION = '2'
+
+EXTRACTION_CACHE_MEMORY_MB = float(os.environ.get('EXTRACTION_CACHE_MEMORY_MB', 32))
+EXTRACTION_CACHE_DISK_MB = float(os.environ.get('EXTRACTION_CACHE_DISK_MB', 256))
+
+# Disk usage is trimmed to this fraction of the limit, so eviction is not
+# triggered again by the very next write
+DISK_EVICTION_TARGET = 0.9
+
+
+def file_digest(data: bytes) -> str:
+    """SHA-256 hex digest of the uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_cache_key(data: bytes, file_type: str, lang: str = None) -> str:
+    """
+    Cache key of an uploaded file.
+
+    Args:
+        data (bytes): Raw uploaded bytes
+        file_type (str): 'image', 'pdf' or 'docx'
+        lang (str): OCR language (and settings such as DPI), for extractors
+            that run OCR
+
+    Returns:
+        str: 64-character hex key
+    """
+    material = '|'.join((file_digest(data), file_type, EXTRACTOR_VERSION, lang or ''))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ExtractionCache:
+    """
+    Two-tier (memory LRU + disk) cache of extracted text.
+
+    Disk entries live in <directory>/<key[:2]>/<key>.txt.gz and are written
+    atomically, so concurrent workers never read half-written files.
+    """
+
+    def __init__(self, directory: str = None,
+                 memory_bytes: int = int(EXTRACTION_CACHE_MEMORY_MB * 1024 * 1024),
+                 disk_bytes: int = int(EXTRACTION_CACHE_DISK_MB * 1024 * 1024)):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = None  # Measured lazily on the first write
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    # ---------------------------------------------------------------- memory
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            if len(text) > self.memory_bytes:
+                return
+            self._memory[key] = text
+            self._memory_size += len(text)
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    # ------------------------------------------------------------------ disk
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.txt.gz')
+
+    def _read_disk(self, key: str):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, EOFError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        return text
+
+    def _write_disk(self, key: str, text: str):
+        if not self.directory or self.disk_bytes <= 0:
+            return
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(text)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"[CACHE] Failed to write extraction cache: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = self._scan_disk()[1]
+            else:
+                self._disk_size += size
+            over_limit = self._disk_size > self.disk_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _scan_disk(self):
+        """Return ([(mtime, size, path)], total_size) of the disk tier."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.txt.gz'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+                total += info.st_size
+        return entries, total
+
+    def _evict_disk(self):
+        """Delete least recently used files until under the target size."""
+        entries, total = self._scan_disk()
+        target = self.disk_bytes * DISK_EVICTION_TARGET
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_size = total
+
+    # ------------------------------------------------------------------- API
+
+    def get(self, key: str):
+        """
+        Look up extracted text.
+
+        Returns:
+            str or None: Cached text, None on a miss
+        """
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return text
+
+        text = self._read_disk(key)
+        if text is not None:
+            self._remember(key, text)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+            return text
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, text: str):
+        """Store extracted text in both tiers."""
+        if text is None:
+            return
+        self._remember(key, text)
+        self._write_disk(key, text)
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left to eviction)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
@@ -0,0 +1,284 @@
+"""
+Groq Key Pool
+=============
+The app may be configured with several Groq API keys (GROQ_API_KEY_1..5).
+Previously a new Groq client (and HTTP connection pool) was built for every
+attempt, the active key was an unsynchronized global index, and a key that
+had just returned 429 was tried again on the next request.
+
+GroqKeyPool keeps instead:
+
+    - one long-lived client per key (connections are reused)
+    - per-key rate-limit state read from the response headers
+      (x-ratelimit-remaining-*, x-ratelimit-reset-*, retry-after); a key
+      that hits 429 or runs out of requests cools down until its reset time
+    - key selection under a lock: the healthiest key that is not cooling
+      down (fewest consecutive failures, most remaining requests, least
+      recently used)
+    - retries with jittered exponential backoff, and a circuit breaker:
+      when every key is cooling down, or calls keep failing, requests fail
+      fast with GroqUnavailableError instead of hammering the API
+
+State is per process (each gunicorn worker learns the limits from its own
+responses).
+
+Configuration (environment):
+    GROQ_MAX_ATTEMPTS        attempts per completion (default 4)
+    GROQ_MAX_WAIT_SECONDS    longest wait for a cooling key before failing (default 10)
+    GROQ_BREAKER_THRESHOLD   consecutive failures that open the breaker (default 5)
+    GROQ_BREAKER_SECONDS     how long the breaker stays open (default 30)
+"""
+
+import os
+import random
+import re
+import threading
+import time
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+GROQ_MAX_ATTEMPTS = int(os.environ.get('GROQ_MAX_ATTEMPTS', 4))
+GROQ_MAX_WAIT_SECONDS = float(os.environ.get('GROQ_MAX_WAIT_SECONDS', 10))
+GROQ_BREAKER_THRESHOLD = int(os.environ.get('GROQ_BREAKER_THRESHOLD', 5))
+GROQ_BREAKER_SECONDS = float(os.environ.get('GROQ_BREAKER_SECONDS', 30))
+
+# Cooldown when a 429 response carries no usable reset header
+DEFAULT_COOLDOWN_SECONDS = 30.0
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+
+class GroqUnavailableError(Exception):
+    """No key can serve the request right now (all cooling down or breaker open)."""
+
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_duration(value) -> float:
+    """
+    Parse a Groq reset header ('2m59.56s', '7.66s', '120ms') or a plain
+    number of seconds (retry-after).
+
+    Returns:
+        float or None: Seconds, None when the value cannot be parsed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or ''.join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _header_int(headers, name: str):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limit(error) -> bool:
+    return getattr(error, 'status_code', None) == 429
+
+
+def _is_transient(error) -> bool:
+    """Connection problems, timeouts and 5xx are worth retrying on another key."""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+    return status >= 500
+
+
+# =============================================================================
+# POOL
+# =============================================================================
+
+class _KeyState:
+    """Rate-limit bookkeeping of one API key."""
+
+    def __init__(self, index: int, key: str):
+        self.index = index
+        self.key = key
+        self.client = None
+        self.cooldown_until = 0.0
+        self.remaining_requests = None
+        self.remaining_tokens = None
+        self.consecutive_failures = 0
+        self.last_used = 0.0
+
+    def to_dict(self, now: float) -> dict:
+        return {
+            'key': f'#{self.index + 1} (...{self.key[-4:]})',
+            'cooldown_seconds': round(max(0.0, self.cooldown_until - now), 1),
+            'remaining_requests': self.remaining_requests,
+            'remaining_tokens': self.remaining_tokens,
+            'consecutive_failures': self.consecutive_failures,
+        }
+
+
+class GroqKeyPool:
+    """
+    Thread-safe pool of Groq clients with cooldown-aware key rotation.
+
+    Args:
+        keys (list): API keys
+        client_factory (callable): client_factory(api_key) -> Groq-like client;
+            defaults to groq.Groq with SDK retries disabled (the pool retries)
+    """
+
+    def __init__(self, keys: list, client_factory=None, max_attempts: int = GROQ_MAX_ATTEMPTS,
+                 max_wait: float = GROQ_MAX_WAIT_SECONDS,
+                 breaker_threshold: int = GROQ_BREAKER_THRESHOLD,
+                 breaker_seconds: float = GROQ_BREAKER_SECONDS):
+        self.keys = [_KeyState(i, key) for i, key in enumerate(keys)]
+        self.client_factory = client_factory or self._default_client
+        self.max_attempts = max(1, max_attempts)
+        self.max_wait = max_wait
+        self.breaker_threshold = breaker_threshold
+        self.breaker_seconds = breaker_seconds
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._breaker_until = 0.0
+
+    @staticmethod
+    def _default_client(api_key: str):
+        from groq import Groq
+        return Groq(api_key=api_key, max_retries=0)
+
+    # -------------------------------------------------------------- selection
+
+    def _acquire(self):
+        """
+        Pick the healthiest key that is not cooling down.
+
+        Returns:
+            tuple: (_KeyState or None, seconds until a key or the breaker frees up)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._breaker_until:
+                return None, self._breaker_until - now
+            ready = [state for state in self.keys if state.cooldown_until <= now]
+            if not ready:
+                return None, min(state.cooldown_until for state in self.keys) - now
+            state = min(ready, key=lambda s: (
+                s.consecutive_failures,
+                -(s.remaining_requests if s.remaining_requests is not None else float('inf')),
+                s.last_used,
+            ))
+            state.last_used = now
+            if state.client is None:
+                state.client = self.client_factory(state.key)
+            return state, 0.0
+
+    # ------------------------------------------------------------ bookkeeping
+
+    def _record_success(self, state: _KeyState, headers):
+        now = time.monotonic()
+        with self._lock:
+            self._consecutive_failures = 0
+            state.consecutive_failures = 0
+            if headers is None:
+                return
+            state.remaining_requests = _header_int(headers, 'x-ratelimit-remaining-requests')
+            state.remaining_tokens = _header_int(headers, 'x-ratelimit-remaining-tokens')
+            # Quota used up: rest the key until its window resets
+            if state.remaining_requests == 0:
+                reset = parse_duration(headers.get('x-ratelimit-reset-requests'))
+                state.cooldown_until = now + (reset if reset is not None else DEFAULT_COOLDOWN_SECONDS)
+            elif state.remaining_tokens == 0:
+                reset = parse_duration(headers.get('x-ratelimit-reset-tokens'))
+                state.cooldown_until = now + (reset if reset is not None else DEFAULT_COOLDOWN_SECONDS)
+
+    def _record_rate_limit(self, state: _KeyState, headers):
+        headers = headers or {}
+        waits = [parse_duration(headers.get(name)) for name in (
+            'retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'
+        )]
+        waits = [w for w in waits if w is not None]
+        cooldown = max(waits) if waits else DEFAULT_COOLDOWN_SECONDS
+        with self._lock:
+            state.cooldown_until = time.monotonic() + cooldown
+            state.remaining_requests = 0
+        print(f"[GROQ] API key #{state.index + 1} rate limited, cooldown {cooldown:.1f}s")
+
+    def _record_failure(self, state: _KeyState):
+        with self._lock:
+            state.consecutive_failures += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.breaker_threshold:
+                self._breaker_until = time.monotonic() + self.breaker_seconds
+                self._consecutive_failures = 0
+                print(f"[GROQ] Circuit breaker open for {self.breaker_seconds:.0f}s")
+
+    # -------------------------------------------------------------------- API
+
+    def create_completion(self, **kwargs):
+        """
+        client.chat.completions.create(**kwargs) on the best available key.
+
+        Rate-limited keys are put in cooldown and the next key is tried;
+        connection errors and 5xx are retried with jittered backoff.
+        With stream=True the returned object is the SDK stream.
+
+        Raises:
+            GroqUnavailableError: no key configured, all keys cooling down for
+                longer than max_wait, breaker open, or attempts exhausted
+            Exception: non-retryable API errors (e.g. 400) are re-raised
+        """
+        if not self.keys:
+            raise GroqUnavailableError("API key Groq belum dikonfigurasi")
+
+        last_error = None
+        for attempt in range(self.max_attempts):
+            state, wait = self._acquire()
+            if state is None:
+                # Every key cooling down (or breaker open): wait briefly, else fail fast
+                if wait > self.max_wait or attempt == self.max_attempts - 1:
+                    raise GroqUnavailableError(
+                        f"Semua API key Groq sedang mencapai limit. Coba lagi dalam {wait:.0f} detik."
+                    )
+                time.sleep(wait + random.uniform(0, BACKOFF_BASE_SECONDS))
+                continue
+
+            try:
+                raw = state.client.chat.completions.with_raw_response.create(**kwargs)
+                result = raw.parse()
+            except Exception as e:
+                last_error = e
+                response = getattr(e, 'response', None)
+                if _is_rate_limit(e):
+                    self._record_rate_limit(state, getattr(response, 'headers', None))
+                    continue
+                if not _is_transient(e):
+                    raise
+                self._record_failure(state)
+                backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+                time.sleep(random.uniform(0, backoff))  # Full jitter
+                continue
+
+            self._record_success(state, raw.headers)
+            return result
+
+        raise GroqUnavailableError(f"Groq tidak merespons setelah {self.max_attempts} percobaan: {last_error}")
+
+    def snapshot(self) -> dict:
+        """Per-key state for monitoring (keys are masked)."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'breaker_open_seconds': round(max(0.0, self._breaker_until - now), 1),
+                'keys': [state.to_dict(now) for state in self.keys],
+            }
+
@@ -0,0 +1,96 @@
+"""
+Incremental JSON Object Parser
+==============================
+The AI analysis is a JSON object whose top-level members are the result
+sections (deteksi_struktur, kekuatan_metodologi, ...). When the completion
+is streamed, each member can be shown as soon as its closing brace arrives
+instead of after the whole object.
+
+JSONObjectStream is fed the text chunks in order and returns the members
+that became complete:
+
+    parser = JSONObjectStream()
+    for chunk in chunks:
+        for key, value in parser.feed(chunk):
+            ...
+
+Only nesting depth and string state are tracked per character; each
+completed member is validated with json.loads. Text before the first '{'
+(e.g. a ```json fence) and after the closing '}' is ignored. A member that
+is not valid JSON is skipped - the caller still validates the full text at
+the end.
+"""
+
+import json
+
+
+# =============================================================================
+# PARSER
+# =============================================================================
+
+class JSONObjectStream:
+    """Split a streamed JSON object into its top-level (key, value) members."""
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member = []
+
+    def _close_member(self):
+        text = ''.join(self._member).strip()
+        self._member = []
+        if not text:
+            return None
+        try:
+            member = json.loads('{' + text + '}')
+        except ValueError:
+            return None
+        return next(iter(member.items())) if len(member) == 1 else None
+
+    def feed(self, chunk: str) -> list:
+        """
+        Consume the next chunk of text.
+
+        Returns:
+            list: (key, value) members completed by this chunk, in order
+        """
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+
+            # A top-level member ends at ',' or at the object's closing brace
+            if self._depth == 0 or (char == ',' and self._depth == 1):
+                member = self._close_member()
+                if member is not None:
+                    completed.append(member)
+                self.finished = self._depth == 0
+                continue
+            self._member.append(char)
+        return completed
+
@@ -7,6 +7,7 @@ DATABASE MODELS - SQLite with SQLAlchemy
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+import json
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -186,3 +187,99 @@ class GuestUsageLimit(db.Model):
 
     def __repr__(self):
         return f'<GuestUsageLimit {self.ip_address}:{self.feature}: {self.usage_count}>'
+
+
+class BatchJob(db.Model):
+    """
+    Model untuk job batch yang diproses di background.
+    File yang diunggah disimpan di disk, hasil per file di BatchJobFile.
+    Karena status tersimpan di database, job tetap berlanjut setelah worker restart.
+    """
+    __tablename__ = 'batch_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, juga dipakai sebagai token akses
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # None untuk guest
+    status = db.Column(db.String(20), default='queued', index=True)  # 'held', 'queued', 'running', 'done'
+    keywords = db.Column(db.Text, nullable=False)  # JSON list
+    max_edits = db.Column(db.Integer, default=0)
+    match_mode = db.Column(db.String(20), default='exact')
+    relevance = db.Column(db.Text, nullable=True)  # JSON opsi mode relevansi, None untuk mode penuh
+    total_files = db.Column(db.Integer, default=0)
+    processed_files = db.Column(db.Integer, default=0)
+    relevant_count = db.Column(db.Integer, default=0)
+    failed_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    files = db.relationship('BatchJobFile', backref='job', lazy=True, order_by='BatchJobFile.position')
+
+    def to_dict(self):
+        """Ringkasan status job untuk response API."""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'mode': 'relevance' if self.relevance else 'full',
+            'total': self.total_files,
+            'processed': self.processed_files,
+            'relevant_count': self.relevant_count,
+            'not_relevant_count': self.processed_files - self.relevant_count - self.failed_count,
+            'failed_count': self.failed_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<BatchJob {self.id} {self.status} {self.processed_files}/{self.total_files}>'
+
+
+class BatchJobFile(db.Model):
+    """
+    Model untuk satu file di dalam BatchJob (antrian kerja worker background).
+    """
+    __tablename__ = 'batch_job_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('batch_jobs.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)  # Urutan file dalam upload
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=True)  # Dihapus setelah diproses
+    status = db.Column(db.String(20), default='pending', index=True)  # 'held', 'pending', 'running', 'done', 'failed'
+    attempts = db.Column(db.Integer, default=0)
+    claimed_by = db.Column(db.String(100), nullable=True)  # "host:pid:token" klaim worker yang memproses
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    sequence = db.Column(db.Integer, nullable=True)  # Urutan selesai, dipakai sebagai id event SSE
+    result = db.Column(db.Text, nullable=True)  # JSON hasil analisis
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<BatchJobFile {self.job_id}#{self.position} {self.status}>'
+
+
+class AIAnalysis(db.Model):
+    """
+    Model untuk analisis AI yang berjalan di background setelah /api/analyze
+    mengembalikan hasil pencarian. Klien mengambil hasilnya lewat polling/SSE.
+    """
+    __tablename__ = 'ai_analyses'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, juga dipakai sebagai token akses
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # None untuk guest
+    history_id = db.Column(db.Integer, db.ForeignKey('history.id'), nullable=True)  # Diisi ai_summary saat selesai
+    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'done', 'failed'
+    result = db.Column(db.Text, nullable=True)  # JSON field ai_* untuk response (selama pending: ai_sections)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Status + field ai_* untuk response API."""
+        return {
+            'analysis_id': self.id,
+            'ai_status': self.status,
+            'history_id': self.history_id,
+            **(json.loads(self.result) if self.result else {}),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<AIAnalysis {self.id} {self.status}>'
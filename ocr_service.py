@@ -0,0 +1,338 @@
+"""
+OCR Service (Persistent Tesseract Worker Pool)
+==============================================
+pytesseract.image_to_string() writes temp files and starts a new `tesseract`
+process for every image, which reloads the eng+ind traineddata each time.
+
+This module keeps a bounded pool of long-lived OCR worker processes instead:
+
+    - each worker loads Tesseract once through its C API (libtesseract via
+      ctypes) and keeps the traineddata in memory; when libtesseract cannot
+      be loaded the worker falls back to pytesseract
+    - jobs wait in a bounded queue; when it is full, submit() fails fast with
+      OCRBusyError (backpressure) instead of piling up requests
+    - every job has a timeout; only the worker process running a stuck job
+      is terminated and replaced, jobs on the other workers are unaffected
+
+Configuration (environment):
+    OCR_POOL_SIZE    number of OCR worker processes per web worker (default 2)
+    OCR_QUEUE_SIZE   jobs allowed to wait for a free worker (default 8)
+    OCR_JOB_TIMEOUT  seconds before a job is abandoned (default 60)
+    OCR_LANG         Tesseract languages (default eng+ind)
+    OCR_LIBTESSERACT path or soname of libtesseract (default: try
+                     LIBTESSERACT_NAMES, then ctypes.util.find_library)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+OCR_POOL_SIZE = int(os.environ.get('OCR_POOL_SIZE', 2))
+OCR_QUEUE_SIZE = int(os.environ.get('OCR_QUEUE_SIZE', 8))
+OCR_JOB_TIMEOUT = float(os.environ.get('OCR_JOB_TIMEOUT', 60))
+OCR_LANG = os.environ.get('OCR_LANG', 'eng+ind')
+OCR_LIBTESSERACT = os.environ.get('OCR_LIBTESSERACT')
+
+# Versioned sonames are tried first: find_library() needs ldconfig (absent on
+# musl/Alpine) and the unversioned libtesseract.so only ships with -dev packages
+LIBTESSERACT_NAMES = ('libtesseract.so.5', 'libtesseract.so.4', 'libtesseract.5.dylib')
+
+
+class OCRError(Exception):
+    """OCR job failed."""
+
+
+class OCRBusyError(OCRError):
+    """The OCR queue is full; the caller should retry later."""
+
+
+class OCRTimeoutError(OCRError):
+    """An OCR job did not finish within its timeout."""
+
+
+# =============================================================================
+# WORKER SIDE (runs inside the pool processes)
+# =============================================================================
+
+class TesseractCAPI:
+    """
+    Tesseract loaded once through its C API.
+
+    TessBaseAPIInit3 loads the traineddata a single time; every image after
+    that only costs SetImage + GetUTF8Text.
+    """
+
+    def __init__(self, lang: str):
+        lib = self.path = None
+        names = [OCR_LIBTESSERACT, *LIBTESSERACT_NAMES, ctypes.util.find_library('tesseract')]
+        for name in filter(None, names):
+            try:
+                lib = ctypes.CDLL(name)
+            except OSError:
+                continue
+            self.path = name
+            break
+        if lib is None:
+            raise OSError(f"libtesseract not found (tried {', '.join(filter(None, names))})")
+
+        lib.TessBaseAPICreate.restype = ctypes.c_void_p
+        lib.TessBaseAPIInit3.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        lib.TessBaseAPIInit3.restype = ctypes.c_int
+        lib.TessBaseAPISetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int
+        ]
+        lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.POINTER(ctypes.c_char)
+        lib.TessDeleteText.argtypes = [ctypes.POINTER(ctypes.c_char)]
+        lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+
+        handle = lib.TessBaseAPICreate()
+        if lib.TessBaseAPIInit3(handle, None, lang.encode('utf-8')) != 0:
+            lib.TessBaseAPIDelete(handle)
+            raise OSError(f"Tesseract could not load language data '{lang}'")
+
+        self.lib = lib
+        self.handle = handle
+
+    def image_to_string(self, image) -> str:
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        bytes_per_pixel = 1 if image.mode == 'L' else 3
+        width, height = image.size
+
+        self.lib.TessBaseAPISetImage(
+            self.handle, image.tobytes(), width, height, bytes_per_pixel, bytes_per_pixel * width
+        )
+        text_pointer = self.lib.TessBaseAPIGetUTF8Text(self.handle)
+        try:
+            text = ctypes.string_at(text_pointer).decode('utf-8', errors='replace') if text_pointer else ''
+        finally:
+            if text_pointer:
+                self.lib.TessDeleteText(text_pointer)
+            self.lib.TessBaseAPIClear(self.handle)
+        return text
+
+
+class PytesseractEngine:
+    """Fallback engine: pytesseract (one tesseract process per image)."""
+
+    def __init__(self, lang: str, tesseract_cmd: str = None):
+        import pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.pytesseract = pytesseract
+        self.lang = lang
+
+    def image_to_string(self, image) -> str:
+        return self.pytesseract.image_to_string(image, lang=self.lang)
+
+
+# Engine of the current worker process (set by _init_worker)
+_engine = None
+
+
+def _init_worker(lang: str, tesseract_cmd: str = None):
+    """Pool initializer: load Tesseract once per worker process."""
+    global _engine
+    try:
+        _engine = TesseractCAPI(lang)
+        print(f"[OCR] Worker {os.getpid()}: Tesseract C API ({_engine.path})")
+    except (OSError, AttributeError) as e:
+        _engine = PytesseractEngine(lang, tesseract_cmd)
+        print(f"[OCR] Worker {os.getpid()}: pytesseract fallback, one process per image ({e})")
+
+
+def _run_job(mode: str, size: tuple, data: bytes) -> str:
+    """
+    OCR one image sent as raw pixels (no re-encoding between processes).
+
+    Errors are re-raised as a plain OCRError: pytesseract's TesseractError
+    cannot be unpickled in the parent, which would surface as
+    BrokenProcessPool and fail every other job of the pool.
+    """
+    from PIL import Image
+    try:
+        image = Image.frombytes(mode, size, data)
+        return _engine.image_to_string(image).strip()
+    except Exception as e:
+        raise OCRError(f"{type(e).__name__}: {e}") from None
+
+
+# =============================================================================
+# SERVICE (runs in the web worker)
+# =============================================================================
+
+class _Lane:
+    """
+    One OCR worker process, fed by its own dispatcher thread.
+
+    The thread takes the next job from the shared queue only when the
+    process is idle, so no job ever waits behind another inside a worker.
+    When a job times out (or the process dies), only this process is
+    terminated and replaced; the other lanes keep running their jobs.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.executor = None
+        self.thread = threading.Thread(target=self._run, name='ocr-lane', daemon=True)
+        self.thread.start()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_worker,
+                initargs=(self.service.lang, self.service.tesseract_cmd),
+            )
+        return self.executor
+
+    def restart(self):
+        """Terminate this worker process; the next job starts a fresh one."""
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        # A stuck Tesseract call cannot be cancelled, so terminate the worker
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        while True:
+            job = self.service._jobs.get()
+            if job is None:
+                self.restart()
+                return
+            future, args, timeout = job
+            if not future.set_running_or_notify_cancel():
+                continue  # Caller gave up while the job was queued
+            try:
+                result = self._get_executor().submit(_run_job, *args).result(timeout=timeout)
+            except FutureTimeoutError:
+                self.restart()
+                future.set_exception(OCRTimeoutError(f"OCR melebihi batas waktu {timeout:.0f} detik"))
+            except BrokenProcessPool as e:
+                self.restart()
+                future.set_exception(OCRError(f"OCR worker berhenti: {e}"))
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+class OCRService:
+    """
+    Bounded pool of long-lived OCR workers with a request queue,
+    per-job timeout and backpressure.
+
+    The worker processes are created lazily in the process that first uses
+    them, so each gunicorn worker gets its own pool after forking.
+    """
+
+    def __init__(self, workers: int = OCR_POOL_SIZE, queue_size: int = OCR_QUEUE_SIZE,
+                 timeout: float = OCR_JOB_TIMEOUT, lang: str = OCR_LANG, tesseract_cmd: str = None):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.lang = lang
+        self.tesseract_cmd = tesseract_cmd
+
+        # Running + waiting jobs are capped at workers + queue_size
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._jobs = None
+        self._lanes = []
+        self._pid = None
+
+    def _ensure_lanes(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads and worker processes do not survive a fork
+                self._jobs = queue.Queue()
+                self._lanes = [_Lane(self) for _ in range(self.workers)]
+                self._pid = os.getpid()
+
+    def submit(self, image, block: bool = False, timeout: float = None):
+        """
+        Queue an image for OCR.
+
+        Args:
+            image: PIL Image
+            block (bool): Wait up to `timeout` seconds for a free slot instead
+                of failing immediately (used by batch processing)
+            timeout (float): Seconds the job may run in a worker
+
+        Returns:
+            concurrent.futures.Future resolving to the extracted text
+            (OCRTimeoutError / OCRError when the job fails)
+
+        Raises:
+            OCRBusyError: when workers + queue are all occupied
+        """
+        timeout = timeout or self.timeout
+        acquired = self._slots.acquire(timeout=timeout) if block else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise OCRBusyError("Antrian OCR sedang penuh. Silakan coba lagi sebentar.")
+
+        try:
+            if image.mode not in ('L', 'RGB'):
+                image = image.convert('RGB')
+            future = Future()
+            future.add_done_callback(lambda _: self._slots.release())
+            self._ensure_lanes()
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._jobs.put((future, (image.mode, image.size, image.tobytes()), timeout))
+        return future
+
+    def image_to_string(self, image, timeout: float = None, block: bool = False) -> str:
+        """
+        OCR an image through the pool and wait for the result.
+
+        The timeout covers the time in the queue and in the worker. A job
+        that times out only restarts its own worker process.
+
+        Raises:
+            OCRBusyError: queue full
+            OCRTimeoutError: job took longer than the timeout
+            OCRError: OCR failed or the worker crashed
+        """
+        timeout = timeout or self.timeout
+        future = self.submit(image, block=block, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it. Already running: its lane enforces the timeout
+            future.cancel()
+            raise OCRTimeoutError(f"OCR melebihi batas waktu {timeout:.0f} detik")
+
+    def shutdown(self):
+        with self._lock:
+            jobs, lanes, self._pid = self._jobs, self._lanes, None
+        for _ in lanes:
+            jobs.put(None)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service(tesseract_cmd: str = None) -> OCRService:
+    """Process-wide OCRService singleton."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OCRService(tesseract_cmd=tesseract_cmd)
+        return _service
@@ -0,0 +1,182 @@
+"""
+Preview Store (Content-Addressed Thumbnails)
+============================================
+/api/analyze used to return the image preview as a base64 data URI inside
+the JSON (about 33% larger than the image itself), and the batch page kept
+every one of them in memory. Previews are now written to disk once, keyed by
+the SHA-256 of the uploaded bytes, and responses only carry their URLs:
+
+    <dir>/<key[:2]>/<key>.thumb.<webp|jpg>   small thumbnail shown in results
+    <dir>/<key[:2]>/<key>.full.<ext>         full preview, fetched on demand
+
+Because the key is derived from the content, a URL always refers to the same
+bytes and browsers may cache it for a long time. Files not used for
+PREVIEW_TTL_HOURS are deleted by a periodic sweep.
+
+Configuration (environment):
+    PREVIEW_THUMB_SIDE   longest thumbnail side in pixels (default 320)
+    PREVIEW_TTL_HOURS    lifetime of stored previews (default 24)
+"""
+
+import os
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image, features
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PREVIEW_THUMB_SIDE = int(os.environ.get('PREVIEW_THUMB_SIDE', 320))
+PREVIEW_TTL_HOURS = float(os.environ.get('PREVIEW_TTL_HOURS', 24))
+PREVIEW_THUMB_QUALITY = 75
+
+# Expired files are swept at most this often (on writes)
+SWEEP_INTERVAL_SECONDS = 600
+
+PREVIEW_VARIANTS = ('thumb', 'full')
+
+# WebP is smaller at the same quality; fall back to JPEG when Pillow lacks it
+THUMB_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'BMP': 'bmp', 'WEBP': 'webp'}
+MIMETYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif',
+             'bmp': 'image/bmp', 'webp': 'image/webp'}
+
+
+def make_thumbnail(image, side: int = PREVIEW_THUMB_SIDE, image_format: str = THUMB_FORMAT) -> bytes:
+    """Encode a small thumbnail of a PIL image (the image itself is not modified)."""
+    thumb = image.copy()
+    thumb.thumbnail((side, side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    if thumb.mode not in ('RGB', 'L'):
+        thumb = thumb.convert('RGB')
+    buf = BytesIO()
+    thumb.save(buf, format=image_format, quality=PREVIEW_THUMB_QUALITY)
+    return buf.getvalue()
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class PreviewStore:
+    """
+    Disk store of image previews under a content-hash key with TTL eviction.
+
+    Files are written atomically, so concurrent gunicorn workers never serve
+    half-written previews.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = PREVIEW_TTL_HOURS * 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def _shard(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2])
+
+    def _find(self, key: str, variant: str):
+        """Path of a stored variant, or None."""
+        prefix = f'{key}.{variant}.'
+        try:
+            names = os.listdir(self._shard(key))
+        except OSError:
+            return None
+        for name in names:
+            if name.startswith(prefix) and not name.endswith('.tmp'):
+                return os.path.join(self._shard(key), name)
+        return None
+
+    def _write(self, key: str, variant: str, extension: str, data: bytes):
+        path = os.path.join(self._shard(key), f'{key}.{variant}.{extension}')
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    # ------------------------------------------------------------------- API
+
+    def touch(self, key: str) -> bool:
+        """
+        Renew the TTL of an existing preview.
+
+        Returns:
+            bool: True when both variants are stored (nothing to generate)
+        """
+        paths = [self._find(key, variant) for variant in PREVIEW_VARIANTS]
+        if not all(paths):
+            return False
+        try:
+            for path in paths:
+                os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def save(self, key: str, image, full_data: bytes, full_format: str):
+        """
+        Store the thumbnail (generated from `image`) and the full preview.
+
+        Args:
+            key (str): Content hash of the upload
+            image: Decoded PIL image
+            full_data (bytes): Encoded full preview
+            full_format (str): PIL format name of full_data ('JPEG', 'PNG', ...)
+        """
+        try:
+            self._write(key, 'thumb', _EXTENSIONS[THUMB_FORMAT], make_thumbnail(image))
+            self._write(key, 'full', _EXTENSIONS.get(full_format, 'jpg'), full_data)
+        except OSError as e:
+            print(f"[PREVIEW] Failed to store preview: {e}")
+        self.sweep()
+
+    def get(self, key: str, variant: str):
+        """
+        Look up a stored preview.
+
+        Returns:
+            tuple or None: (path, mimetype), None when missing or expired
+        """
+        if variant not in PREVIEW_VARIANTS:
+            return None
+        path = self._find(key, variant)
+        if path is None:
+            return None
+        try:
+            expired = time.time() - os.path.getmtime(path) > self.ttl_seconds
+        except OSError:
+            return None
+        if expired:
+            return None
+        return path, MIMETYPES.get(path.rsplit('.', 1)[-1], 'application/octet-stream')
+
+    def sweep(self, force: bool = False):
+        """Delete previews older than the TTL (at most every SWEEP_INTERVAL_SECONDS)."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+                return
+            self._last_sweep = now
+
+        cutoff = time.time() - self.ttl_seconds
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
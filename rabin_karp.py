@@ -10,6 +10,19 @@ to demonstrate understanding of the algorithm for thesis purposes.
 DO NOT use Python's built-in find() or index() methods.
 """
 
+import bisect
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from html import escape as html_escape
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the scalar engine always works
+    np = None
+
 
 # =============================================================================
 # ROLLING HASH CONSTANTS
@@ -23,12 +36,181 @@ BASE = 256
 # A prime number helps distribute hash values more uniformly
 PRIME = 101
 
+# Mersenne prime 2^61 - 1: wide enough that two different windows almost
+# never share a hash value (collision probability ~ m / 2^61 per window)
+MERSENNE_61 = (1 << 61) - 1
+
+# Pair of moduli for double hashing. Hashing modulo p1 and modulo p2 at the
+# same time is equivalent (Chinese Remainder Theorem) to hashing modulo
+# p1 * p2, so the pair is stored as a single ~60-bit modulus.
+DOUBLE_HASH_MODULI = (1_000_000_007, 998_244_353)
+
+
+# =============================================================================
+# HASH BACKENDS
+# =============================================================================
+
+# name -> modulus used by the rolling hash
+#   textbook   : PRIME = 101, ~1 in 101 windows is a spurious hit (rejected by
+#                verification); fastest on the scalar engine since every value
+#                fits in a single Python int digit
+#   mersenne61 : 2^61 - 1, spurious hits practically never happen
+#   double     : two moduli combined, same strength as mersenne61
+HASH_BACKENDS = {
+    'textbook': PRIME,
+    'mersenne61': MERSENNE_61,
+    'double': DOUBLE_HASH_MODULI[0] * DOUBLE_HASH_MODULI[1],
+}
+
+DEFAULT_HASH_BACKEND = 'mersenne61'
+
+
+# =============================================================================
+# SEARCH ENGINES
+# =============================================================================
+
+#   scalar : pure-Python rolling hash, one character per loop iteration
+#   numpy  : vectorized prefix hashes over a code-point array (large texts)
+#   auto   : numpy for texts of at least NUMPY_THRESHOLD characters
+SEARCH_ENGINES = ('auto', 'scalar', 'numpy')
+
+# Text length (characters) from which 'auto' switches to the numpy engine
+NUMPY_THRESHOLD = 200_000
+
+# The numpy engine hashes the text in blocks of this many characters so
+# peak memory stays bounded for very large documents
+NUMPY_BLOCK_SIZE = 1 << 20
+
+
+def get_hash_modulus(backend: str = DEFAULT_HASH_BACKEND) -> int:
+    """
+    Resolve a hash backend name to the modulus used by the rolling hash.
+    
+    Args:
+        backend (str): One of HASH_BACKENDS ('textbook', 'mersenne61', 'double')
+        
+    Returns:
+        int: Modulus for the rolling hash
+    """
+    if backend not in HASH_BACKENDS:
+        raise ValueError(
+            f"Unknown hash backend '{backend}'. Choose one of: {', '.join(HASH_BACKENDS)}"
+        )
+    return HASH_BACKENDS[backend]
+
+
+def new_search_stats() -> dict:
+    """
+    Create an empty instrumentation record for a search.
+    
+    Counters:
+        windows_scanned : number of text windows whose hash was checked
+        hash_hits       : windows whose hash equalled a pattern hash
+        spurious_hits   : hash hits that failed character verification
+        chars_compared  : characters compared while verifying hash hits
+    
+    Also records hash_backend, the backend that actually hashed the text:
+    'double' when the numpy engine ran (it always uses DOUBLE_HASH_MODULI),
+    None when no Rabin-Karp search ran (e.g. Aho-Corasick).
+    """
+    return {
+        'windows_scanned': 0,
+        'hash_hits': 0,
+        'spurious_hits': 0,
+        'chars_compared': 0,
+        'hash_backend': None,
+    }
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase text without changing its length.
+    
+    str.lower() can lengthen a string ('İ' becomes 'i' + combining dot), which
+    would shift every position after it relative to the original text that
+    gets highlighted. Characters whose lowercase form has a different length
+    are kept as they are, so position i of the result is always character i
+    of the input.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+# =============================================================================
+# COMPILED PATTERNS
+# =============================================================================
+
+class CompiledPattern:
+    """
+    A search pattern with everything Rabin-Karp needs precomputed:
+    the normalized (lowercased) pattern, its hash and BASE^(m-1) mod PRIME.
+    
+    Compile a keyword once and reuse the object for every document in a
+    batch and for both searching and highlighting.
+    """
+    
+    __slots__ = ('pattern', 'normalized', 'length', 'backend', 'prime', 'pattern_hash', 'power')
+    
+    def __init__(self, pattern: str, backend: str = DEFAULT_HASH_BACKEND):
+        self.pattern = pattern
+        self.normalized = fold_case(pattern)
+        self.length = len(self.normalized)
+        self.backend = backend
+        self.prime = get_hash_modulus(backend)
+        
+        # hash = (char[0] * BASE^(m-1) + ... + char[m-1]) mod PRIME
+        self.pattern_hash = 0
+        for ch in self.normalized:
+            self.pattern_hash = (BASE * self.pattern_hash + ord(ch)) % self.prime
+        
+        # BASE^(m-1) mod PRIME, used to remove the leading character
+        self.power = 1
+        for _ in range(self.length - 1):
+            self.power = (self.power * BASE) % self.prime
+    
+    def search(self, text: str, stats: dict = None) -> list:
+        """Find all occurrences of this pattern in text (see rabin_karp_search)."""
+        return rabin_karp_search(text, self, stats=stats)
+    
+    def __repr__(self):
+        return f'<CompiledPattern {self.pattern!r} [{self.backend}]>'
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, backend: str = DEFAULT_HASH_BACKEND) -> CompiledPattern:
+    """
+    Compile a keyword into a reusable CompiledPattern.
+    
+    Results are memoized, so compiling the same keyword again (next
+    document, next request) costs a dictionary lookup.
+    
+    Args:
+        pattern (str): The keyword to compile
+        backend (str): Hash backend name (see HASH_BACKENDS)
+        
+    Returns:
+        CompiledPattern: Precomputed pattern object
+    """
+    return CompiledPattern(pattern, backend)
+
+
+def _as_compiled(pattern, backend: str) -> CompiledPattern:
+    """Accept a plain string or a CompiledPattern and return a CompiledPattern."""
+    if isinstance(pattern, CompiledPattern):
+        if pattern.backend == backend:
+            return pattern
+        pattern = pattern.pattern
+    return compile_pattern(pattern, backend)
+
 
 # =============================================================================
 # RABIN-KARP ALGORITHM
 # =============================================================================
 
-def rabin_karp_search(text: str, pattern: str) -> list:
+def rabin_karp_search(text: str, pattern, backend: str = None, stats: dict = None,
+                      engine: str = 'auto') -> list:
     """
     Search for all occurrences of a pattern in text using Rabin-Karp algorithm.
     
@@ -49,62 +231,78 @@ def rabin_karp_search(text: str, pattern: str) -> list:
     
     This allows O(1) hash update instead of O(m) recalculation.
     
+    The modulus ("PRIME" above) is chosen by the hash backend, see
+    HASH_BACKENDS. The textbook PRIME = 101 is kept for comparison.
+    
+    Large texts are handed to the numpy engine (see SEARCH_ENGINES), which
+    returns exactly the same positions.
+    
     Args:
         text (str): The text to search within
-        pattern (str): The pattern to search for
+        pattern (str | CompiledPattern): The pattern to search for
+        backend (str): Hash backend name (see HASH_BACKENDS). Defaults to the
+            backend of a CompiledPattern, otherwise DEFAULT_HASH_BACKEND
+        stats (dict): Optional dict (see new_search_stats) updated in place
+            with instrumentation counters
+        engine (str): 'auto', 'scalar' or 'numpy' (see SEARCH_ENGINES)
         
     Returns:
         list: List of starting indices where pattern is found
     """
+    if stats is None:
+        stats = new_search_stats()
+    
     # Handle edge cases
     if not pattern or not text:
         return []
     
-    if len(pattern) > len(text):
-        return []
+    if backend is None:
+        backend = pattern.backend if isinstance(pattern, CompiledPattern) else DEFAULT_HASH_BACKEND
+    
+    # Pattern hash, BASE^(m-1) mod PRIME and the lowercased pattern
+    # come precomputed from the compiled pattern
+    compiled = _as_compiled(pattern, backend)
+    prime = compiled.prime
+    h = compiled.power
+    pattern_hash = compiled.pattern_hash
+    pattern = compiled.normalized
     
     # Convert to lowercase for case-insensitive search
-    text = text.lower()
-    pattern = pattern.lower()
+    text = fold_case(text)
+    
+    n = len(text)         # Length of text
+    m = compiled.length   # Length of pattern
+    
+    if m == 0 or m > n:
+        return []
     
-    n = len(text)      # Length of text
-    m = len(pattern)   # Length of pattern
+    if select_engine(engine, n) == 'numpy':
+        stats['hash_backend'] = 'double'
+        return _numpy_search_multi(text, [compiled], stats)[compiled.pattern]
+    stats['hash_backend'] = backend
     
     # List to store found positions
     found_positions = []
     
-    # Calculate hash value for pattern
-    pattern_hash = 0
-    
     # Calculate hash value for first window of text
-    text_hash = 0
-    
-    # Precompute BASE^(m-1) mod PRIME
-    # This value is used to remove the leading digit when sliding the window
-    h = 1
-    for _ in range(m - 1):
-        h = (h * BASE) % PRIME
-    
-    # Calculate initial hash values for pattern and first window of text
     # hash = (char[0] * BASE^(m-1) + char[1] * BASE^(m-2) + ... + char[m-1]) mod PRIME
+    text_hash = 0
     for i in range(m):
-        pattern_hash = (BASE * pattern_hash + ord(pattern[i])) % PRIME
-        text_hash = (BASE * text_hash + ord(text[i])) % PRIME
+        text_hash = (BASE * text_hash + ord(text[i])) % prime
+    
+    stats['windows_scanned'] += n - m + 1
     
     # Slide the pattern over text one character at a time
     for i in range(n - m + 1):
         # If hash values match, verify with actual string comparison
         # (to handle hash collisions - "spurious hits")
         if pattern_hash == text_hash:
+            stats['hash_hits'] += 1
             # Character-by-character comparison to confirm match
-            match = True
-            for j in range(m):
-                if text[i + j] != pattern[j]:
-                    match = False
-                    break
-            
-            if match:
+            if _verify_window(text, i, pattern, stats):
                 found_positions.append(i)
+            else:
+                stats['spurious_hits'] += 1
         
         # Calculate hash for next window using rolling hash
         # Only if we're not at the last position
@@ -118,53 +316,879 @@ def rabin_karp_search(text: str, pattern: str) -> list:
             leading_char = ord(text[i])
             trailing_char = ord(text[i + m])
             
-            text_hash = (BASE * (text_hash - leading_char * h) + trailing_char) % PRIME
+            text_hash = (BASE * (text_hash - leading_char * h) + trailing_char) % prime
             
             # Handle negative hash values (Python handles negative mod, but being explicit)
             if text_hash < 0:
-                text_hash += PRIME
+                text_hash += prime
     
     return found_positions
 
 
-def highlight_matches(text: str, pattern: str) -> str:
+def _verify_window(text: str, start: int, pattern: str, stats: dict) -> bool:
+    """
+    Character-by-character comparison of text[start:start+len(pattern)]
+    against pattern. Used to confirm a hash hit (rule out spurious hits).
+    Every compared character is counted in stats['chars_compared'].
+    """
+    for j in range(len(pattern)):
+        stats['chars_compared'] += 1
+        if text[start + j] != pattern[j]:
+            return False
+    return True
+
+
+def rabin_karp_search_multi(text: str, patterns: list, backend: str = DEFAULT_HASH_BACKEND,
+                            stats: dict = None, engine: str = 'auto') -> dict:
+    """
+    Search for several patterns at once using a single pass over the text.
+    
+    Patterns are grouped by length. Each length group keeps its own rolling
+    hash and a hash table {hash_value: [patterns]}, so at every text position
+    the current window of each length is checked against all patterns of
+    that length with one dictionary lookup, instead of scanning the whole
+    text once per pattern.
+    
+    Args:
+        text (str): The text to search within
+        patterns (list): Patterns (str or CompiledPattern) to search for
+        backend (str): Hash backend name (see HASH_BACKENDS)
+        stats (dict): Optional dict (see new_search_stats) updated in place
+            with instrumentation counters
+        engine (str): 'auto', 'scalar' or 'numpy' (see SEARCH_ENGINES)
+        
+    Returns:
+        dict: {pattern: [positions]} keyed by the original pattern strings
+    """
+    prime = get_hash_modulus(backend)
+    if stats is None:
+        stats = new_search_stats()
+    
+    compiled_patterns = [_as_compiled(pattern, backend) for pattern in patterns if pattern]
+    results = {compiled.pattern: [] for compiled in compiled_patterns}
+    
+    if not text or not compiled_patterns:
+        return results
+    
+    # Convert to lowercase for case-insensitive search
+    text = fold_case(text)
+    n = len(text)
+    
+    if select_engine(engine, n) == 'numpy':
+        stats['hash_backend'] = 'double'
+        return _numpy_search_multi(text, compiled_patterns, stats)
+    stats['hash_backend'] = backend
+    
+    # Group patterns by length: {m: {pattern_hash: {pattern_lower: [originals]}}}
+    groups = {}
+    powers = {}
+    for compiled in compiled_patterns:
+        m = compiled.length
+        if m == 0 or m > n:
+            continue
+        originals = groups.setdefault(m, {}) \
+            .setdefault(compiled.pattern_hash, {}) \
+            .setdefault(compiled.normalized, [])
+        if compiled.pattern not in originals:
+            originals.append(compiled.pattern)
+        powers[m] = compiled.power
+    
+    if not groups:
+        return results
+    
+    # Per-length rolling state: [m, BASE^(m-1) mod PRIME, current window hash]
+    states = []
+    for m in sorted(groups):
+        states.append([m, powers[m], 0])
+        stats['windows_scanned'] += n - m + 1
+    
+    # Single pass: every character updates the rolling hash of every group
+    for i in range(n):
+        char = ord(text[i])
+        for state in states:
+            m, h, window_hash = state
+            if i >= m:
+                # Slide: remove leading character, shift, add trailing character
+                window_hash = (BASE * (window_hash - ord(text[i - m]) * h) + char) % prime
+            else:
+                # Still building the first window of this length
+                window_hash = (BASE * window_hash + char) % prime
+            state[2] = window_hash
+            
+            if i < m - 1:
+                continue
+            
+            candidates = groups[m].get(window_hash)
+            if candidates:
+                stats['hash_hits'] += 1
+                start = i - m + 1
+                matched = False
+                for pattern_lower, originals in candidates.items():
+                    if _verify_window(text, start, pattern_lower, stats):
+                        matched = True
+                        for original in originals:
+                            results[original].append(start)
+                if not matched:
+                    stats['spurious_hits'] += 1
+    
+    return results
+
+
+# =============================================================================
+# STREAMING SEARCH
+# =============================================================================
+
+class RabinKarpStream:
+    """
+    Incremental multi-pattern Rabin-Karp over a sequence of text chunks
+    (e.g. PDF pages), without ever holding the whole text.
+    
+    The rolling hash of every pattern length is carried across chunk
+    boundaries, together with the last max_m characters needed to slide the
+    window and verify hits, so a match that spans a page break is still found.
+    
+    Usage:
+        stream = RabinKarpStream(['metodologi', 'sampel'])
+        for page_number, page_text in pages:
+            for match in stream.feed(page_text, page_number):
+                ...
+    """
+    
+    def __init__(self, patterns: list, backend: str = DEFAULT_HASH_BACKEND, stats: dict = None):
+        self.stats = stats if stats is not None else new_search_stats()
+        self.stats['hash_backend'] = backend
+        self.offset = 0     # Absolute offset of the next character to be fed
+        self.tail = ''      # Last max_m lowercased characters already fed
+        self.pages = []     # [(chunk_start_offset, page)] still covering the tail
+        
+        # {m: {pattern_hash: {pattern_lower: [originals]}}}
+        self.groups = {}
+        powers = {}
+        for pattern in patterns:
+            if not pattern:
+                continue
+            compiled = _as_compiled(pattern, backend)
+            if compiled.length == 0:
+                continue
+            originals = self.groups.setdefault(compiled.length, {}) \
+                .setdefault(compiled.pattern_hash, {}) \
+                .setdefault(compiled.normalized, [])
+            if compiled.pattern not in originals:
+                originals.append(compiled.pattern)
+            powers[compiled.length] = compiled.power
+        
+        self.prime = get_hash_modulus(backend)
+        self.max_m = max(self.groups) if self.groups else 0
+        # Per-length rolling state: [m, BASE^(m-1) mod PRIME, current window hash]
+        self.states = [[m, powers[m], 0] for m in sorted(self.groups)]
+    
+    def _page_at(self, position: int):
+        """Page number of the chunk containing the absolute position."""
+        page = None
+        for chunk_start, chunk_page in self.pages:
+            if chunk_start > position:
+                break
+            page = chunk_page
+        return page
+    
+    def feed(self, chunk: str, page=None) -> list:
+        """
+        Search the next chunk of text.
+        
+        Args:
+            chunk (str): Next piece of the text
+            page: Page number (or any label) reported for matches starting
+                in this chunk
+            
+        Returns:
+            list: [{'pattern', 'position', 'page'}] for every match that ends
+                in this chunk; positions are absolute offsets in the stream
+        """
+        if not chunk:
+            return []
+        
+        chunk = fold_case(chunk)
+        matches = []
+        self.pages.append((self.offset, page))
+        
+        if self.states:
+            prime = self.prime
+            stats = self.stats
+            # buffer[k] is the character at absolute offset buffer_start + k
+            buffer = self.tail + chunk
+            buffer_start = self.offset - len(self.tail)
+            
+            for k in range(len(self.tail), len(buffer)):
+                char = ord(buffer[k])
+                absolute = buffer_start + k
+                for state in self.states:
+                    m, h, window_hash = state
+                    if absolute >= m:
+                        leading = ord(buffer[k - m])
+                        window_hash = (BASE * (window_hash - leading * h) + char) % prime
+                    else:
+                        window_hash = (BASE * window_hash + char) % prime
+                    state[2] = window_hash
+                    
+                    if absolute < m - 1:
+                        continue
+                    
+                    stats['windows_scanned'] += 1
+                    candidates = self.groups[m].get(window_hash)
+                    if candidates:
+                        stats['hash_hits'] += 1
+                        start = k - m + 1
+                        matched = False
+                        for pattern_lower, originals in candidates.items():
+                            if _verify_window(buffer, start, pattern_lower, stats):
+                                matched = True
+                                position = buffer_start + start
+                                match_page = self._page_at(position)
+                                for original in originals:
+                                    matches.append({
+                                        'pattern': original,
+                                        'position': position,
+                                        'page': match_page,
+                                    })
+                        if not matched:
+                            stats['spurious_hits'] += 1
+            
+            self.tail = buffer[-self.max_m:]
+        
+        self.offset += len(chunk)
+        
+        # Forget chunks that no longer overlap the carried tail
+        tail_start = self.offset - len(self.tail)
+        while len(self.pages) > 1 and self.pages[1][0] <= tail_start:
+            self.pages.pop(0)
+        
+        return matches
+
+
+def rabin_karp_search_stream(chunks, patterns: list, backend: str = DEFAULT_HASH_BACKEND,
+                             stats: dict = None):
+    """
+    Streaming Rabin-Karp search over an iterable of text chunks.
+    
+    Args:
+        chunks: Iterable of str (page number = 1-based chunk index) or of
+            (page_number, str) tuples, e.g. a page generator
+        patterns (list): Patterns (str or CompiledPattern) to search for
+        backend (str): Hash backend name (see HASH_BACKENDS)
+        stats (dict): Optional dict (see new_search_stats) updated in place
+        
+    Yields:
+        dict: {'pattern', 'position', 'page'} with absolute offsets into the
+            concatenation of all chunks, as soon as each match is found
+    """
+    stream = RabinKarpStream(patterns, backend=backend, stats=stats)
+    for index, chunk in enumerate(chunks):
+        if isinstance(chunk, tuple):
+            page, chunk = chunk
+        else:
+            page = index + 1
+        yield from stream.feed(chunk, page)
+
+
+# =============================================================================
+# NUMPY ENGINE
+# =============================================================================
+#
+# The scalar engine updates one rolling hash per character in a Python loop.
+# The numpy engine computes every window hash of a block at once:
+#
+#   codes[i]   = ord(text[i])
+#   prefix[k]  = (codes[0]*B^0 + codes[1]*B^1 + ... + codes[k-1]*B^(k-1)) mod p
+#   window(i)  = (prefix[i+m] - prefix[i]) * B^(-i) mod p
+#              = (codes[i]*B^0 + codes[i+1]*B^1 + ... + codes[i+m-1]*B^(m-1)) mod p
+#
+# so the hash of the window starting at i no longer depends on i and can be
+# compared against all pattern hashes of length m with a single np.isin().
+# Two ~30-bit moduli (DOUBLE_HASH_MODULI) keep every product inside int64;
+# the pair is combined into one key h1 * p2 + h2. Only candidate windows are
+# verified character by character in Python.
+
+# modulus -> (B^i mod p, B^-i mod p) arrays, grown on demand
+_numpy_power_tables = {}
+
+
+def select_engine(engine: str, text_length: int) -> str:
+    """
+    Resolve the search engine for a text of the given length.
+    
+    'auto' picks numpy for texts of at least NUMPY_THRESHOLD characters when
+    numpy is installed. The choice does not depend on the hash backend: the
+    numpy engine always hashes with its own pair of moduli. Pass
+    engine='scalar' to observe the classic PRIME = 101 behaviour of the
+    'textbook' backend on large texts.
+    
+    Returns:
+        str: 'scalar' or 'numpy'
+    """
+    if engine not in SEARCH_ENGINES:
+        raise ValueError(f"Unknown search engine '{engine}'. Choose one of: {', '.join(SEARCH_ENGINES)}")
+    if engine == 'auto':
+        if np is not None and text_length >= NUMPY_THRESHOLD:
+            return 'numpy'
+        return 'scalar'
+    if engine == 'numpy' and np is None:
+        raise RuntimeError("The numpy search engine requires numpy to be installed")
+    return engine
+
+
+def _numpy_power_table(base: int, modulus: int, size: int):
+    """base^i mod modulus for i in [0, size), built by repeated doubling."""
+    table = np.ones(1, dtype=np.int64)
+    step = base % modulus  # base^len(table)
+    while len(table) < size:
+        table = np.concatenate((table, table * step % modulus))
+        step = step * step % modulus
+    return table[:size]
+
+
+def _numpy_powers(modulus: int, size: int):
+    """Cached (B^i, B^-i) mod modulus tables with at least `size` entries."""
+    tables = _numpy_power_tables.get(modulus)
+    if tables is None or len(tables[0]) < size:
+        tables = (
+            _numpy_power_table(BASE, modulus, size),
+            _numpy_power_table(pow(BASE, -1, modulus), modulus, size),
+        )
+        _numpy_power_tables[modulus] = tables
+    return tables
+
+
+def _numpy_pattern_key(pattern: str) -> int:
+    """Position-independent hash of a normalized pattern (see NUMPY ENGINE)."""
+    key = 0
+    for modulus in DOUBLE_HASH_MODULI:
+        value = 0
+        power = 1
+        for ch in pattern:
+            value = (value + ord(ch) * power) % modulus
+            power = power * BASE % modulus
+        key = key * modulus + value
+    return key
+
+
+def _numpy_search_multi(text: str, compiled_patterns: list, stats: dict,
+                        block_size: int = None) -> dict:
+    """
+    Vectorized multi-pattern search over an already case-folded text (fold_case).
+    
+    Returns the same {pattern: [positions]} mapping as the scalar engine.
+    """
+    block_size = block_size or NUMPY_BLOCK_SIZE
+    results = {compiled.pattern: [] for compiled in compiled_patterns}
+    n = len(text)
+    
+    # {m: {window_key: {pattern_lower: [originals]}}}
+    groups = {}
+    for compiled in compiled_patterns:
+        m = compiled.length
+        if m == 0 or m > n:
+            continue
+        originals = groups.setdefault(m, {}) \
+            .setdefault(_numpy_pattern_key(compiled.normalized), {}) \
+            .setdefault(compiled.normalized, [])
+        if compiled.pattern not in originals:
+            originals.append(compiled.pattern)
+    
+    if not groups:
+        return results
+    
+    max_m = max(groups)
+    targets = {m: np.fromiter(table.keys(), dtype=np.int64, count=len(table))
+               for m, table in groups.items()}
+    powers = [(modulus, *_numpy_powers(modulus, min(block_size, n) + max_m))
+              for modulus in DOUBLE_HASH_MODULI]
+    
+    for block_start in range(0, n, block_size):
+        # Windows starting in this block may run max_m - 1 characters past it
+        chunk = text[block_start:block_start + block_size + max_m - 1]
+        codes = np.frombuffer(chunk.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        
+        prefixes = []
+        for modulus, pw, inv in powers:
+            prefix = np.zeros(len(codes) + 1, dtype=np.int64)
+            np.cumsum(codes * pw[:len(codes)] % modulus, out=prefix[1:])
+            prefixes.append((modulus, prefix % modulus, inv))
+        
+        for m, table in groups.items():
+            count = min(block_size, n - m + 1 - block_start)
+            if count <= 0:
+                continue
+            stats['windows_scanned'] += count
+            
+            keys = None
+            for modulus, prefix, inv in prefixes:
+                window = (prefix[m:m + count] - prefix[:count]) % modulus * inv[:count] % modulus
+                keys = window if keys is None else keys * modulus + window
+            
+            hits = np.flatnonzero(np.isin(keys, targets[m]))
+            stats['hash_hits'] += len(hits)
+            
+            for i in hits.tolist():
+                start = block_start + i
+                matched = False
+                for pattern_lower, originals in table[int(keys[i])].items():
+                    if _verify_window(text, start, pattern_lower, stats):
+                        matched = True
+                        for original in originals:
+                            results[original].append(start)
+                if not matched:
+                    stats['spurious_hits'] += 1
+    
+    return results
+
+
+# =============================================================================
+# AHO-CORASICK (LARGE KEYWORD DICTIONARIES)
+# =============================================================================
+#
+# Rabin-Karp keeps one rolling hash per distinct pattern length, so a
+# dictionary of hundreds of terms with many lengths costs many hash updates
+# per character. Aho-Corasick builds a trie of all terms with failure links
+# and finds every term in one linear scan, regardless of dictionary size.
+
+# Number of compiled automatons kept in memory (LRU)
+AUTOMATON_CACHE_SIZE = 32
+
+_automaton_cache = OrderedDict()
+_automaton_cache_lock = threading.Lock()
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a set of lowercased patterns.
+    
+    Build it once per dictionary (see get_automaton, which caches it) and
+    reuse it for every document.
+    """
+    
+    def __init__(self, patterns: list):
+        self.patterns = sorted({fold_case(p) for p in patterns if p})
+        self.lengths = [len(p) for p in self.patterns]
+        self.max_length = max(self.lengths) if self.lengths else 0
+        
+        # Trie: goto[state] = {char: next_state}; out[state] = pattern ids
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = next_state
+            self.out[state].append(pattern_id)
+        
+        # Failure links, breadth-first: fail[s] is the longest proper suffix
+        # of s that is also a trie prefix. Outputs of the suffix are inherited.
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.out[next_state] = self.out[next_state] + self.out[self.fail[next_state]]
+    
+    def _step(self, state: int, ch: str) -> int:
+        """Follow one character, using failure links on mismatch."""
+        goto = self.goto
+        while state and ch not in goto[state]:
+            state = self.fail[state]
+        return goto[state].get(ch, 0)
+    
+    def search(self, text: str, stats: dict = None) -> dict:
+        """
+        Find every pattern in one pass over text (case-insensitive).
+        
+        Returns:
+            dict: {pattern_lower: [positions]} for all patterns of the automaton
+        """
+        results = {pattern: [] for pattern in self.patterns}
+        if not text or not self.patterns:
+            return results
+        
+        text = fold_case(text)
+        if stats is not None:
+            stats['windows_scanned'] += len(text)
+        
+        patterns, lengths, out = self.patterns, self.lengths, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            state = self._step(state, ch)
+            for pattern_id in out[state]:
+                results[patterns[pattern_id]].append(i - lengths[pattern_id] + 1)
+        
+        return results
+    
+    def search_stream(self, chunks, stats: dict = None):
+        """
+        Streaming variant of search() over an iterable of chunks.
+        The automaton state carries over chunk boundaries.
+        
+        Args:
+            chunks: Iterable of str or (page_number, str) tuples
+            
+        Yields:
+            dict: {'pattern', 'position', 'page'} (pattern is lowercased)
+        """
+        patterns, lengths, out = self.patterns, self.lengths, self.out
+        chunk_starts = []
+        chunk_pages = []
+        offset = 0
+        state = 0
+        
+        for index, chunk in enumerate(chunks):
+            if isinstance(chunk, tuple):
+                page, chunk = chunk
+            else:
+                page = index + 1
+            if not chunk:
+                continue
+            
+            chunk = fold_case(chunk)
+            chunk_starts.append(offset)
+            chunk_pages.append(page)
+            if stats is not None:
+                stats['windows_scanned'] += len(chunk)
+            
+            for i, ch in enumerate(chunk):
+                state = self._step(state, ch)
+                for pattern_id in out[state]:
+                    position = offset + i - lengths[pattern_id] + 1
+                    yield {
+                        'pattern': patterns[pattern_id],
+                        'position': position,
+                        'page': chunk_pages[bisect.bisect_right(chunk_starts, position) - 1],
+                    }
+            offset += len(chunk)
+    
+    def __repr__(self):
+        return f'<AhoCorasick {len(self.patterns)} patterns, {len(self.goto)} states>'
+
+
+def dictionary_key(patterns: list) -> str:
+    """SHA-256 of the normalized, de-duplicated dictionary (automaton cache key)."""
+    normalized = sorted({fold_case(p) for p in patterns if p})
+    return hashlib.sha256('\x00'.join(normalized).encode('utf-8')).hexdigest()
+
+
+def get_automaton(patterns: list) -> AhoCorasick:
+    """
+    Return the Aho-Corasick automaton for a dictionary, building it only
+    the first time. Automatons are cached (LRU, AUTOMATON_CACHE_SIZE) by
+    dictionary_key, so the same term list reused across requests is not
+    rebuilt.
+    """
+    key = dictionary_key(patterns)
+    with _automaton_cache_lock:
+        automaton = _automaton_cache.get(key)
+        if automaton is not None:
+            _automaton_cache.move_to_end(key)
+            return automaton
+    
+    automaton = AhoCorasick(patterns)
+    
+    with _automaton_cache_lock:
+        _automaton_cache[key] = automaton
+        while len(_automaton_cache) > AUTOMATON_CACHE_SIZE:
+            _automaton_cache.popitem(last=False)
+    return automaton
+
+
+def _pattern_strings(patterns: list) -> list:
+    """Original pattern strings of a list of str / CompiledPattern."""
+    return [p.pattern if isinstance(p, CompiledPattern) else p for p in patterns if p]
+
+
+def aho_corasick_search(text: str, patterns: list, stats: dict = None) -> dict:
+    """
+    Multi-pattern search with a (cached) Aho-Corasick automaton.
+    
+    Args:
+        text (str): The text to search within
+        patterns (list): Patterns (str or CompiledPattern) to search for
+        stats (dict): Optional dict (see new_search_stats); only
+            windows_scanned (= characters scanned) applies here
+        
+    Returns:
+        dict: {pattern: [positions]} keyed by the original pattern strings,
+            same shape as rabin_karp_search_multi
+    """
+    originals = _pattern_strings(patterns)
+    found = get_automaton(originals).search(text, stats)
+    return {original: list(found[fold_case(original)]) for original in originals}
+
+
+def aho_corasick_search_stream(chunks, patterns: list, stats: dict = None):
+    """
+    Streaming Aho-Corasick search, same interface as rabin_karp_search_stream.
+    
+    Yields:
+        dict: {'pattern', 'position', 'page'} keyed by the original pattern
+    """
+    by_normalized = {}
+    for original in _pattern_strings(patterns):
+        originals = by_normalized.setdefault(fold_case(original), [])
+        if original not in originals:
+            originals.append(original)
+    
+    for match in get_automaton(list(by_normalized)).search_stream(chunks, stats):
+        for original in by_normalized[match['pattern']]:
+            yield dict(match, pattern=original)
+
+
+# =============================================================================
+# APPROXIMATE MATCHING (NOISY OCR TEXT)
+# =============================================================================
+#
+# OCR output often contains one-character errors ("metodo1ogi"), which exact
+# matching misses. Myers' bit-parallel algorithm keeps one column of the
+# edit-distance matrix as bit vectors (Python ints, so any pattern length
+# works) and updates it in O(m / word size) per text character, giving the
+# edit distance of the best match ending at every position in one linear
+# scan. The start of each match is recovered afterwards with a small DP.
+
+# An approximate match may use at most this fraction of the pattern length
+# as edits, so short keywords ("uji") are never matched almost anywhere
+MAX_EDIT_RATIO = 0.25
+
+
+def effective_max_edits(pattern: str, max_edits: int) -> int:
+    """Clamp the allowed edits for a pattern to MAX_EDIT_RATIO of its length."""
+    return max(0, min(max_edits, int(len(pattern) * MAX_EDIT_RATIO)))
+
+
+def _myers_match_ends(text: str, pattern: str, max_edits: int):
+    """
+    Myers' bit-vector scan.
+    
+    Yields:
+        tuple: (end_index, distance) for every text position where a match
+            of pattern with at most max_edits edits ends
+    """
+    m = len(pattern)
+    mask = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    
+    # peq[c]: bit i set when pattern[i] == c
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    
+    pv = mask   # vertical +1 deltas
+    mv = 0      # vertical -1 deltas
+    score = m   # edit distance of pattern vs. best substring ending here
+    
+    for j, ch in enumerate(text):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high_bit:
+            score += 1
+        elif mh & high_bit:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score <= max_edits:
+            yield j, score
+
+
+def _match_start(text: str, end: int, pattern: str, distance: int) -> int:
+    """
+    Find where the best match ending at `end` starts: DP of the reversed
+    pattern against the text read backwards from `end`, picking the start
+    that reaches `distance` with the span length closest to the pattern's.
+    """
+    m = len(pattern)
+    window = text[max(0, end - m - distance + 1):end + 1][::-1]
+    reversed_pattern = pattern[::-1]
+    
+    # previous[j] = edit distance of reversed_pattern[:i] vs window[:j]
+    previous = list(range(len(window) + 1))
+    for i in range(1, m + 1):
+        current = [i] + [0] * len(window)
+        for j in range(1, len(window) + 1):
+            cost = 0 if reversed_pattern[i - 1] == window[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        previous = current
+    
+    best_length = min(
+        (j for j in range(len(window) + 1) if previous[j] == distance),
+        key=lambda j: (abs(j - m), j),
+        default=m,
+    )
+    return end - best_length + 1
+
+
+def approximate_search(text: str, pattern, max_edits: int = 1) -> list:
+    """
+    Find approximate occurrences of pattern in text (case-insensitive),
+    allowing up to max_edits insertions, deletions or substitutions.
+    
+    Overlapping candidates are resolved greedily: lowest edit distance
+    first, then leftmost, so each region of the text is reported once.
+    
+    Args:
+        text (str): The text to search within
+        pattern (str | CompiledPattern): The pattern to search for
+        max_edits (int): Maximum edit distance (clamped by MAX_EDIT_RATIO)
+        
+    Returns:
+        list: [{'position', 'length', 'distance'}] sorted by position;
+            positions index the lowercased text like rabin_karp_search
+    """
+    pattern = pattern.normalized if isinstance(pattern, CompiledPattern) else fold_case(pattern or '')
+    if not pattern or not text:
+        return []
+    
+    text = fold_case(text)
+    max_edits = effective_max_edits(pattern, max_edits)
+    
+    candidates = []
+    for end, distance in _myers_match_ends(text, pattern, max_edits):
+        start = _match_start(text, end, pattern, distance)
+        candidates.append((distance, start, end + 1))
+    
+    # Keep the best non-overlapping spans
+    covered = set()
+    matches = []
+    for distance, start, end in sorted(candidates):
+        if any(i in covered for i in range(start, end)):
+            continue
+        covered.update(range(start, end))
+        matches.append({'position': start, 'length': end - start, 'distance': distance})
+    
+    matches.sort(key=lambda match: match['position'])
+    return matches
+
+
+def approximate_search_multi(text: str, patterns: list, max_edits: int = 1) -> dict:
+    """
+    approximate_search() for several patterns.
+    
+    Returns:
+        dict: {pattern: [{'position', 'length', 'distance'}]} keyed by the
+            original pattern strings
+    """
+    return {pattern: approximate_search(text, pattern, max_edits) for pattern in _pattern_strings(patterns)}
+
+
+def highlight_matches(text: str, pattern, positions: list = None, css_class: str = None) -> str:
     """
     Find all occurrences of pattern in text and wrap them with <mark> tags.
     
     This function preserves the original case of the text while performing
-    case-insensitive search.
+    case-insensitive search. The rest of the text is HTML-escaped.
     
     Args:
         text (str): The original text
-        pattern (str): The pattern to search for and highlight
+        pattern (str | CompiledPattern): The pattern to search for and highlight
+        positions (list): Positions already returned by rabin_karp_search;
+            pass them to avoid searching the same text twice
+        css_class (str): Optional class attribute for the <mark> tags
         
     Returns:
         str: Text with matched patterns wrapped in <mark> tags
     """
     if not pattern or not text:
-        return text
+        return html_escape(text or '')
     
     # Find all positions using Rabin-Karp
-    positions = rabin_karp_search(text, pattern)
+    if positions is None:
+        positions = rabin_karp_search(text, pattern)
     
-    if not positions:
+    key = pattern.pattern if isinstance(pattern, CompiledPattern) else pattern
+    return highlight_multi(text, {key: positions}, default_class=css_class)
+
+
+def highlight_multi(text: str, keyword_positions: dict, css_classes: dict = None,
+                    default_class: str = None) -> str:
+    """
+    Highlight the matches of several patterns in one forward pass.
+    
+    The output is built left to right from the (already sorted) positions of
+    each pattern, so the cost is O(text length + matches) instead of
+    rebuilding the whole string once per match. Text outside and inside the
+    matches is HTML-escaped on the way, and overlapping or nested matches
+    are merged into a single <mark> (with the class of the match that
+    started first).
+    
+    Args:
+        text (str): The original text
+        keyword_positions (dict): {pattern: [positions]}, e.g. the result of
+            rabin_karp_search_multi. A position may also be a (start, end)
+            tuple for matches whose length differs from the pattern's
+            (approximate matches)
+        css_classes (dict): Optional {pattern: css_class}, so each keyword
+            can be styled differently
+        default_class (str): Class for patterns missing from css_classes
+        
+    Returns:
+        str: Escaped text with matches wrapped in <mark> tags
+    """
+    if not text:
         return text
     
-    # Build highlighted text
-    # We need to work from end to start to preserve indices
-    result = text
-    pattern_len = len(pattern)
+    css_classes = css_classes or {}
+    
+    def spans(pattern, positions):
+        length = pattern.length if isinstance(pattern, CompiledPattern) else len(fold_case(pattern))
+        key = pattern.pattern if isinstance(pattern, CompiledPattern) else pattern
+        css_class = css_classes.get(key, default_class)
+        for position in positions:
+            if isinstance(position, tuple):
+                yield position[0], position[1], css_class or ''
+            else:
+                yield position, position + length, css_class or ''
     
-    # Sort positions in reverse order to maintain correct indices while inserting
-    for pos in sorted(positions, reverse=True):
-        # Extract the original text (preserving case)
-        original_match = result[pos:pos + pattern_len]
-        # Wrap with <mark> tags
-        highlighted = f"<mark>{original_match}</mark>"
-        # Replace in result
-        result = result[:pos] + highlighted + result[pos + pattern_len:]
+    # Merge the per-pattern sorted position lists into one sorted stream
+    merged = heapq.merge(*(spans(pattern, sorted(positions))
+                           for pattern, positions in keyword_positions.items()))
     
-    return result
+    parts = []
+    cursor = 0          # End of the text already written
+    current = None      # [start, end, css_class] of the open highlight
+    
+    def flush(span):
+        start, end, css_class = span
+        attribute = f' class="{css_class}"' if css_class else ''
+        parts.append(html_escape(text[cursor:start], quote=False))
+        parts.append(f'<mark{attribute}>{html_escape(text[start:end], quote=False)}</mark>')
+    
+    for start, end, css_class in merged:
+        if current is not None and start < current[1]:
+            # Overlap: extend the open highlight
+            current[1] = max(current[1], end)
+            continue
+        if current is not None:
+            flush(current)
+            cursor = current[1]
+        current = [start, end, css_class]
+    
+    if current is not None:
+        flush(current)
+        cursor = current[1]
+    
+    parts.append(html_escape(text[cursor:], quote=False))
+    return ''.join(parts)
 
 
 # =============================================================================
@@ -196,13 +1220,15 @@ def get_match_info(text: str, pattern: str) -> dict:
     Returns:
         dict: Dictionary containing match information
     """
-    positions = rabin_karp_search(text, pattern)
+    stats = new_search_stats()
+    positions = rabin_karp_search(text, pattern, stats=stats)
     
     return {
         'pattern': pattern,
         'count': len(positions),
         'positions': positions,
-        'found': len(positions) > 0
+        'found': len(positions) > 0,
+        'stats': stats
     }
 
 
@@ -219,3 +1245,25 @@ if __name__ == "__main__":
     print(f"Pattern: '{test_pattern}'")
     print(f"Positions found: {rabin_karp_search(test_text, test_pattern)}")
     print(f"Highlighted: {highlight_matches(test_text, test_pattern)}")
+    print(f"Multi-pattern: {rabin_karp_search_multi(test_text, ['the', 'dog', 'fox'])}")
+    
+    # Compare hash backends: spurious hits of the textbook PRIME = 101
+    # versus the wide-modulus backends
+    long_text = test_text * 200
+    for backend in HASH_BACKENDS:
+        stats = new_search_stats()
+        rabin_karp_search(long_text, "fox", backend=backend, stats=stats)
+        print(f"[{backend:>10}] {stats}")
+    
+    # Streaming search: a match split across two pages is still found
+    pages = ["Bab 3 membahas meto", "dologi penelitian.", " Metodologi kualitatif."]
+    for match in rabin_karp_search_stream(pages, ["metodologi"]):
+        print(f"Stream match: {match}")
+    
+    # Aho-Corasick (many keywords); engine equivalence is covered by tests/test_rabin_karp.py
+    dictionary = ["he", "she", "his", "hers", "the", "dog", "e"]
+    print(f"Aho-Corasick: {get_automaton(dictionary)} -> {aho_corasick_search(test_text, dictionary)}")
+    
+    # Approximate matching finds OCR-damaged keywords
+    ocr_text = "Bab III Metodo1ogi Penelitian dan metodologi analisis"
+    print(f"Approximate: {approximate_search(ocr_text, 'metodologi', max_edits=1)}")
@@ -0,0 +1,86 @@
+"""Memory LRU, SQLite tier and TTL expiry of ai_cache.py."""
+
+import sqlite3
+
+from ai_cache import AIResultCache, make_ai_cache_key
+
+
+MODEL = 'llama-3.1-8b-instant'
+RESULT = {'summary': '{}', 'parsed': {}, 'is_json': True}
+
+
+def test_key_depends_on_prompt_and_model():
+    key = make_ai_cache_key('analisis dokumen', MODEL)
+    assert len(key) == 64
+    assert key == make_ai_cache_key('analisis dokumen', MODEL)
+    assert key != make_ai_cache_key('analisis dokumen lain', MODEL)
+    assert key != make_ai_cache_key('analisis dokumen', 'llama-3.3-70b-versatile')
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'data' / 'ai_cache.sqlite3')
+    cache = AIResultCache(path, memory_entries=2)
+    key = make_ai_cache_key('analisis dokumen', MODEL)
+    assert cache.get(key) is None
+    cache.put(key, RESULT, model=MODEL)
+    assert cache.get(key) == RESULT
+
+    # A fresh process-level cache still finds the entry in SQLite
+    other = AIResultCache(path)
+    assert other.get(key) == RESULT
+    assert other.get(key) == RESULT
+    assert other.stats == {'memory_hits': 1, 'sqlite_hits': 1, 'misses': 0}
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = AIResultCache(memory_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    assert cache.get('a') == {'n': 1}  # 'b' is now the oldest
+    cache.put('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('c') == {'n': 3}
+
+
+def test_expired_entries_miss_in_both_tiers(tmp_path):
+    path = str(tmp_path / 'ai_cache.sqlite3')
+    cache = AIResultCache(path)
+    cache.put('k', RESULT, model=MODEL)
+
+    cache.ttl_seconds = -1
+    assert cache.get('k') is None
+    assert AIResultCache(path, ttl_seconds=-1).get('k') is None
+    assert 'k' not in cache._memory
+
+
+def test_expired_rows_are_purged_on_write(tmp_path):
+    path = str(tmp_path / 'ai_cache.sqlite3')
+    AIResultCache(path).put('old', RESULT)
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE ai_results SET created_at = created_at - 7200 WHERE key = 'old'")
+
+    AIResultCache(path, ttl_seconds=3600).put('new', RESULT)
+
+    with sqlite3.connect(path) as connection:
+        keys = [row[0] for row in connection.execute('SELECT key FROM ai_results')]
+    assert keys == ['new']
+
+
+def test_unwritable_sqlite_is_a_miss_not_an_error(tmp_path):
+    (tmp_path / 'not-a-db').write_text('plain text, not sqlite')
+    cache = AIResultCache(str(tmp_path / 'not-a-db'), memory_entries=0)
+    cache.put('k', RESULT)
+    assert cache.get('k') is None
+
+
+def test_snapshot_reports_hit_ratio():
+    cache = AIResultCache()
+    assert cache.snapshot()['hit_ratio'] is None
+    cache.get('k')
+    cache.put('k', RESULT)
+    cache.get('k')
+    snapshot = cache.snapshot()
+    assert snapshot['hit_ratio'] == 0.5
+    assert snapshot['memory_entries'] == 1
@@ -0,0 +1,98 @@
+"""Section detection, budget and labels of ai_context.py."""
+
+import re
+
+import pytest
+
+from ai_context import CHARS_PER_TOKEN, _HEADING, _find_headings, _find_sections, build_ai_context
+
+
+FILLER = 'Kalimat pengisi dokumen penelitian yang cukup panjang. ' * 40
+
+DOCUMENT = (
+    '--- Halaman 1 ---\nJudul Penelitian Tentang Sampel\nPenulis A\n'
+    'DAFTAR ISI\nBAB I PENDAHULUAN ........ 1\nBAB III METODE PENELITIAN ........ 9\n\n'
+    '--- Halaman 2 ---\nAbstrak: Penelitian ini mengukur pengaruh variabel X. ' + FILLER +
+    '\n\n--- Halaman 3 ---\nBAB I PENDAHULUAN\n' + FILLER +
+    '\n\n--- Halaman 9 ---\nBAB III METODE PENELITIAN\nSampel diambil secara acak. ' + FILLER +
+    '\n\n--- Halaman 12 ---\nHasil penelitian menunjukkan bahwa sampel ' + FILLER +
+    '\n\n--- Halaman 15 ---\nV. KESIMPULAN\nVariabel X berpengaruh. ' + FILLER +
+    '\n\n--- Halaman 16 ---\nDAFTAR PUSTAKA\n' + FILLER
+)
+
+
+@pytest.fixture(scope='module')
+def context():
+    positions = [m.start() for m in re.finditer('sampel', DOCUMENT.lower())]
+    return build_ai_context(DOCUMENT, positions, budget_tokens=600)
+
+
+def test_sections_are_found_and_toc_lines_ignored():
+    sections = _find_sections(DOCUMENT)
+    assert set(sections) == {'abstrak', 'pendahuluan', 'metodologi', 'kesimpulan', 'daftar_pustaka'}
+    # The body starts at the real heading, not at its table-of-contents line
+    assert DOCUMENT[sections['metodologi'][0]:].lstrip().startswith('BAB III METODE PENELITIAN\nSampel')
+
+
+@pytest.mark.parametrize('line, key', [
+    ('BAB III METODE PENELITIAN', 'metodologi'),
+    ('2. Methods', 'metodologi'),
+    ('IV. HASIL DAN PEMBAHASAN', 'hasil_pembahasan'),
+    ('Abstract - This paper measures the effect of X on a long list of outcomes.', 'abstrak'),
+    ('References', 'daftar_pustaka'),
+])
+def test_heading_forms(line, key):
+    assert _find_headings(line) == [(0, key)]
+
+
+@pytest.mark.parametrize('line', [
+    'BAB I PENDAHULUAN ........ 1',
+    'Metode yang digunakan dalam penelitian ini adalah survei daring kepada mahasiswa.',
+])
+def test_non_headings(line):
+    assert _find_headings(line) == []
+
+
+def test_short_text_is_returned_unchanged():
+    assert build_ai_context('Judul\nAbstrak singkat.', [3], budget_tokens=600) == 'Judul\nAbstrak singkat.'
+
+
+def test_context_fits_the_budget(context):
+    assert len(DOCUMENT) > 600 * CHARS_PER_TOKEN
+    assert len(context) <= 600 * CHARS_PER_TOKEN + 300
+
+
+def test_context_lists_detected_sections(context):
+    assert context.startswith(
+        'Bagian terdeteksi: Abstrak, Pendahuluan, Metodologi, Kesimpulan\n\n'
+    )
+
+
+def test_labels_follow_sections_and_pages(context):
+    assert '[Awal dokumen | Halaman 1]\n' in context
+    assert '[Metodologi | Halaman 9]\nBAB III METODE PENELITIAN' in context
+    assert '[Kesimpulan | Halaman 15]\nV. KESIMPULAN' in context
+    # A section label (other than "lanjutan") always sits right above its heading
+    for label in re.finditer(r'^\[(?!Awal|\.\.\.)[^,|\]]+(?: \|[^\]]*)?\]\n(.*)$', context, re.MULTILINE):
+        assert _HEADING.match(label.group(1)), label.group(0)
+
+
+def test_toc_and_references_are_left_out(context):
+    assert 'Judul Penelitian Tentang Sampel' in context
+    assert 'DAFTAR ISI' not in context and '........' not in context
+    assert 'DAFTAR PUSTAKA' not in context
+
+
+def test_keyword_window_inside_a_section_is_labelled_lanjutan():
+    text = '--- Halaman 1 ---\nJudul\n\nBAB III METODE PENELITIAN\n' + FILLER * 3 + \
+        '\n\n--- Halaman 7 ---\n' + FILLER[:600] + 'Kata kunci regresi muncul di sini. ' + FILLER * 3
+    context = build_ai_context(text, [text.index('regresi')], budget_tokens=300)
+    assert '[Metodologi, lanjutan | Halaman 7]' in context
+    assert 'regresi' in context
+    assert '\n[...]\n' in context
+
+
+def test_text_without_structure_keeps_its_start():
+    plain = build_ai_context(FILLER * 3, budget_tokens=600)
+    assert plain.startswith('[Awal dokumen]')
+    assert len(plain) > 2000
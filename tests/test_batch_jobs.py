@@ -0,0 +1,146 @@
+"""Claims, heartbeat recovery and result storage of BatchJobRunner."""
+
+import os
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from batch_jobs import BatchJobRunner, get_job_results
+from models import db, BatchJob, BatchJobFile
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'jobs.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def make_runner(app, tmp_path, process_file=None, **kwargs):
+    def default_process(job, filename, data, owns_claim):
+        return {'success': True, 'filename': filename, 'owned': owns_claim()}
+    # workers=0: nothing runs in the background, the tests drive the runner
+    return BatchJobRunner(app, str(tmp_path / 'files'), process_file or default_process,
+                          workers=0, poll_seconds=0, lease_seconds=60, **kwargs)
+
+
+def add_running_file(claimed_by, claimed_at, attempts=1):
+    job = BatchJob(id=os.urandom(16).hex(), status='running', keywords='[]', total_files=1)
+    db.session.add(job)
+    job_file = BatchJobFile(job_id=job.id, position=0, filename='a.pdf', status='running',
+                            attempts=attempts, claimed_by=claimed_by, claimed_at=claimed_at)
+    db.session.add(job_file)
+    db.session.commit()
+    return job_file.id
+
+
+def status_of(file_id):
+    db.session.expire_all()
+    return db.session.get(BatchJobFile, file_id).status
+
+
+def own_claim(token='oldtoken'):
+    return f'{socket.gethostname()}:{os.getpid()}:{token}'
+
+
+def test_claim_processes_file_and_stores_result(app, tmp_path):
+    runner = make_runner(app, tmp_path)
+    job = runner.submit([('a.txt', b'data')], ['kata'])
+
+    job_file = runner._claim_next()
+    assert job_file.claimed_by.startswith(runner.worker_id + ':')
+    runner._run(job_file)
+
+    assert status_of(job_file.id) == 'done'
+    [(sequence, result)] = get_job_results(job.id)
+    assert sequence == 1 and result['owned'] is True
+    assert db.session.get(BatchJob, job.id).status == 'done'
+    assert runner._active == {}
+
+
+def test_stale_claim_of_same_pid_is_requeued(app, tmp_path):
+    # Left 'running' by an earlier container whose worker had our pid
+    runner = make_runner(app, tmp_path)
+    file_id = add_running_file(own_claim(), datetime.utcnow() - timedelta(minutes=10))
+
+    runner._recover_stale()
+
+    assert status_of(file_id) == 'pending'
+
+
+def test_fresh_claim_of_same_pid_without_active_claim_is_requeued(app, tmp_path):
+    runner = make_runner(app, tmp_path)
+    file_id = add_running_file(own_claim(), datetime.utcnow())
+
+    runner._recover_stale()
+
+    assert status_of(file_id) == 'pending'
+
+
+def test_own_active_claim_is_kept_even_with_old_heartbeat(app, tmp_path):
+    runner = make_runner(app, tmp_path)
+    claim = own_claim('active')
+    file_id = add_running_file(claim, datetime.utcnow() - timedelta(minutes=10))
+    runner._active[claim] = file_id
+
+    runner._recover_stale()
+
+    assert status_of(file_id) == 'running'
+
+
+def test_live_pid_needs_a_fresh_heartbeat(app, tmp_path):
+    # The parent process exists, as a reused pid would after a restart
+    runner = make_runner(app, tmp_path)
+    claimed_by = f'{socket.gethostname()}:{os.getppid()}:token'
+    fresh = add_running_file(claimed_by, datetime.utcnow())
+    stale = add_running_file(claimed_by, datetime.utcnow() - timedelta(minutes=10))
+
+    runner._recover_stale()
+
+    assert status_of(fresh) == 'running'
+    assert status_of(stale) == 'pending'
+
+
+def test_other_host_is_requeued_after_the_lease(app, tmp_path):
+    runner = make_runner(app, tmp_path)
+    fresh = add_running_file('other-host:123:token', datetime.utcnow())
+    stale = add_running_file('other-host:123:token', datetime.utcnow() - timedelta(minutes=10))
+
+    runner._recover_stale()
+
+    assert status_of(fresh) == 'running'
+    assert status_of(stale) == 'pending'
+
+
+def test_stale_claim_fails_after_max_attempts(app, tmp_path):
+    runner = make_runner(app, tmp_path, max_attempts=2)
+    file_id = add_running_file('other-host:123:token', datetime.utcnow() - timedelta(minutes=10),
+                               attempts=2)
+
+    runner._recover_stale()
+
+    assert status_of(file_id) == 'failed'
+
+
+def test_result_of_a_lost_claim_is_dropped(app, tmp_path):
+    def process(job, filename, data, owns_claim):
+        # Another worker takes the file over while this one is busy
+        BatchJobFile.query.update({'claimed_by': 'other-host:1:token'}, synchronize_session=False)
+        db.session.commit()
+        return {'success': True, 'filename': filename, 'owned': owns_claim()}
+
+    runner = make_runner(app, tmp_path, process)
+    job = runner.submit([('a.txt', b'data')], ['kata'])
+    job_file = runner._claim_next()
+    runner._run(job_file)
+
+    assert status_of(job_file.id) == 'running'
+    assert get_job_results(job.id) == []
+    assert db.session.get(BatchJob, job.id).processed_files == 0
@@ -0,0 +1,81 @@
+"""Keys, memory LRU and disk eviction of extraction_cache.py."""
+
+import os
+
+import extraction_cache
+from extraction_cache import ExtractionCache, make_cache_key
+
+
+def test_key_depends_on_content_type_language_and_version(monkeypatch):
+    key = make_cache_key(b'%PDF-1.4 demo', 'pdf')
+    assert key == make_cache_key(b'%PDF-1.4 demo', 'pdf')
+    assert len({
+        key,
+        make_cache_key(b'%PDF-1.4 other', 'pdf'),
+        make_cache_key(b'%PDF-1.4 demo', 'docx'),
+        make_cache_key(b'%PDF-1.4 demo', 'pdf', 'ind+eng'),
+    }) == 4
+
+    monkeypatch.setattr(extraction_cache, 'EXTRACTOR_VERSION', 'next')
+    assert make_cache_key(b'%PDF-1.4 demo', 'pdf') != key
+
+
+def test_new_extractor_version_misses_old_entries(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path))
+    cache.put(make_cache_key(b'scan', 'image', 'ind'), 'teks lama')
+
+    monkeypatch.setattr(extraction_cache, 'EXTRACTOR_VERSION', 'next')
+    assert cache.get(make_cache_key(b'scan', 'image', 'ind')) is None
+    assert cache.stats['misses'] == 1
+
+
+def test_disk_tier_serves_after_memory_is_cleared(tmp_path):
+    cache = ExtractionCache(str(tmp_path), memory_bytes=100, disk_bytes=600)
+    key = make_cache_key(b'%PDF-1.4 demo', 'pdf')
+    assert cache.get(key) is None
+
+    cache.put(key, 'hasil ekstraksi ' * 3)
+    assert cache.get(key) == 'hasil ekstraksi ' * 3
+    cache.clear()
+    assert cache.get(key) == 'hasil ekstraksi ' * 3
+
+    assert cache.stats == {'memory_hits': 1, 'disk_hits': 1, 'misses': 1}
+    assert cache.get(key) and cache.stats['memory_hits'] == 2  # Promoted back to memory
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = ExtractionCache(memory_bytes=20)
+    cache.put('a', 'x' * 8)
+    cache.put('b', 'y' * 8)
+    assert cache.get('a') == 'x' * 8  # 'b' is now the oldest
+    cache.put('c', 'z' * 8)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'x' * 8
+    assert cache.get('c') == 'z' * 8
+    assert cache._memory_size == 16
+
+
+def test_text_larger_than_memory_tier_is_not_kept_in_memory(tmp_path):
+    cache = ExtractionCache(str(tmp_path), memory_bytes=10)
+    cache.put('k' * 64, 'panjang sekali ' * 5)
+
+    assert cache._memory_size == 0
+    assert cache.get('k' * 64) == 'panjang sekali ' * 5
+    assert cache.stats['disk_hits'] == 1
+
+
+def test_disk_eviction_removes_oldest_files_first(tmp_path):
+    cache = ExtractionCache(str(tmp_path), memory_bytes=0, disk_bytes=600)
+    keys = [make_cache_key(str(i).encode(), 'pdf') for i in range(20)]
+    for i, key in enumerate(keys):
+        cache.put(key, f'dokumen {i} ' * 50)
+        # Distinct mtimes, oldest first, whatever the filesystem resolution
+        os.utime(cache._path(key), (1_000_000 + i, 1_000_000 + i))
+
+    entries, disk_usage = cache._scan_disk()
+    assert 0 < disk_usage <= 600
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
+    kept = {path for _, _, path in entries}
+    assert kept == {cache._path(key) for key in keys[-len(kept):]}
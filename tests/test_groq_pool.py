@@ -0,0 +1,172 @@
+"""Key cooldowns, rotation and the circuit breaker of groq_pool.py."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import groq_pool
+from groq_pool import GroqKeyPool, GroqUnavailableError, parse_duration
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic()."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'{status_code} error')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class FakeClient:
+    """Groq-like client; `behaviour[api_key]` is a list of responses/errors, consumed in order."""
+
+    def __init__(self, api_key, behaviour, calls):
+        self.api_key = api_key
+        self.behaviour = behaviour
+        self.calls = calls
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            with_raw_response=SimpleNamespace(create=self.create)
+        ))
+
+    def create(self, **kwargs):
+        self.calls.append(self.api_key)
+        outcomes = self.behaviour[self.api_key]
+        outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(headers=outcome, parse=lambda: f'ok from {self.api_key}')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(groq_pool, 'time', clock)
+    return clock
+
+
+def make_pool(behaviour, calls=None, **kwargs):
+    calls = [] if calls is None else calls
+    factory = lambda api_key: FakeClient(api_key, behaviour, calls)
+    return GroqKeyPool(list(behaviour), client_factory=factory, **kwargs)
+
+
+def test_parse_duration():
+    assert parse_duration('2m59.56s') == pytest.approx(179.56)
+    assert parse_duration('7.66s') == pytest.approx(7.66)
+    assert parse_duration('120ms') == pytest.approx(0.12)
+    assert parse_duration('1h') == 3600
+    assert parse_duration(' 30 ') == 30
+    assert parse_duration('later') is None
+    assert parse_duration('5s later') is None
+    assert parse_duration(None) is None
+
+
+def test_no_keys_fails_fast():
+    with pytest.raises(GroqUnavailableError):
+        GroqKeyPool([]).create_completion(model='m')
+
+
+def test_rate_limited_key_cools_down_until_retry_after(clock):
+    calls = []
+    pool = make_pool({
+        'key-a': [APIError(429, {'retry-after': '60'}), {}],
+        'key-b': [{}, {}, APIError(429, {'retry-after': '60'}), {}],
+    }, calls, max_wait=1)
+
+    assert pool.create_completion(model='m') == 'ok from key-b'
+    assert calls == ['key-a', 'key-b']
+    assert pool.snapshot()['keys'][0]['cooldown_seconds'] == 60
+
+    # key-a stays out of rotation until its cooldown is over
+    pool.create_completion(model='m')
+    assert calls[-1] == 'key-b'
+    clock.now += 61
+    assert pool.create_completion(model='m') == 'ok from key-a'
+    assert calls[-2:] == ['key-b', 'key-a']
+
+
+def test_exhausted_quota_rests_the_key_until_reset(clock):
+    pool = make_pool({'key-a': [{'x-ratelimit-remaining-requests': '0',
+                                 'x-ratelimit-reset-requests': '1m30s'}]}, max_wait=1)
+    assert pool.create_completion(model='m') == 'ok from key-a'
+    assert pool.snapshot()['keys'][0] == {
+        'key': '#1 (...ey-a)', 'cooldown_seconds': 90.0, 'remaining_requests': 0,
+        'remaining_tokens': None, 'consecutive_failures': 0,
+    }
+
+    with pytest.raises(GroqUnavailableError, match='90 detik'):
+        pool.create_completion(model='m')
+
+
+def test_short_cooldown_is_waited_out(clock):
+    calls = []
+    pool = make_pool({'key-a': [APIError(429, {'retry-after': '2'}), {}]}, calls, max_wait=5)
+    assert pool.create_completion(model='m') == 'ok from key-a'
+    assert calls == ['key-a', 'key-a']
+    assert clock.slept and clock.slept[0] >= 2
+
+
+def test_healthiest_key_is_preferred(clock):
+    calls = []
+    pool = make_pool({
+        'key-a': [{'x-ratelimit-remaining-requests': '3'}],
+        'key-b': [{'x-ratelimit-remaining-requests': '50'}],
+    }, calls)
+    pool.create_completion(model='m')
+    pool.create_completion(model='m')
+    pool.create_completion(model='m')
+    assert calls == ['key-a', 'key-b', 'key-b']
+
+
+def test_non_retryable_error_is_raised(clock):
+    pool = make_pool({'key-a': [APIError(400)]})
+    with pytest.raises(APIError):
+        pool.create_completion(model='m')
+    assert pool.snapshot()['keys'][0]['consecutive_failures'] == 0
+
+
+def test_circuit_breaker_opens_fails_fast_and_closes(clock):
+    calls = []
+    behaviour = {'key-a': [APIError(503)]}
+    pool = make_pool(behaviour, calls, max_attempts=3, max_wait=1,
+                     breaker_threshold=3, breaker_seconds=30)
+
+    # Closed -> open: three transient failures in a row
+    with pytest.raises(GroqUnavailableError, match='3 percobaan'):
+        pool.create_completion(model='m')
+    assert len(calls) == 3
+    assert 0 < pool.snapshot()['breaker_open_seconds'] <= 30
+
+    # Open: no API call at all
+    with pytest.raises(GroqUnavailableError, match='limit'):
+        pool.create_completion(model='m')
+    assert len(calls) == 3
+
+    # After breaker_seconds the pool calls the API again; a success resets the counters
+    behaviour['key-a'] = [{}]
+    clock.now += 31
+    assert pool.create_completion(model='m') == 'ok from key-a'
+    assert pool.snapshot()['breaker_open_seconds'] == 0
+    assert pool.snapshot()['keys'][0]['consecutive_failures'] == 0
+
+
+def test_transient_errors_retry_with_backoff(clock):
+    calls = []
+    pool = make_pool({'key-a': [APIError(502), APIError(500), {}]}, calls)
+    assert pool.create_completion(model='m') == 'ok from key-a'
+    assert calls == ['key-a'] * 3
+    assert len(clock.slept) == 2
+    assert all(0 <= seconds <= groq_pool.BACKOFF_MAX_SECONDS for seconds in clock.slept)
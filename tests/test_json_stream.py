@@ -0,0 +1,76 @@
+"""Partial, escaped and fenced chunks in json_stream.py."""
+
+import json
+import random
+
+import pytest
+
+from json_stream import JSONObjectStream
+
+
+DOCUMENT = {
+    'deteksi_struktur': {'abstrak': 'ada', 'metodologi': 'tidak ada'},
+    'kelemahan': {'penulisan': ['kutipan "tanpa} sumber', 'tabel [1] kurang jelas', 'garis \\ miring']},
+    'skor_keseluruhan': {'nilai': 'B', 'angka': 3.5, 'final': True, 'catatan': None},
+}
+
+
+def feed_all(parser, chunks):
+    """[(chunk index, key, value)] in the order members complete."""
+    return [(i, key, value) for i, chunk in enumerate(chunks) for key, value in parser.feed(chunk)]
+
+
+@pytest.mark.parametrize('indent', [None, 4])
+@pytest.mark.parametrize('size', [1, 7, 50])
+def test_members_arrive_in_order_for_any_chunk_size(indent, size):
+    text = '```json\n' + json.dumps(DOCUMENT, indent=indent, ensure_ascii=False) + '\n```'
+    parser = JSONObjectStream()
+
+    received = feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)])
+
+    assert [(key, value) for _, key, value in received] == list(DOCUMENT.items())
+    assert parser.finished
+
+
+def test_member_is_returned_by_the_chunk_that_completes_it():
+    parser = JSONObjectStream()
+    chunks = ['{"a": {"x": ', '1}', ', "b"', ': [1, 2', ']}']
+    assert feed_all(parser, chunks) == [(2, 'a', {'x': 1}), (4, 'b', [1, 2])]
+
+
+def test_braces_quotes_and_backslashes_inside_strings():
+    text = json.dumps({'a': 'kurung } [ , "kutip" \\', 'b': '\\"'})
+    rng = random.Random(1)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(text)), 5))
+        chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+        parser = JSONObjectStream()
+        assert [(key, value) for _, key, value in feed_all(parser, chunks)] == \
+            [('a', 'kurung } [ , "kutip" \\'), ('b', '\\"')], chunks
+
+
+def test_escape_split_across_chunks():
+    parser = JSONObjectStream()
+    assert parser.feed('{"a": "x\\') == []
+    assert parser.feed('"}"') == []  # The escaped quote and the brace are string content
+    assert parser.feed(', "b": 1}') == [('a', 'x"}'), ('b', 1)]
+
+
+def test_invalid_member_is_skipped():
+    parser = JSONObjectStream()
+    received = feed_all(parser, ['{"a": tru', 'e, "b": nope, "c": [1]}'])
+    assert [(key, value) for _, key, value in received] == [('a', True), ('c', [1])]
+
+
+def test_text_after_the_object_is_ignored():
+    parser = JSONObjectStream()
+    assert parser.feed('Berikut hasilnya: {"a": 1} {"b": 2}') == [('a', 1)]
+    assert parser.feed('{"c": 3}') == []
+    assert parser.finished
+
+
+def test_unfinished_object():
+    parser = JSONObjectStream()
+    assert parser.feed('{"a": 1, "b": {"c"') == [('a', 1)]
+    assert parser.started and not parser.finished
+    assert JSONObjectStream().feed('tanpa json') == []
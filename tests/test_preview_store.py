@@ -0,0 +1,84 @@
+"""Thumbnails, lookups and TTL expiry of preview_store.py."""
+
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from preview_store import PREVIEW_THUMB_SIDE, THUMB_FORMAT, PreviewStore, make_thumbnail
+
+
+KEY = 'ab' * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PreviewStore(str(tmp_path), ttl_seconds=60)
+
+
+def age(store, key, seconds):
+    """Move the mtime of every stored variant `seconds` into the past."""
+    for variant in ('thumb', 'full'):
+        path = store._find(key, variant)
+        past = time.time() - seconds
+        os.utime(path, (past, past))
+
+
+def test_thumbnail_is_bounded_and_keeps_aspect_ratio(tmp_path):
+    path = tmp_path / 'thumb'
+    path.write_bytes(make_thumbnail(Image.new('RGBA', (1600, 900), 'white')))
+    with Image.open(path) as thumb:
+        assert thumb.format == THUMB_FORMAT
+        assert thumb.size == (PREVIEW_THUMB_SIDE, PREVIEW_THUMB_SIDE * 900 // 1600)
+
+
+def test_save_then_get_both_variants(store):
+    assert not store.touch(KEY)
+    store.save(KEY, Image.new('RGB', (1600, 900), 'white'), b'full-bytes', 'PNG')
+
+    assert store.touch(KEY)
+    path, mimetype = store.get(KEY, 'thumb')
+    assert path.startswith(os.path.join(store.directory, KEY[:2], KEY + '.thumb.'))
+    assert mimetype == 'image/' + ('webp' if THUMB_FORMAT == 'WEBP' else 'jpeg')
+
+    path, mimetype = store.get(KEY, 'full')
+    assert mimetype == 'image/png'
+    with open(path, 'rb') as f:
+        assert f.read() == b'full-bytes'
+
+
+def test_unknown_variant_and_missing_key(store):
+    store.save(KEY, Image.new('RGB', (10, 10)), b'full', 'JPEG')
+    assert store.get(KEY, 'other') is None
+    assert store.get('cd' * 32, 'thumb') is None
+
+
+def test_expired_preview_is_hidden_and_swept(store):
+    store.save(KEY, Image.new('RGB', (10, 10)), b'full', 'JPEG')
+    age(store, KEY, 120)
+    assert store.get(KEY, 'thumb') is None
+
+    store.sweep(force=True)
+    assert store._find(KEY, 'thumb') is None
+    assert not store.touch(KEY)
+
+
+def test_touch_renews_the_ttl(store):
+    store.save(KEY, Image.new('RGB', (10, 10)), b'full', 'JPEG')
+    age(store, KEY, 50)
+    assert store.touch(KEY)
+    for variant in ('thumb', 'full'):
+        assert time.time() - os.path.getmtime(store._find(KEY, variant)) < 10
+    store.sweep(force=True)
+    assert store.get(KEY, 'full') is not None
+
+
+def test_sweep_is_rate_limited(store):
+    store.save(KEY, Image.new('RGB', (10, 10)), b'full', 'JPEG')  # Sweeps once
+    age(store, KEY, 120)
+
+    store.sweep()
+    assert store._find(KEY, 'thumb') is not None
+    store.sweep(force=True)
+    assert store._find(KEY, 'thumb') is None
@@ -0,0 +1,284 @@
+"""
+Tests for rabin_karp.py: hash backends, compiled patterns, the numpy engine,
+streaming search, highlighting, Aho-Corasick and approximate matching.
+
+Every engine is checked against a naive reference on randomized inputs.
+"""
+
+import random
+
+import pytest
+
+from rabin_karp import (
+    HASH_BACKENDS, NUMPY_THRESHOLD, np, compile_pattern, new_search_stats, select_engine,
+    rabin_karp_search, rabin_karp_search_multi, rabin_karp_search_stream, _numpy_search_multi,
+    aho_corasick_search, aho_corasick_search_stream,
+    approximate_search, effective_max_edits, _myers_match_ends,
+    fold_case, highlight_matches, highlight_multi,
+)
+
+
+ALPHABET = "aAbB İß\n"
+
+
+def naive_positions(text: str, pattern: str) -> list:
+    """Overlapping occurrences in the case-folded text."""
+    text, pattern = fold_case(text), fold_case(pattern)
+    return [i for i in range(len(text) - len(pattern) + 1) if text.startswith(pattern, i)]
+
+
+def random_cases(seed: int, count: int = 200, max_length: int = 300):
+    """(text, patterns) pairs over a small alphabet, so matches are frequent."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_length)))
+        patterns = sorted({''.join(rng.choice("ab ") for _ in range(rng.randint(1, 5)))
+                           for _ in range(rng.randint(1, 6))})
+        yield text, patterns
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (a[i - 1] != b[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+# =============================================================================
+# HASH BACKENDS & COMPILED PATTERNS
+# =============================================================================
+
+@pytest.mark.parametrize('backend', sorted(HASH_BACKENDS))
+def test_backends_match_naive_search(backend):
+    for text, patterns in random_cases(seed=1):
+        expected = {pattern: naive_positions(text, pattern) for pattern in patterns}
+        assert rabin_karp_search_multi(text, patterns, backend=backend, engine='scalar') == expected
+        for pattern in patterns:
+            assert rabin_karp_search(text, pattern, backend=backend, engine='scalar') == expected[pattern]
+
+
+def test_textbook_backend_reports_spurious_hits():
+    text = "The quick brown fox jumps over the lazy dog. The dog sleeps." * 200
+    textbook, wide = new_search_stats(), new_search_stats()
+    found = rabin_karp_search(text, "fox", backend='textbook', stats=textbook)
+    assert rabin_karp_search(text, "fox", backend='mersenne61', stats=wide) == found
+    assert textbook['spurious_hits'] > 0
+    assert wide['spurious_hits'] == 0
+    assert textbook['hash_hits'] == len(found) + textbook['spurious_hits']
+
+
+def test_compiled_pattern_is_reusable():
+    compiled = compile_pattern("Metodologi")
+    for text in ["metodologi penelitian", "BAB III METODOLOGI dan metodologi", ""]:
+        assert rabin_karp_search(text, compiled) == rabin_karp_search(text, "Metodologi")
+        assert rabin_karp_search_multi(text, [compiled]) == {"Metodologi": naive_positions(text, "metodologi")}
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        rabin_karp_search_multi("text", ["t"], backend='md5')
+
+
+# =============================================================================
+# NUMPY ENGINE
+# =============================================================================
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_numpy_engine_matches_scalar():
+    for text, patterns in random_cases(seed=42):
+        scalar = rabin_karp_search_multi(text, patterns, engine='scalar')
+        assert rabin_karp_search_multi(text, patterns, engine='numpy') == scalar, (text, patterns)
+        for pattern in patterns:
+            assert rabin_karp_search(text, pattern, engine='numpy') == scalar[pattern]
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_numpy_engine_keeps_matches_across_blocks():
+    for text, patterns in random_cases(seed=7):
+        compiled = [compile_pattern(pattern) for pattern in patterns]
+        blocked = _numpy_search_multi(fold_case(text), compiled, new_search_stats(), block_size=7)
+        assert blocked == rabin_karp_search_multi(text, patterns, engine='scalar'), (text, patterns)
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_auto_engine_uses_numpy_for_large_texts():
+    assert select_engine('auto', NUMPY_THRESHOLD) == 'numpy'
+    assert select_engine('auto', NUMPY_THRESHOLD - 1) == 'scalar'
+    assert select_engine('scalar', NUMPY_THRESHOLD) == 'scalar'
+
+
+@pytest.mark.parametrize('backend', sorted(HASH_BACKENDS))
+def test_stats_report_the_hash_backend_that_ran(backend):
+    stats = new_search_stats()
+    rabin_karp_search_multi("the quick brown fox", ["fox"], backend=backend, stats=stats, engine='scalar')
+    assert stats['hash_backend'] == backend
+
+    stats = new_search_stats()
+    list(rabin_karp_search_stream(["the quick ", "brown fox"], ["fox"], backend=backend, stats=stats))
+    assert stats['hash_backend'] == backend
+
+    if np is not None:
+        # The numpy engine always hashes with DOUBLE_HASH_MODULI
+        stats = new_search_stats()
+        rabin_karp_search("the quick brown fox", "fox", backend=backend, stats=stats, engine='numpy')
+        assert stats['hash_backend'] == 'double'
+
+
+# =============================================================================
+# STREAMING SEARCH
+# =============================================================================
+
+def split_randomly(rng, text: str) -> list:
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 6))))
+    bounds = [0] + cuts + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize('search_stream', [rabin_karp_search_stream, aho_corasick_search_stream])
+def test_stream_matches_whole_text_search(search_stream):
+    rng = random.Random(3)
+    for text, patterns in random_cases(seed=3):
+        chunks = split_randomly(rng, text)
+        starts = [sum(len(chunk) for chunk in chunks[:i]) for i in range(len(chunks))]
+
+        found = {pattern: [] for pattern in patterns}
+        for match in search_stream(chunks, patterns):
+            found[match['pattern']].append(match['position'])
+            # Page of the chunk where the match starts (1-based)
+            page = max(i for i, start in enumerate(starts) if start <= match['position']) + 1
+            assert match['page'] == page
+        found = {pattern: sorted(positions) for pattern, positions in found.items()}
+        assert found == rabin_karp_search_multi(text, patterns), (chunks, patterns)
+
+
+def test_stream_finds_match_split_by_page_break():
+    pages = [(4, "Bab 3 membahas meto"), (5, "dologi penelitian."), (6, " Metodologi kualitatif.")]
+    matches = list(rabin_karp_search_stream(pages, ["metodologi"]))
+    assert [(m['position'], m['page']) for m in matches] == [(15, 4), (38, 6)]
+
+
+# =============================================================================
+# AHO-CORASICK
+# =============================================================================
+
+def test_aho_corasick_matches_rabin_karp():
+    for text, patterns in random_cases(seed=11):
+        assert aho_corasick_search(text, patterns) == rabin_karp_search_multi(text, patterns), (text, patterns)
+
+    dictionary = ["he", "she", "his", "hers", "The", "dog", "e"]
+    text = "The quick brown fox jumps over the lazy dog. The dog sleeps."
+    assert aho_corasick_search(text, dictionary) == rabin_karp_search_multi(text, dictionary)
+
+
+# =============================================================================
+# HIGHLIGHTING
+# =============================================================================
+
+def test_highlight_escapes_and_marks_matches():
+    text = "a <b> & a"
+    assert highlight_multi(text, {"a": [0, 8]}) == "<mark>a</mark> &lt;b&gt; &amp; <mark>a</mark>"
+
+
+def test_highlight_merges_overlapping_matches():
+    text = "metodologi"
+    result = highlight_multi(text, {"metodo": [0], "dologi": [4]}, css_classes={"metodo": "kw-1"})
+    assert result == '<mark class="kw-1">metodologi</mark>'
+
+
+def test_highlight_matches_naive_reference():
+    for text, patterns in random_cases(seed=5, count=100):
+        positions = rabin_karp_search_multi(text, patterns)
+        spans = sorted((p, p + len(pattern)) for pattern, found in positions.items() for p in found)
+        marked = [False] * len(text)
+        for start, end in spans:
+            for i in range(start, end):
+                marked[i] = True
+        # Removing the tags gives back the text, and exactly the matched characters are inside <mark>
+        result = highlight_multi(text, positions)
+        plain, inside, i = [], [], 0
+        in_mark = False
+        while i < len(result):
+            if result.startswith('<mark>', i):
+                in_mark, i = True, i + 6
+            elif result.startswith('</mark>', i):
+                in_mark, i = False, i + 7
+            else:
+                plain.append(result[i])
+                inside.append(in_mark)
+                i += 1
+        assert ''.join(plain) == text
+        assert inside == marked
+
+
+def test_fold_case_keeps_positions():
+    assert fold_case("İstanbul MetodoLOGI") == "İstanbul metodologi"
+    assert fold_case("Straße") == "straße"
+
+
+@pytest.mark.parametrize('search', [rabin_karp_search_multi, aho_corasick_search])
+def test_highlight_after_dotted_capital_i(search):
+    # 'İ'.lower() is two characters; positions must still index the original text
+    text = "İzin: Metodologi <dan> METODOLOGI"
+    positions = search(text, ["metodologi"])
+    assert positions == {"metodologi": [6, 23]}
+    assert highlight_multi(text, positions) == \
+        "İzin: <mark>Metodologi</mark> &lt;dan&gt; <mark>METODOLOGI</mark>"
+    assert highlight_matches(text, "metodologi", css_class="kw-0") == \
+        'İzin: <mark class="kw-0">Metodologi</mark> &lt;dan&gt; <mark class="kw-0">METODOLOGI</mark>'
+
+
+def test_highlight_matches_escapes_without_pattern():
+    assert highlight_matches("<b>İ & a</b>", "") == "&lt;b&gt;İ &amp; a&lt;/b&gt;"
+
+
+# =============================================================================
+# APPROXIMATE MATCHING
+# =============================================================================
+
+def test_myers_scan_matches_dynamic_programming():
+    rng = random.Random(9)
+    for _ in range(200):
+        text = ''.join(rng.choice("abc") for _ in range(rng.randint(0, 40)))
+        pattern = ''.join(rng.choice("abc") for _ in range(rng.randint(1, 8)))
+        max_edits = rng.randint(0, 3)
+        expected = []
+        for end in range(len(text)):
+            # Best substring of text ending at `end` (possibly empty)
+            best = min(edit_distance(pattern, text[start:end + 1]) for start in range(end + 2))
+            if best <= max_edits:
+                expected.append((end, best))
+        assert list(_myers_match_ends(text, pattern, max_edits)) == expected, (text, pattern, max_edits)
+
+
+def test_approximate_search_reports_valid_spans():
+    rng = random.Random(13)
+    for _ in range(200):
+        text = ''.join(rng.choice("abc ") for _ in range(rng.randint(0, 60)))
+        pattern = ''.join(rng.choice("abc") for _ in range(rng.randint(4, 10)))
+        max_edits = effective_max_edits(pattern, 2)
+        matches = approximate_search(text, pattern, max_edits=2)
+        end = -1
+        for match in matches:
+            span = text[match['position']:match['position'] + match['length']]
+            assert edit_distance(pattern, span) == match['distance'] <= max_edits
+            assert match['position'] >= end  # Non-overlapping, sorted
+            end = match['position'] + match['length']
+        # Every exact occurrence is covered by a zero-distance match
+        exact = {m['position'] for m in matches if m['distance'] == 0}
+        for position in naive_positions(text, pattern):
+            assert any(m['position'] <= position < m['position'] + m['length'] for m in matches)
+        assert exact <= set(naive_positions(text, pattern))
+
+
+def test_approximate_search_finds_ocr_errors():
+    text = "Bab III Metodo1ogi Penelitian dan metodologi analisis"
+    assert approximate_search(text, "metodologi", max_edits=1) == [
+        {'position': 8, 'length': 10, 'distance': 1},
+        {'position': 34, 'length': 10, 'distance': 0},
+    ]
+    # Short keywords are clamped to exact matching
+    assert effective_max_edits("uji", 2) == 0
@@ -0,0 +1,59 @@
+"""Whole-word and stemmed lookups of token_index.py."""
+
+import pytest
+
+import token_index
+from token_index import TokenIndex, StemmerFactory, get_token_index, search_tokens, tokenize
+
+
+TEXT = "Peneliti menguji data. Ujian dan pengujian diuji ulang; uji coba selesai."
+
+
+def words(text, spans):
+    return [text[start:end] for start, end in spans]
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert tokenize("Machine-Learning, UJI!") == ["machine", "learning", "uji"]
+    assert tokenize(None) == []
+
+
+def test_word_mode_matches_whole_words_only():
+    found = search_tokens(TEXT, ["uji", "uji coba", "Data"], 'word')
+    assert words(TEXT, found["uji"]) == ["uji"]
+    assert words(TEXT, found["uji coba"]) == ["uji coba"]
+    assert words(TEXT, found["Data"]) == ["data"]
+
+
+def test_phrase_must_be_consecutive_tokens():
+    index = TokenIndex("uji data coba, uji. Coba")
+    assert words("uji data coba, uji. Coba", index.lookup("uji coba")) == ["uji. Coba"]
+    assert index.lookup("coba uji data") == []
+    assert index.lookup("  ,  ") == []
+
+
+@pytest.mark.skipif(StemmerFactory is None, reason="PySastrawi not installed")
+def test_stem_mode_matches_inflected_words():
+    found = search_tokens(TEXT, ["uji", "uji coba"], 'stem')
+    assert words(TEXT, found["uji"]) == ["menguji", "Ujian", "pengujian", "diuji", "uji"]
+    assert words(TEXT, found["uji coba"]) == ["uji coba"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        TokenIndex(TEXT).lookup("uji", 'fuzzy')
+
+
+def test_index_cache_reuses_and_evicts(monkeypatch):
+    monkeypatch.setattr(token_index, 'INDEX_CACHE_SIZE', 2)
+    token_index._index_cache.clear()
+
+    first = get_token_index("satu")
+    assert get_token_index("satu") is first
+    second = get_token_index("dua")
+    get_token_index("satu")  # Most recently used again, so "dua" goes first
+    get_token_index("tiga")
+
+    assert len(token_index._index_cache) == 2
+    assert get_token_index("satu") is first
+    assert get_token_index("dua") is not second
@@ -0,0 +1,205 @@
+"""
+Token Index (Word-Boundary & Stemmed Matching)
+==============================================
+Substring search (Rabin-Karp) matches "uji" inside "menguji" and "ujian".
+This module tokenizes a document once and builds a token -> offsets index,
+so whole-word and stem queries become dictionary lookups:
+
+    word : "uji" matches only the word "uji"
+    stem : "uji" matches "menguji", "pengujian", "diuji", ... (Sastrawi)
+
+Stemming is expensive, so stems are memoized in a bounded LRU cache and the
+stem index is only built the first time a stem query needs it.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+except ImportError:  # Sastrawi is only needed for stem matching
+    StemmerFactory = None
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Matching modes offered by the API ('exact' = Rabin-Karp substring search)
+MATCH_MODES = ('exact', 'word', 'stem')
+
+# A token is a run of letters/digits; punctuation and hyphens split words
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Number of distinct words whose stem is memoized
+STEM_CACHE_SIZE = 50_000
+
+# Number of document indexes kept in memory (LRU, keyed by text hash)
+INDEX_CACHE_SIZE = 16
+
+
+# =============================================================================
+# STEMMING
+# =============================================================================
+
+_stemmer = None
+_stemmer_lock = threading.Lock()
+
+
+def _get_stemmer():
+    """Create the Sastrawi stemmer once (loading its dictionary is not free)."""
+    global _stemmer
+    if _stemmer is None:
+        if StemmerFactory is None:
+            raise RuntimeError("Stem matching requires PySastrawi to be installed")
+        with _stemmer_lock:
+            if _stemmer is None:
+                # Use the uncached stemmer: Sastrawi's own cache is unbounded,
+                # memoization is done by stem() below instead
+                _stemmer = StemmerFactory().create_stemmer().delegatedStemmer
+    return _stemmer
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+    """
+    Return the Indonesian base word of a (lowercased) word, memoized.
+
+    Args:
+        word (str): A single word, e.g. "pengujian"
+
+    Returns:
+        str: Base word, e.g. "uji" (the word itself if it cannot be stemmed)
+    """
+    return _get_stemmer().stem(word) or word
+
+
+def tokenize(text: str) -> list:
+    """Lowercased tokens of a text or keyword phrase."""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text or '')]
+
+
+# =============================================================================
+# TOKEN INDEX
+# =============================================================================
+
+class TokenIndex:
+    """
+    Token -> offsets index of one document.
+
+    Tokens keep their (start, end) character offsets in the original text,
+    so lookups return spans that can be highlighted directly.
+    """
+
+    def __init__(self, text: str):
+        self.spans = []     # (start, end) per token
+        self.words = []     # lowercased token per token
+        self.word_index = {}
+
+        for match in TOKEN_PATTERN.finditer(text):
+            token_id = len(self.words)
+            word = match.group().lower()
+            self.spans.append(match.span())
+            self.words.append(word)
+            self.word_index.setdefault(word, []).append(token_id)
+
+        # Built lazily on the first stem query
+        self.stems = None
+        self.stem_index = None
+        self._stem_lock = threading.Lock()
+
+    def _ensure_stems(self):
+        """Stem every token once and build the stem -> token ids index."""
+        if self.stem_index is not None:
+            return
+        with self._stem_lock:
+            if self.stem_index is not None:
+                return
+            stems = [stem(word) for word in self.words]
+            stem_index = {}
+            for token_id, base in enumerate(stems):
+                stem_index.setdefault(base, []).append(token_id)
+            self.stems = stems
+            self.stem_index = stem_index
+
+    def lookup(self, keyword: str, mode: str = 'word') -> list:
+        """
+        Find a keyword (one word or a phrase) as whole tokens.
+
+        Args:
+            keyword (str): Keyword or phrase, e.g. "uji" or "machine learning"
+            mode (str): 'word' for whole-word match, 'stem' for base-word match
+
+        Returns:
+            list: [(start, end)] character spans of every occurrence
+        """
+        terms = tokenize(keyword)
+        if not terms:
+            return []
+
+        if mode == 'stem':
+            self._ensure_stems()
+            terms = [stem(term) for term in terms]
+            index, sequence = self.stem_index, self.stems
+        elif mode == 'word':
+            index, sequence = self.word_index, self.words
+        else:
+            raise ValueError(f"Unknown token match mode '{mode}'. Use 'word' or 'stem'")
+
+        length = len(terms)
+        spans = []
+        for token_id in index.get(terms[0], ()):
+            if sequence[token_id:token_id + length] == terms:
+                spans.append((self.spans[token_id][0], self.spans[token_id + length - 1][1]))
+        return spans
+
+    def __len__(self):
+        return len(self.words)
+
+    def __repr__(self):
+        return f'<TokenIndex {len(self.words)} tokens, {len(self.word_index)} words>'
+
+
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_token_index(text: str) -> TokenIndex:
+    """
+    Return the TokenIndex of a text, building it only once per distinct text
+    (LRU of INDEX_CACHE_SIZE entries keyed by the SHA-256 of the text).
+    """
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = TokenIndex(text)
+
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def search_tokens(text: str, keywords: list, mode: str = 'word') -> dict:
+    """
+    Word-boundary or stemmed search for several keywords.
+
+    Args:
+        text (str): The text to search within
+        keywords (list): Keywords or phrases
+        mode (str): 'word' or 'stem'
+
+    Returns:
+        dict: {keyword: [(start, end)]}
+    """
+    index = get_token_index(text)
+    return {keyword: index.lookup(keyword, mode) for keyword in keywords}
+